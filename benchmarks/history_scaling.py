@@ -0,0 +1,90 @@
+"""Time the history archive's stats lookups as a guild's history grows.
+
+Archives random finished drafts for one guild, then times loading the
+guild's totals cold (what !history and !stats factions cost after a restart)
+against recounting them from the whole history file, which is what a lookup
+would cost without the running totals.
+
+Usage: python benchmarks/history_scaling.py [--drafts N] [--players P]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from history import HistoryArchive  # noqa: E402
+
+FACTIONS = list(range(1, 26))
+
+
+def random_record(rng: random.Random, players: int, channel_id: int) -> dict:
+    dealt = rng.sample(FACTIONS, players * 4)
+    selected = dealt[::4]
+    optional = dealt[1::4]
+    voted_in = [f for f in optional if rng.random() < 0.5]
+    pooled = sorted(selected + voted_in)
+    picked = rng.sample(pooled, players)
+    locations = rng.sample(range(1, players + 1), players)
+    strategies = rng.sample(range(1, players + 1), players)
+    return {
+        "channel_id": channel_id,
+        "guild_id": 1,
+        "finished_at": time.time(),
+        "deal_seed": rng.randrange(2**31),
+        "map_string": "",
+        "dealt": sorted(dealt),
+        "selected": sorted(selected),
+        "optional": sorted(optional),
+        "voted_in": sorted(voted_in),
+        "pooled": pooled,
+        "picks": [
+            [channel_id * 10 + seat, *pick]
+            for seat, pick in enumerate(zip(picked, locations, strategies))
+        ],
+    }
+
+
+async def run(directory: str, drafts: int, players: int):
+    rng = random.Random(0)
+    archive = HistoryArchive(directory)
+    start = time.perf_counter()
+    for i in range(drafts):
+        await archive.add(random_record(rng, players, i))
+    per_add = (time.perf_counter() - start) / drafts
+
+    start = time.perf_counter()
+    totals = await HistoryArchive(directory).totals(1)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Without the totals file every draft in the history file is counted again
+    os.remove(os.path.join(directory, "1.totals.json"))
+    recount = await HistoryArchive(directory).totals(1)
+    full = time.perf_counter() - start
+    if recount.to_dict() != totals.to_dict():
+        raise AssertionError("Running totals don't match a full recount")
+
+    size = os.path.getsize(os.path.join(directory, "1.jsonl"))
+    print(f"{drafts} drafts of {players} players, {size / 1024:.0f} KiB of history")
+    print(f"Archiving a draft: {per_add * 1000:.2f} ms")
+    print(f"Loading the running totals: {cold * 1000:.2f} ms")
+    print(f"Recounting from the history file: {full * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=10_000)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(directory, args.drafts, args.players))
+
+
+if __name__ == "__main__":
+    main()
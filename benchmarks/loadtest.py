@@ -0,0 +1,218 @@
+"""Play many drafts end to end against fake Discord objects and report the cost.
+
+Every command runs through the real command callbacks and before/after invoke
+hooks in drafter.py, with a fake context, channel and user layer standing in
+for Discord. Drafts run concurrently on one event loop. The report is JSON so
+runs from two builds can be diffed.
+
+Usage: python benchmarks/loadtest.py [--drafts N] [--players P]
+       [--storage json|sqlite] [--seed S] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"player{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild_id: int):
+        self.id = channel_id
+        self.name = f"draft-{channel_id}"
+        self.guild = SimpleNamespace(id=guild_id)
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+
+
+class FakeContext:
+    def __init__(self, bot, channel: FakeChannel, user_id: int, command):
+        self.bot = bot
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = FakeUser(user_id)
+        self.command = command
+        self.message = SimpleNamespace(author=self.author, channel=channel)
+
+    async def send(self, content=None, **kwargs):
+        await self.channel.send(content, **kwargs)
+
+
+class LoadTest:
+    """Drives drafts through drafter's commands and records what each call cost."""
+
+    def __init__(self, drafter, players: int, seed: int):
+        self.drafter = drafter
+        self.players = players
+        self.rng = random.Random(seed)
+        self.latencies = {}  # command name -> [seconds]
+        self.sends = {}  # command name -> messages sent
+        self.fetch_user_calls = 0
+
+        # No gateway cache: every user the bot doesn't already know is a REST call
+        async def fetch_user(user_id):
+            self.fetch_user_calls += 1
+            return FakeUser(user_id)
+
+        drafter.bot.get_user = lambda user_id: None
+        drafter.bot.fetch_user = fetch_user
+
+    async def run(self, channel: FakeChannel, user_id: int, command, *args, **kw):
+        bot = self.drafter.bot
+        ctx = FakeContext(bot, channel, user_id, command)
+        sent_before = len(channel.sent)
+        start = time.perf_counter()
+        await bot._before_invoke(ctx)
+        try:
+            await command.callback(ctx, *args, **kw)
+        finally:
+            await bot._after_invoke(ctx)
+        elapsed = time.perf_counter() - start
+        self.latencies.setdefault(command.name, []).append(elapsed)
+        self.sends[command.name] = (
+            self.sends.get(command.name, 0) + len(channel.sent) - sent_before
+        )
+
+    async def play(self, channel_id: int, guild_id: int = None):
+        """Run one draft from !startdraft to its last pick."""
+        d = self.drafter
+        channel = FakeChannel(
+            channel_id, channel_id % 97 if guild_id is None else guild_id
+        )
+        players = [channel_id * 100 + i for i in range(1, self.players + 1)]
+
+        await self.run(channel, players[0], d.start_draft)
+        for player_id in players:
+            await self.run(channel, player_id, d.join_draft)
+        await self.run(channel, players[0], d.start_drafting, self.rng.randrange(2**32))
+        draft = d.active_drafts[channel_id]
+
+        for player_id in players:
+            hand = draft.player_factions[player_id]
+            await self.run(
+                channel, player_id, d.select_factions, str(hand[0]), str(hand[1])
+            )
+
+        for _ in range(len(players) * len(players)):
+            if draft.phase != 2:
+                break
+            voter = draft.draft_order[draft.current_voter]
+            faction = next(iter(draft.optional_factions))
+            await self.run(channel, voter, d.vote_faction, faction=str(faction))
+
+        for _ in range(len(players) * 3):
+            if channel_id not in d.active_drafts:
+                break
+            player_id = draft.snake.current
+            choices = draft.player_choices[player_id]
+            kind = next(kind for kind in choices.KINDS if choices[kind] is None)
+            value = self.rng.choice(list(draft.snake.available[kind]))
+            await self.run(channel, player_id, d.pick_selection, kind, value=str(value))
+
+        if channel_id in d.active_drafts:
+            raise RuntimeError(f"Draft {channel_id} didn't finish")
+
+    def report(self) -> dict:
+        commands = {}
+        for name, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            commands[name] = {
+                "calls": len(latencies),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+                "sends_per_call": round(self.sends[name] / len(latencies), 3),
+            }
+        return {
+            "commands": commands,
+            "sends": sum(self.sends.values()),
+            "fetch_user_calls": self.fetch_user_calls,
+        }
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+async def main_async(args, directory: str) -> dict:
+    import drafter
+
+    test = LoadTest(drafter, args.players, args.seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(test.play(10**6 + i) for i in range(args.drafts)))
+    await drafter.journal.flush()
+    elapsed = time.perf_counter() - start
+    drafter.storage.close()
+
+    result = {
+        "drafts": args.drafts,
+        "players": args.players,
+        "storage": args.storage,
+        "seed": args.seed,
+        "elapsed_s": round(elapsed, 3),
+        "drafts_per_s": round(args.drafts / elapsed, 1),
+        **test.report(),
+        "journal_appends": drafter.journal.appends,
+        "journal_snapshots": drafter.journal.snapshots,
+        "bytes_persisted": directory_bytes(directory),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--storage", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here, not stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # drafter opens its storage on import, so point it at the scratch dir first
+        os.environ["DRAFT_STORAGE"] = args.storage
+        os.environ["DRAFT_STORAGE_PATH"] = (
+            os.path.join(directory, "drafts.db")
+            if args.storage == "sqlite"
+            else directory
+        )
+        os.environ["DRAFT_HISTORY_DIR"] = os.path.join(directory, "history")
+        result = asyncio.run(main_async(args, directory))
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure draft throughput as the bot is split over more worker processes.
+
+Each worker is a separate process running the drafts of the guilds on its
+shards, as src/shards.py would run it, with every worker sharing one SQLite
+database. Drafts are played through the real commands by the load test's
+fake Discord layer. One guild per draft, spread evenly over the shards.
+
+Usage: python benchmarks/shard_scaling.py [--drafts N] [--workers 1 2 4]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(BENCHMARKS, "..", "src")
+sys.path.insert(0, SRC)
+
+from shards import assign, shard_for  # noqa: E402
+
+
+def worker(db, shard_count, shard_ids, drafts, players, go, results):
+    """Play every draft whose guild is on one of this worker's shards."""
+    os.environ.update(
+        DRAFT_STORAGE="sqlite",
+        DRAFT_STORAGE_PATH=db,
+        DRAFT_HISTORY_DIR=os.path.join(os.path.dirname(db), "history"),
+        DRAFT_SHARD_COUNT=str(shard_count),
+        DRAFT_SHARD_IDS=",".join(map(str, shard_ids)),
+    )
+    sys.path.insert(0, BENCHMARKS)
+    import drafter
+    from loadtest import LoadTest
+
+    guilds = [
+        guild
+        for guild in (index << 22 for index in range(1, drafts + 1))
+        if shard_for(guild, shard_count) in shard_ids
+    ]
+    test = LoadTest(drafter, players, seed=shard_ids[0])
+
+    async def run():
+        await asyncio.gather(
+            *(test.play(10**6 + (guild >> 22), guild) for guild in guilds)
+        )
+        await drafter.journal.flush()
+
+    go.wait()
+    asyncio.run(run())
+    drafter.storage.close()
+    results.put(len(guilds))
+
+
+def measure(workers: int, drafts: int, players: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")  # Each worker imports drafter fresh
+    with tempfile.TemporaryDirectory() as directory:
+        db = os.path.join(directory, "drafts.db")
+        go = ctx.Event()
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(
+                target=worker,
+                args=(db, workers, shard_ids, drafts, players, go, results),
+            )
+            for shard_ids in assign(workers, workers)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(2)  # Let every worker finish importing before the clock starts
+        start = time.perf_counter()
+        go.set()
+        played = sum(results.get() for _ in processes)
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+    return {
+        "workers": workers,
+        "drafts": played,
+        "elapsed_s": round(elapsed, 3),
+        "drafts_per_s": round(played / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    runs = [measure(workers, args.drafts, args.players) for workers in args.workers]
+    base = runs[0]["drafts_per_s"] / runs[0]["workers"]
+    for run in runs:
+        run["speedup_per_worker"] = round(
+            run["drafts_per_s"] / run["workers"] / base, 2
+        )
+    # Workers beyond the CPU count can only share cores, so they won't scale
+    print(json.dumps({"cpus": os.cpu_count(), "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare writing and reading draft snapshots before and after the versioned codec.
+
+Before, snapshots were pretty-printed JSON with string keys; now they're
+minified and versioned with int keys kept (see src/codec.py). Loading
+includes Draft.from_dict in both cases, since that's what a restore costs.
+
+Usage: python benchmarks/snapshot_codec.py [--rounds N] [--players P]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from codec import _upgrade_v1, decode_snapshot, encode_snapshot  # noqa: E402
+from draft_memory import sample_snapshot  # noqa: E402
+from drafter import Draft  # noqa: E402
+
+
+def legacy_encode(snapshot: dict) -> str:
+    return json.dumps(snapshot, indent=4)
+
+
+def legacy_decode(text: str) -> dict:
+    return _upgrade_v1(json.loads(text))
+
+
+def per_call(fn, arg, rounds: int) -> float:
+    """Best of three timings of fn(arg), in microseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5_000)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+
+    snapshot = sample_snapshot(args.players)
+    rows = []
+    for name, encode, decode in (
+        ("before", legacy_encode, legacy_decode),
+        ("after", encode_snapshot, decode_snapshot),
+    ):
+        text = encode(snapshot)
+        if Draft.from_dict(decode(text)).to_dict() != snapshot:
+            raise AssertionError(f"{name}: snapshot didn't survive a round trip")
+        rows.append(
+            (
+                name,
+                len(text.encode()),
+                per_call(encode, snapshot, args.rounds),
+                per_call(decode, text, args.rounds),
+                per_call(lambda t: Draft.from_dict(decode(t)), text, args.rounds),
+            )
+        )
+
+    print(f"Snapshot of a {args.players} player draft in Phase 3")
+    print(f"{'':8} {'bytes':>7} {'encode µs':>10} {'decode µs':>10} {'load µs':>10}")
+    for name, size, encode_us, decode_us, load_us in rows:
+        print(
+            f"{name:8} {size:>7} {encode_us:>10.1f} {decode_us:>10.1f} {load_us:>10.1f}"
+        )
+    (_, size0, enc0, dec0, load0), (_, size1, enc1, dec1, load1) = rows
+    print(
+        f"{'ratio':8} {size1 / size0:>7.0%} {enc1 / enc0:>10.0%} "
+        f"{dec1 / dec0:>10.0%} {load1 / load0:>10.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
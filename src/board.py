@@ -0,0 +1,101 @@
+"""Run draft commands from slash commands and draft board components.
+
+A draft's board is one public message that always shows the latest state of
+the draft, with a button that opens each player's own menus for the current
+phase as an ephemeral message. Commands run from an interaction edit the
+board in place instead of posting new messages, and anything only the acting
+player needs to see, like why their pick was refused, is answered ephemerally.
+"""
+
+import discord
+
+from outbox import MESSAGE_LIMIT, Outbox, pack
+
+
+class InteractionOutbox(Outbox):
+    """Outbox that shows a command's output on the draft board.
+
+    The interaction is deferred before the command runs, so everything is
+    sent as edits and follow-ups to it.
+    """
+
+    def __init__(self, interaction: discord.Interaction, boards: dict, view):
+        super().__init__(interaction.channel)
+        self.interaction = interaction
+        self.boards = boards  # channel_id -> board message
+        self.view = view  # Returns the board's components for the draft's new state
+        self.board = None  # The board when the command started
+        self.private = []
+
+    def tell(self, text: str):
+        self.private.append(text)
+        self.queued += 1
+
+    async def acknowledge(self):
+        """Defer the interaction, which Discord wants answered within 3 seconds."""
+        self.board = self.boards.get(self.interaction.channel_id)
+        if self.interaction.type is discord.InteractionType.application_command:
+            # The board shows the result; the command's own reply is private
+            await self.interaction.response.defer(ephemeral=True, thinking=True)
+        else:
+            await self.interaction.response.defer()
+
+    async def _show(self, content: str):
+        """Put content on the board, or post a new board if there isn't one."""
+        interaction = self.interaction
+        channel_id = interaction.channel_id
+        # A draft that just finished is no longer in boards; its board still is
+        board = self.boards.get(channel_id, self.board)
+        view = self.view()
+        message = interaction.message
+        if board is None and message is not None and not message.flags.ephemeral:
+            # A component on a board posted before a restart: keep using it
+            board = message
+        if board is not None and message is not None and message.id == board.id:
+            await interaction.edit_original_response(content=content, view=view)
+        elif board is not None:
+            await board.edit(content=content, view=view)
+        else:
+            board = await self.destination.send(content, view=view)
+        if view is None:
+            self.boards.pop(channel_id, None)  # The draft is over
+        else:
+            self.boards[channel_id] = board
+        self.sent += 1
+
+    async def flush(self):
+        messages = pack(self.lines)
+        self.lines = []
+        if messages:
+            await self._show(messages[0])
+            for message in messages[1:]:
+                await self.destination.send(message)
+                self.sent += 1
+        text = "\n".join(self.private)[:MESSAGE_LIMIT]
+        self.private = []
+        message = self.interaction.message
+        if self.interaction.type is discord.InteractionType.application_command:
+            # Replace the deferred "thinking..." reply
+            await self.interaction.edit_original_response(content=text or "Done!")
+        elif message is not None and message.flags.ephemeral and not text:
+            # Close the private menu the player chose from
+            await self.interaction.edit_original_response(content="Done!", view=None)
+        elif text:
+            await self.interaction.followup.send(text, ephemeral=True)
+        else:
+            return  # The board already shows it, and the click was acknowledged
+        self.sent += 1
+
+
+class InteractionContext:
+    """The parts of a commands.Context the draft commands use, for an interaction."""
+
+    def __init__(self, interaction: discord.Interaction, command, outbox: Outbox):
+        self.interaction = interaction
+        self.bot = interaction.client
+        self.channel = interaction.channel
+        self.guild = interaction.guild
+        self.author = interaction.user
+        self.command = command  # The prefix command this interaction stands in for
+        self.outbox = outbox
+        self.command_failed = False
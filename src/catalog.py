@@ -0,0 +1,155 @@
+"""Faction catalog loaded from a data file, with a name lookup index.
+
+The index is built once when the catalog loads: normalized names, short
+names and aliases map straight to factions, every prefix of those keys maps
+to the factions it could start, and trigrams catch typos. Resolving what a
+player typed is then a handful of dict lookups instead of a scan.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+
+STOPWORDS = {"the", "of"}
+
+
+def _words(text: str) -> list:
+    text = text.lower().replace("'", "")
+    return [
+        word for word in re.split(r"[^a-z0-9]+", text) if word and word not in STOPWORDS
+    ]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation, "the" and "of": "Jol-Nar" -> "jolnar"."""
+    return "".join(_words(text))
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FactionLookupError(LookupError):
+    """What a player typed doesn't name exactly one faction."""
+
+
+class UnknownFaction(FactionLookupError):
+    def __init__(self, query: str):
+        super().__init__(
+            f"No faction matches '{query}'! Use !list to see the factions."
+        )
+
+
+class AmbiguousFaction(FactionLookupError):
+    def __init__(self, query: str, candidates: list):
+        self.candidates = candidates
+        super().__init__(
+            f"'{query}' could mean "
+            + ", ".join(f"{faction.index}: {faction.name}" for faction in candidates)
+            + ". Be more specific or use the index!"
+        )
+
+
+@dataclass(frozen=True)
+class Faction:
+    index: int
+    name: str
+    short: str
+    expansion: str
+    aliases: tuple = ()
+
+
+class FactionCatalog:
+    """Every faction that can be drafted, looked up by index or by name."""
+
+    def __init__(self, factions: list, expansions: dict = None):
+        self.factions = {faction.index: faction for faction in factions}
+        self.expansions = expansions or {}
+        self._exact = {}  # key -> {index}
+        self._prefixes = {}  # prefix of a key -> {index}
+        self._trigrams = {}  # trigram -> {index}
+        for faction in factions:
+            for key in self._keys(faction):
+                self._exact.setdefault(key, set()).add(faction.index)
+                for end in range(1, len(key) + 1):
+                    self._prefixes.setdefault(key[:end], set()).add(faction.index)
+                for trigram in _trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(faction.index)
+
+    @staticmethod
+    def _keys(faction: Faction) -> set:
+        keys = set()
+        for text in (faction.name, faction.short, *faction.aliases):
+            words = _words(text)
+            keys.add("".join(words))
+            keys.update(words)
+        return keys
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r") as f:
+            data = json.load(f)
+        factions = [
+            Faction(
+                index=entry["index"],
+                name=entry["name"],
+                short=entry.get("short", entry["name"]),
+                expansion=entry.get("expansion", ""),
+                aliases=tuple(entry.get("aliases", ())),
+            )
+            for entry in data["factions"]
+        ]
+        return cls(factions, data.get("expansions"))
+
+    @property
+    def names(self) -> dict:
+        """Faction index -> full name."""
+        return {index: faction.name for index, faction in self.factions.items()}
+
+    def _one(self, query: str, indices) -> int:
+        if len(indices) == 1:
+            return next(iter(indices))
+        raise AmbiguousFaction(query, [self.factions[i] for i in sorted(indices)])
+
+    def resolve(self, query: str, within=None) -> int:
+        """Turn an index, name, short name, alias or prefix into a faction index.
+
+        If within is given, matches among those faction indices win, so a name
+        that is ambiguous in the whole catalog can still pick out the one
+        matching faction that is actually on offer. A name that only matches
+        factions outside within still resolves, so the caller can say why
+        that faction can't be chosen.
+        """
+        query = query.strip()
+        if query.isdigit():
+            if int(query) in self.factions:
+                return int(query)
+            raise UnknownFaction(query)
+
+        def narrow(indices):
+            if within is None:
+                return indices
+            return {index for index in indices if index in within} or indices
+
+        key = normalize(query)
+        if not key:
+            raise UnknownFaction(query)
+        for index in (self._exact, self._prefixes):
+            if key in index:
+                return self._one(query, narrow(index[key]))
+
+        # Typo fallback: the factions sharing the most trigrams with the query
+        scores = {}
+        query_trigrams = _trigrams(key)
+        for trigram in query_trigrams:
+            for index in self._trigrams.get(trigram, ()):
+                scores[index] = scores.get(index, 0) + 1
+        if not scores:
+            raise UnknownFaction(query)
+        best = max(scores.values())
+        if best < len(query_trigrams) / 2:
+            raise UnknownFaction(query)
+        return self._one(
+            query, narrow({i for i, score in scores.items() if score == best})
+        )
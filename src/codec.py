@@ -0,0 +1,59 @@
+"""Versioned encoding of draft snapshots.
+
+A snapshot is the dict Draft.to_dict makes. It's written as minified JSON
+with a "version" field. JSON object keys can only be strings, so the maps
+keyed by player or faction ID are written as [key, value] pairs, and
+decoding gives back exactly the int keys that were encoded.
+
+Snapshots from before versioning (pretty-printed, string keys, no
+"version") are still read and come back in the current form; they're
+rewritten in it the next time the draft is compacted.
+"""
+
+import json
+
+VERSION = 2
+
+# Snapshot fields that map int IDs to values
+INT_KEYED = (
+    "player_factions",
+    "selected_factions",
+    "votes",
+    "player_choices",
+    "queues",
+)
+
+_encoder = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+
+
+class SnapshotVersionError(ValueError):
+    """A snapshot was written by a newer version of the bot."""
+
+
+def encode_snapshot(snapshot: dict) -> str:
+    data = dict(snapshot, version=VERSION)
+    for name in INT_KEYED:
+        if name in data:
+            data[name] = list(data[name].items())
+    return _encoder.encode(data)
+
+
+def decode_snapshot(text) -> dict:
+    data = json.loads(text)
+    version = data.pop("version", 1)
+    if version == 1:
+        return _upgrade_v1(data)
+    if version != VERSION:
+        raise SnapshotVersionError(f"Unknown snapshot version {version}")
+    for name in INT_KEYED:
+        if name in data:
+            data[name] = dict(data[name])
+    return data
+
+
+def _upgrade_v1(data: dict) -> dict:
+    """A pre-versioning snapshot, whose int keys were written as strings."""
+    for name in INT_KEYED:
+        if name in data:
+            data[name] = {int(key): value for key, value in data[name].items()}
+    return data
@@ -0,0 +1,90 @@
+"""Compact building blocks for draft state.
+
+A bot hosting many servers keeps one Draft per channel in memory, so the
+per-draft containers are kept small: sets of faction indices are the bits of
+a single int, and a player's picks are a slotted record instead of a dict.
+"""
+
+
+class BitSet:
+    """A set of small non-negative ints stored as the bits of one int."""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, items=()):
+        self.mask = 0
+        for item in items:
+            self.mask |= 1 << item
+
+    def add(self, item: int):
+        self.mask |= 1 << item
+
+    def discard(self, item: int):
+        self.mask &= ~(1 << item)
+
+    def remove(self, item: int):
+        if item not in self:
+            raise KeyError(item)
+        self.discard(item)
+
+    def __contains__(self, item) -> bool:
+        return isinstance(item, int) and item >= 0 and bool(self.mask >> item & 1)
+
+    def __iter__(self):
+        """Yield members in ascending order."""
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BitSet):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BitSet({list(self)})"
+
+
+class Choices:
+    """A player's faction, location and strategy picks; None until picked."""
+
+    __slots__ = ("faction", "location", "strategy")
+
+    KINDS = ("faction", "location", "strategy")
+
+    def __init__(self, faction: int = None, location: int = None, strategy: int = None):
+        self.faction = faction
+        self.location = location
+        self.strategy = strategy
+
+    def __getitem__(self, kind: str):
+        if kind not in self.KINDS:
+            raise KeyError(kind)
+        return getattr(self, kind)
+
+    def __setitem__(self, kind: str, value: int):
+        if kind not in self.KINDS:
+            raise KeyError(kind)
+        setattr(self, kind, value)
+
+    def values(self) -> tuple:
+        return (self.faction, self.location, self.strategy)
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.KINDS, self.values()))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Choices):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Choices({self.faction}, {self.location}, {self.strategy})"
@@ -0,0 +1,46 @@
+"""Deal faction hands for Phase 1."""
+
+import random
+
+
+def deal(
+    player_count: int,
+    pool,
+    hand_size: int = 4,
+    seed: int = None,
+    exclude=(),
+) -> list:
+    """Deal hand_size factions from pool to each of player_count players.
+
+    Factions are dealt from one shuffled deck, so hands don't share factions
+    until the pool runs out. After that the deck is reshuffled and dealt
+    again, which is the only time a faction can appear in more than one hand.
+    No hand ever holds the same faction twice. Excluded (e.g. banned)
+    factions are never dealt. The same seed always deals the same hands.
+    """
+    exclude = set(exclude)
+    candidates = [faction for faction in pool if faction not in exclude]
+    if hand_size > len(candidates):
+        raise ValueError(
+            f"Can't deal {hand_size} factions per player from a pool of "
+            f"{len(candidates)}"
+        )
+
+    rng = random.Random(seed)
+    deck = []
+    hands = []
+    for _ in range(player_count):
+        hand = []
+        held_back = []  # Drawn but already in this hand; dealt to the next one
+        while len(hand) < hand_size:
+            if not deck:
+                deck = candidates.copy()
+                rng.shuffle(deck)
+            faction = deck.pop()
+            if faction in hand:
+                held_back.append(faction)
+            else:
+                hand.append(faction)
+        deck.extend(held_back)
+        hands.append(hand)
+    return hands
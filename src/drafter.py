@@ -1,294 +1,1152 @@
-import aiohttp
-import json
+import asyncio
+import logging
 import os
 import random
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from board import InteractionContext, InteractionOutbox
+from catalog import FactionCatalog, FactionLookupError
+from compact import BitSet, Choices
+from dealer import deal
+from history import HistoryArchive, draft_record
+from locks import KeyedLocks
+from mapgen import FEATURES, MapGenerator, TileCatalog
+from metrics import Registry, serve
+from outbox import Outbox
+from snake import KINDS, SnakeDraft
+from persistence import Journal, SqliteStorage, open_storage
+from render import RenderCache
+from shards import shard_for
+from simulate import DraftSimulator, load_ratings
+from timers import Scheduler
+from user_cache import UserCache
+
 # Load environment variables
 load_dotenv()
 
 # Bot configuration
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# TI4 Factions
-TI4_FACTIONS = [
-    # Base Game
-    "The Arborec",
-    "The Barony of Letnev",
-    "The Clan of Saar",
-    "The Embers of Muaat",
-    "The Emirates of Hacan",
-    "The Federation of Sol",
-    "The Ghosts of Creuss",
-    "The L1Z1X Mindnet",
-    "The Mentak Coalition",
-    "The Naalu Collective",
-    "The Nekro Virus",
-    "The Sardakk N'orr",
-    "The Universities of Jol-Nar",
-    "The Winnu",
-    "The Xxcha Kingdom",
-    "The Yin Brotherhood",
-    "The Yssaril Tribes",
-    # Prophecy of Kings Expansion
-    "The Argent Flight",
-    "The Empyrean",
-    "The Mahact Gene-Sorcerers",
-    "The Naaz-Rokha Alliance",
-    "The Nomad",
-    "The Titans of Ul",
-    "The Vuil'Raith Cabal",
-    # Bonus Factions
-    "The Council Keleres",
-]
+log = logging.getLogger("drafter")
+
+# Metrics, exported at http://127.0.0.1:$DRAFT_METRICS_PORT/metrics when set
+metrics = Registry()
+started_at = time.monotonic()
+command_calls = metrics.counter(
+    "drafter_commands_total",
+    "Commands handled, by the draft phase they left the draft in",
+    ("command", "phase"),
+)
+command_errors = metrics.counter(
+    "drafter_command_errors_total", "Commands that raised an error", ("command",)
+)
+command_seconds = metrics.histogram(
+    "drafter_command_seconds",
+    "Time from a command's lock request to its last message sent",
+    ("command",),
+)
+messages_sent = metrics.counter(
+    "drafter_messages_sent_total", "Messages sent to channels", ("command",)
+)
+storage_write_seconds = metrics.histogram(
+    "drafter_storage_write_seconds", "Time to write one journal flush to storage"
+)
+storage_written_bytes = metrics.counter(
+    "drafter_storage_written_bytes_total", "Bytes of events and snapshots written"
+)
+drafts_unloaded = metrics.counter(
+    "drafter_drafts_unloaded_total",
+    "Drafts written out and dropped from memory",
+    ("reason",),
+)
+drafts_reloaded = metrics.counter(
+    "drafter_drafts_reloaded_total", "Saved drafts loaded back into memory"
+)
+drafts_deleted = metrics.counter(
+    "drafter_drafts_deleted_total", "Drafts deleted without finishing", ("reason",)
+)
+turn_timeouts = metrics.counter(
+    "drafter_turn_timeouts_total",
+    "Turns that ran out of time, by the phase they were in",
+    ("phase",),
+)
+
+
+def record_write(seconds: float, written: int):
+    storage_write_seconds.observe(seconds)
+    storage_written_bytes.inc(amount=written)
+
+
+storage = open_storage(
+    os.getenv("DRAFT_STORAGE", "json"), os.getenv("DRAFT_STORAGE_PATH")
+)
+journal = Journal(storage, on_write=record_write)
+# Finished drafts and per-server faction totals, for !history and !stats factions
+history = HistoryArchive(os.getenv("DRAFT_HISTORY_DIR", "history"))
+
+
+# Sharding, set by src/shards.py for each worker process: the shards it runs
+SHARD_COUNT = int(os.getenv("DRAFT_SHARD_COUNT", "0"))
+SHARD_IDS = [int(i) for i in os.getenv("DRAFT_SHARD_IDS", "").split(",") if i.strip()]
+
+
+def owns_guild(guild_id) -> bool:
+    """Whether this process runs the shard a guild's events arrive on."""
+    # Direct messages have no guild and arrive on shard 0
+    return shard_for(guild_id or 0, SHARD_COUNT) in SHARD_IDS
+
+
+# Workers share one database, so each only restores, times and deletes the
+# drafts of its own guilds; a bot running every shard needs no filter
+OWNED_GUILDS = owns_guild if SHARD_COUNT and SHARD_IDS else None
+if OWNED_GUILDS is not None and not isinstance(storage, SqliteStorage):
+    raise ValueError(
+        "Sharded workers share their drafts in SQLite: DRAFT_STORAGE=sqlite"
+    )
+
+
+class DraftBot(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
+    metrics_runner = None
+    sweeper = None
+    ticker = None
+
+    async def setup_hook(self):
+        port = os.getenv("DRAFT_METRICS_PORT")
+        if port:
+            self.metrics_runner = await serve(metrics, "127.0.0.1", int(port))
+        self.sweeper = asyncio.create_task(sweep_forever())
+        self.ticker = asyncio.create_task(timers.run())
+        # Board components keep working on boards posted before a restart
+        self.add_view(BoardView())
+        if os.getenv("DRAFT_SYNC_COMMANDS"):
+            await self.tree.sync()
+
+    async def close(self):
+        # Don't lose changes still waiting in the write-behind buffer
+        await journal.flush()
+        storage.close()
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+        if self.ticker is not None:
+            self.ticker.cancel()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        await super().close()
+
+
+if SHARD_COUNT:
+    bot = DraftBot(
+        command_prefix="!",
+        intents=intents,
+        shard_count=SHARD_COUNT,
+        shard_ids=SHARD_IDS or None,
+    )
+else:
+    bot = DraftBot(command_prefix="!", intents=intents)
+users = UserCache(bot)
+
+# TI4 Factions, loaded from a data file so other faction pools can be swapped in
+catalog = FactionCatalog.load(
+    os.getenv(
+        "DRAFT_FACTIONS_FILE",
+        os.path.join(os.path.dirname(__file__), "data", "factions.json"),
+    )
+)
+TI4_FACTIONS = [faction.name for faction in catalog.factions.values()]
+maps = MapGenerator(
+    TileCatalog.load(
+        os.getenv(
+            "DRAFT_TILES_FILE",
+            os.path.join(os.path.dirname(__file__), "data", "tiles.json"),
+        )
+    )
+)
 
 # Helper: Faction index mapping
-FACTION_INDEX = {i + 1: name for i, name in enumerate(TI4_FACTIONS)}
-FACTION_NAME_TO_INDEX = {name: i + 1 for i, name in enumerate(TI4_FACTIONS)}
+FACTION_INDEX = catalog.names
+FACTION_NAME_TO_INDEX = {name: idx for idx, name in FACTION_INDEX.items()}
+
+# Dealing configuration
+HAND_SIZE = int(os.getenv("DRAFT_HAND_SIZE", "4"))  # Factions dealt to each player
+# Everyone votes at once, for any number of optional factions, instead of in turn
+SIMULTANEOUS_VOTING = os.getenv("DRAFT_SIMULTANEOUS_VOTING", "") not in ("", "0")
+EXCLUDED_FACTIONS = {  # Factions this server never deals, e.g. "keleres,3"
+    catalog.resolve(name)
+    for name in os.getenv("DRAFT_EXCLUDED_FACTIONS", "").split(",")
+    if name.strip()
+}
+
+# Memory limits for long-running instances
+IDLE_SECONDS = int(os.getenv("DRAFT_IDLE_SECONDS", "3600"))  # Then unload a draft
+MAX_ACTIVE = int(os.getenv("DRAFT_MAX_ACTIVE", "1000"))  # Drafts kept in memory
+# Drafts nobody joined or started for this long are deleted
+UNSTARTED_SECONDS = int(os.getenv("DRAFT_UNSTARTED_SECONDS", "86400"))
+# Saved drafts nobody has touched for this long are deleted
+ABANDONED_SECONDS = int(os.getenv("DRAFT_ABANDONED_SECONDS", str(30 * 86400)))
+SWEEP_SECONDS = 60  # How often idle drafts are looked for
+
+# Start every draft in its own thread, so a channel can run any number at once
+DRAFT_THREADS = os.getenv("DRAFT_THREADS", "") not in ("", "0")
+THREAD_ARCHIVE_MINUTES = 10080  # Discord hides threads inactive for this long
+
+# Seconds each player gets to vote or pick before their turn is skipped or
+# picked for them; 0 for no limit. Drafts can change it with !timer.
+TURN_SECONDS = int(os.getenv("DRAFT_TURN_SECONDS", "0"))
+
+
+def resolve_faction(ctx, query: str, within=None):
+    """Look up the faction a player named, telling them if it doesn't name one."""
+    try:
+        return catalog.resolve(query, within)
+    except FactionLookupError as error:
+        ctx.outbox.tell(str(error))
+        return None
+
+
+def _faction_list(indices) -> str:
+    return ", ".join(f"{idx}: {FACTION_INDEX[idx]}" for idx in indices) or "None"
+
+
+def _vote_status(draft) -> str:
+    lines = []
+    for idx in draft.optional_factions:
+        count = draft.vote_count(idx)
+        lines.append(
+            f"{idx}: {FACTION_INDEX[idx]} ({count} vote{'s' if count != 1 else ''})"
+        )
+    return "Optional factions available to vote for:\n" + "\n".join(lines)
+
+
+def _map_text(draft) -> str:
+    if not draft.map_string:
+        # Drafts from before maps were generated here only have a link
+        return f"Map URL: {draft.map_url}" if draft.map_url else "No map yet!"
+    seats = maps.describe(draft.map_string, len(draft.players))
+    lines = [f"Map string: {draft.map_string}"]
+    for location, values in enumerate(seats, 1):
+        lines.append(
+            f"Location {location}: "
+            + ", ".join(f"{value:.1f} {name}" for name, value in zip(FEATURES, values))
+        )
+    return "\n".join(lines)
 
-# Draft state
-active_drafts = {}
+
+# Listing text by view; listing() renders each at most once per draft change
+LISTINGS = {
+    "available_factions": lambda draft: "Available factions: "
+    + _faction_list(draft.snake.available["faction"]),
+    "available_locations": lambda draft: "Available locations (1 is the top of the"
+    " map, 2 is the next clockwise, and so on): "
+    + (", ".join(map(str, draft.snake.available["location"])) or "None"),
+    "available_strategies": lambda draft: "Available strategy orders: "
+    + (", ".join(map(str, draft.snake.available["strategy"])) or "None"),
+    "selectable_factions": lambda draft: "Selectable factions: "
+    + _faction_list(draft.final_factions),
+    "optional_factions": lambda draft: "Optional factions (needs votes): "
+    + _faction_list(draft.optional_factions),
+    "vote_status": _vote_status,
+    "map": _map_text,
+}
+renders = RenderCache()
+
+
+def listing(draft, view: str) -> str:
+    return renders.get(draft, view, LISTINGS[view])
 
 
-@dataclass
+# Draft state
+active_drafts = {}
+# Channels with a saved draft that hasn't been loaded into active_drafts yet
+saved_drafts = set()
+restoring = {}  # channel_id -> task loading that channel's saved draft
+# channel_id -> time.monotonic() of the draft's last command, least recent first
+last_used = OrderedDict()
+# Commands for one draft run one at a time; other channels aren't held up
+draft_locks = KeyedLocks()
+# Turn reminders and deadlines of every draft, keyed by channel_id
+timers = Scheduler(lambda channel_id: on_turn_timer(channel_id))
+
+
+def drafts_by_phase() -> dict:
+    counts = dict.fromkeys(((str(phase),) for phase in range(4)), 0)
+    for draft in active_drafts.values():
+        counts[(str(draft.phase),)] = counts.get((str(draft.phase),), 0) + 1
+    return counts
+
+
+metrics.collect(
+    "drafter_active_drafts",
+    "Drafts in memory by phase",
+    drafts_by_phase,
+    "gauge",
+    ("phase",),
+)
+metrics.collect(
+    "drafter_saved_drafts",
+    "Saved drafts not loaded into memory yet",
+    lambda: {(): len(saved_drafts)},
+)
+metrics.collect(
+    "drafter_fetch_user_total",
+    "fetch_user REST calls made to resolve players",
+    lambda: {(): users.rest_lookups},
+    "counter",
+)
+metrics.collect(
+    "drafter_user_lookups_total",
+    "Player lookups by where the user came from",
+    lambda: {
+        ("cache",): users.hits,
+        ("gateway",): users.gateway_hits,
+        ("rest",): users.rest_lookups,
+    },
+    "counter",
+    ("source",),
+)
+metrics.collect(
+    "drafter_pending_timers",
+    "Drafts waiting on a turn reminder or deadline",
+    lambda: {(): len(timers)},
+)
+metrics.collect(
+    "drafter_render_cache_total",
+    "Listing renders served from the cache or built",
+    lambda: {("hit",): renders.hits, ("miss",): renders.misses},
+    "counter",
+    ("result",),
+)
+metrics.collect(
+    "drafter_drafts_archived_total",
+    "Finished drafts added to the history archive",
+    lambda: {(): history.archived},
+    "counter",
+)
+
+
+@dataclass(slots=True)
 class Draft:
     channel_id: int
+    guild_id: int = None
     players: list = field(default_factory=list)
     phase: int = (
-        0  # 0 for not started, 1 for initial selection, 2 for voting, 3 for snake draft
+        0  # 0 for not started, 1 for initial selection, 2 for voting, 3 for snake draft,
+        # 4 for complete
     )
     player_factions: dict = field(
         default_factory=dict
-    )  # player_id -> [4 random factions]
+    )  # player_id -> (HAND_SIZE random factions)
     selected_factions: dict = field(
         default_factory=dict
-    )  # player_id -> [selected faction, optional faction]
-    optional_factions: set = field(default_factory=set)  # Set of all optional factions
+    )  # player_id -> (selected faction, optional faction)
+    banned_factions: BitSet = field(
+        default_factory=BitSet
+    )  # Factions players banned before dealing
+    deal_seed: int = None  # Seed the factions were dealt with
+    optional_factions: BitSet = field(
+        default_factory=BitSet
+    )  # Set of all optional factions
     votes: dict = field(
         default_factory=dict
-    )  # faction -> set of player_ids who voted for it
-    final_factions: set = field(
-        default_factory=set
+    )  # faction -> bitmask of the seats (index in players) that voted for it
+    final_factions: BitSet = field(
+        default_factory=BitSet
     )  # Set of all selectable factions after voting
     draft_order: list = field(default_factory=list)  # Order for snake draft
-    current_picker: int = 0  # Index in draft_order for current picker
-    draft_round: int = 1  # Current round of snake draft
-    player_choices: dict = field(
-        default_factory=dict
-    )  # player_id -> {"faction": None, "location": None, "strategy": None}
+    current_voter: int = 0  # Index in draft_order for current voter
+    simultaneous: bool = False  # Everyone votes at once instead of in draft order
+    voted: int = 0  # Bitmask of the seats (index in players) that have voted
+    player_choices: dict = field(default_factory=dict)  # player_id -> Choices
     available_locations: list = field(
         default_factory=list
-    )  # List of available locations for the draft
+    )  # List of locations for the draft; snake tracks what's left in Phase 3
     available_strategies: list = field(
         default_factory=list
-    )  # List of available strategy orders for the draft
-    map_url: str = ""  # URL for the generated map
-    draft_direction: int = 1
-
-    async def initialize(self):
-        """Generate a map using the TI4 map generator."""
-        async with aiohttp.ClientSession() as session:
-            # Generate a random seed for the map
-            player_count = len(self.players)
-            seed = random.randint(1, 9999)
-            self.map_url = (
-                f"https://keeganw.github.io/ti4/?settings=TFFFF{player_count}000"
-                f"{seed}FFF"
+    )  # List of strategy orders for the draft; snake tracks what's left in Phase 3
+    map_url: str = ""  # URL of an externally generated map (older drafts)
+    map_string: str = ""  # Tiles of the locally generated map, see mapgen
+    snake: SnakeDraft = None  # Phase 3 pick schedule and remaining pools
+    turn_seconds: int = 0  # Time limit per vote or pick, 0 for none
+    reminder: float = None  # time.time() to remind whoever's turn it is
+    deadline: float = None  # time.time() their turn runs out
+    queues: dict = field(
+        default_factory=dict
+    )  # player_id -> {kind: [values, best first]} to pick for them on their turn
+    skipped: tuple = ()  # Players whose Phase 3 turns were passed, in order
+    seq: int = 0  # Number of journal events applied to this draft
+
+    async def initialize(self, seed: int = None):
+        """Generate the most balanced map for the draft's players."""
+        generated = await asyncio.to_thread(maps.generate, len(self.players), seed)
+        self.record(
+            "map_generated",
+            map_string=generated.map_string,
+            seed=generated.seed,
+            player_count=len(self.players),
+        )
+
+    def record(self, event_type: str, **data):
+        """Apply a change to the draft and append it to the draft's journal."""
+        event = {"seq": self.seq + 1, "type": event_type, **data}
+        self.apply(event)
+        journal.append(self, event)
+
+    def apply(self, event: dict):
+        """Apply one journal event to the in-memory state."""
+        data = {k: v for k, v in event.items() if k not in ("seq", "type")}
+        getattr(self, f"_on_{event['type']}")(**data)
+        self.seq = event["seq"]
+
+    def _on_draft_created(self, guild_id: int = None, turn_seconds: int = 0):
+        self.guild_id = guild_id
+        self.turn_seconds = turn_seconds
+
+    def _on_timer_set(self, seconds: int):
+        self.turn_seconds = seconds
+
+    def _on_deadline_set(self, reminder: float, deadline: float):
+        self.reminder = reminder
+        self.deadline = deadline
+
+    def _on_player_joined(self, player_id: int):
+        self.players.append(player_id)
+        self.player_choices[player_id] = Choices()
+
+    def _on_map_generated(
+        self, player_count: int, map_url: str = "", map_string: str = "", seed=None
+    ):
+        self.map_url = map_url
+        self.map_string = map_string
+        self.available_locations = list(range(1, player_count + 1))
+        self.available_strategies = list(range(1, player_count + 1))
+
+    def _on_faction_banned(self, faction: int):
+        self.banned_factions.add(faction)
+
+    def _on_factions_dealt(self, hands: list, seed: int = None):
+        # hands[i] holds the factions dealt to self.players[i]
+        self.player_factions = dict(zip(self.players, map(tuple, hands)))
+        self.deal_seed = seed
+        self.phase = 1
+
+    def _on_selected(self, player_id: int, faction: int, optional: int):
+        self.selected_factions[player_id] = (faction, optional)
+        self.final_factions.add(faction)
+        self.optional_factions.add(optional)
+
+    def _on_voting_started(self, draft_order: list, simultaneous: bool = False):
+        self.draft_order = draft_order
+        self.current_voter = 0
+        self.simultaneous = simultaneous
+        self.phase = 2
+
+    def _on_voted(self, player_id: int, faction: int):
+        self._tally(1 << self.players.index(player_id), faction)
+        self.current_voter = (self.current_voter + 1) % len(self.draft_order)
+
+    def _on_vote_skipped(self, player_id: int):
+        self.voted |= 1 << self.players.index(player_id)
+        self.current_voter = (self.current_voter + 1) % len(self.draft_order)
+
+    def _on_ballot_cast(self, player_id: int, factions: list):
+        seat_bit = 1 << self.players.index(player_id)
+        self.voted |= seat_bit
+        for faction in factions:
+            self._tally(seat_bit, faction)
+
+    def _tally(self, seat_bit: int, faction: int):
+        self.voted |= seat_bit
+        self.votes[faction] = self.votes.get(faction, 0) | seat_bit
+        # A faction with enough votes becomes selectable
+        if self.vote_count(faction) >= 2 and faction in self.optional_factions:
+            self.final_factions.add(faction)
+            self.optional_factions.remove(faction)
+
+    def voters(self, faction: int) -> list:
+        """Players who voted for a faction, in join order."""
+        mask = self.votes.get(faction, 0)
+        return [p for seat, p in enumerate(self.players) if mask >> seat & 1]
+
+    def vote_count(self, faction: int) -> int:
+        return self.votes.get(faction, 0).bit_count()
+
+    def has_voted(self, player_id: int) -> bool:
+        return bool(self.voted >> self.players.index(player_id) & 1)
+
+    @property
+    def all_voted(self) -> bool:
+        return self.voted == (1 << len(self.players)) - 1
+
+    def _on_picking_started(self):
+        self.snake = SnakeDraft(
+            self.draft_order,
+            self.final_factions,
+            self.available_locations,
+            self.available_strategies,
+        )
+        self.phase = 3
+
+    def _on_picked(self, player_id: int, kind: str, value: int):
+        self.player_choices[player_id][kind] = value
+        self.snake.pick(player_id, kind, value)
+        self._on_queued(player_id, kind, [])  # Nothing left to queue for
+
+    def _on_pick_skipped(self, player_id: int):
+        self.skipped += (player_id,)
+        self.snake.skip(player_id)
+
+    def _on_queued(self, player_id: int, kind: str, values: list):
+        queue = self.queues.get(player_id, {})
+        if values:
+            queue[kind] = list(values)
+            self.queues[player_id] = queue
+        elif queue.pop(kind, None) is not None and not queue:
+            del self.queues[player_id]
+
+    def _on_completed(self):
+        self.phase = 4
+        self.reminder = self.deadline = None
+
+    def to_dict(self) -> dict:
+        """Snapshot the draft state in its JSON file format."""
+        return {
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "players": list(self.players),
+            "phase": self.phase,
+            "player_factions": {k: list(v) for k, v in self.player_factions.items()},
+            "selected_factions": {
+                k: list(v) for k, v in self.selected_factions.items()
+            },
+            "banned_factions": list(self.banned_factions),
+            "deal_seed": self.deal_seed,
+            "optional_factions": list(self.optional_factions),
+            "votes": {k: self.voters(k) for k in self.votes},
+            "final_factions": list(self.final_factions),
+            "draft_order": list(self.draft_order),
+            "current_voter": self.current_voter,
+            "simultaneous": self.simultaneous,
+            "voted": [
+                p for seat, p in enumerate(self.players) if self.voted >> seat & 1
+            ],
+            "current_picker": self.snake.position if self.snake else 0,
+            "draft_round": self.snake.round if self.snake else 1,
+            "player_choices": {k: v.to_dict() for k, v in self.player_choices.items()},
+            "available_locations": list(
+                self.snake.available["location"]
+                if self.snake
+                else self.available_locations
+            ),
+            "available_strategies": list(
+                self.snake.available["strategy"]
+                if self.snake
+                else self.available_strategies
+            ),
+            "map_url": self.map_url,
+            "map_string": self.map_string,
+            "draft_direction": self.snake.direction if self.snake else 1,
+            "queues": {k: dict(v) for k, v in self.queues.items()},
+            "turn_seconds": self.turn_seconds,
+            "reminder": self.reminder,
+            "deadline": self.deadline,
+            "skipped": list(self.skipped),
+            "seq": self.seq,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Rebuild a draft from a snapshot made by to_dict (see codec for storage)."""
+        seats = {player_id: seat for seat, player_id in enumerate(data["players"])}
+        draft = cls(
+            channel_id=data["channel_id"],
+            guild_id=data.get("guild_id"),
+            players=data["players"],
+            phase=data["phase"],
+            player_factions={k: tuple(v) for k, v in data["player_factions"].items()},
+            selected_factions={
+                k: tuple(v) for k, v in data["selected_factions"].items()
+            },
+            banned_factions=BitSet(data.get("banned_factions", [])),
+            deal_seed=data.get("deal_seed"),
+            optional_factions=BitSet(data["optional_factions"]),
+            votes={
+                k: sum(1 << seats[p] for p in set(v)) for k, v in data["votes"].items()
+            },
+            final_factions=BitSet(data["final_factions"]),
+            draft_order=data["draft_order"],
+            current_voter=data.get("current_voter", 0),
+            simultaneous=data.get("simultaneous", False),
+            player_choices={k: Choices(**v) for k, v in data["player_choices"].items()},
+            available_locations=data["available_locations"],
+            available_strategies=data["available_strategies"],
+            map_url=data["map_url"],
+            map_string=data.get("map_string", ""),
+            queues={k: dict(v) for k, v in data.get("queues", {}).items()},
+            turn_seconds=data.get("turn_seconds", 0),
+            reminder=data.get("reminder"),
+            deadline=data.get("deadline"),
+            skipped=tuple(data.get("skipped", ())),
+            seq=data.get("seq", 0),
+        )
+        if "voted" in data:
+            draft.voted = sum(1 << seats[p] for p in data["voted"])
+        else:
+            # Older snapshots: everyone who voted for something has voted
+            for mask in draft.votes.values():
+                draft.voted |= mask
+        if draft.phase >= 3:
+            # The snapshot only lists what's left; put picked values back in the
+            # pools and let the engine replay the picks
+            for kind, pool in (
+                ("location", draft.available_locations),
+                ("strategy", draft.available_strategies),
+            ):
+                pool.extend(
+                    choices[kind]
+                    for choices in draft.player_choices.values()
+                    if choices[kind] is not None
+                )
+                pool.sort()
+            draft.snake = SnakeDraft.resume(
+                draft.draft_order,
+                draft.final_factions,
+                draft.available_locations,
+                draft.available_strategies,
+                draft.player_choices,
+                draft.skipped,
             )
-            self.available_locations = list(range(1, player_count + 1))
-            self.available_strategies = list(range(1, player_count + 1))
+        return draft
 
     async def save(self):
-        """Save the draft state to a file."""
-        with open(f"draft_{self.channel_id}.json", "w") as f:
-            data = {
-                "channel_id": self.channel_id,
-                "players": self.players,
-                "phase": self.phase,
-                "player_factions": self.player_factions,
-                "selected_factions": self.selected_factions,
-                "optional_factions": list(self.optional_factions),
-                "votes": {k: list(v) for k, v in self.votes.items()},
-                "final_factions": list(self.final_factions),
-                "draft_order": self.draft_order,
-                "current_picker": self.current_picker,
-                "draft_round": self.draft_round,
-                "player_choices": self.player_choices,
-                "available_locations": self.available_locations,
-                "available_strategies": self.available_strategies,
-                "map_url": self.map_url,
-            }
-            json.dump(data, f, indent=4)
+        """Compact the draft's journal into a full snapshot."""
+        journal.compact(self)
 
     @classmethod
-    def load(cls, channel_id: int):
-        """Load a draft state from a file."""
-        try:
-            with open(f"draft_{channel_id}.json", "r") as f:
-                data = json.load(f)
-                draft = cls(
-                    channel_id=data["channel_id"],
-                    players=data["players"],
-                    phase=data["phase"],
-                    player_factions=data["player_factions"],
-                    selected_factions=data["selected_factions"],
-                    optional_factions=set(data["optional_factions"]),
-                    votes={k: set(v) for k, v in data["votes"].items()},
-                    final_factions=set(data["final_factions"]),
-                    draft_order=data["draft_order"],
-                    current_picker=data["current_picker"],
-                    draft_round=data["draft_round"],
-                    player_choices=data["player_choices"],
-                    available_locations=data["available_locations"],
-                    available_strategies=data["available_strategies"],
-                    map_url=data["map_url"],
-                )
-                return draft
-        except FileNotFoundError:
+    def restore(cls, channel_id: int, snapshot: dict, events: list):
+        """Rebuild a draft by replaying its journal on top of its last snapshot."""
+        draft = cls.from_dict(snapshot) if snapshot else cls(channel_id=channel_id)
+        for event in events:
+            if event["seq"] > draft.seq:
+                draft.apply(event)
+        journal.replayed(channel_id, len(events))
+        return draft
+
+    @classmethod
+    async def load(cls, channel_id: int):
+        """Load a draft from storage, reading it in a worker thread."""
+        snapshot, events = await asyncio.to_thread(storage.read, channel_id)
+        if snapshot is None and not events:
             return None
+        return cls.restore(channel_id, snapshot, events)
 
 
 @bot.event
 async def on_ready():
     print(f"{bot.user} has connected to Discord!")
+    # Only index the drafts that were still running; each is loaded on first use
+    saved = await asyncio.to_thread(storage.unfinished_ids, OWNED_GUILDS)
+    saved_drafts.update(cid for cid in saved if cid not in active_drafts)
+    print(f"Found {len(saved_drafts)} saved draft(s) to restore on demand")
+    # Turn timers come back without loading their drafts
+    now = time.time()
+    for channel_id, (reminder, deadline) in (
+        await asyncio.to_thread(storage.timers, OWNED_GUILDS)
+    ).items():
+        if timers.armed(channel_id) is None and channel_id not in active_drafts:
+            timers.arm(
+                channel_id, reminder if reminder and reminder > now else deadline
+            )
+
+
+async def _restore_draft(channel_id: int):
+    try:
+        draft = await Draft.load(channel_id)
+        if draft is None:
+            return
+        if draft.phase != 4 and channel_id not in active_drafts:
+            active_drafts[channel_id] = draft
+            drafts_reloaded.inc()
+            log.info("Restored draft for channel %s", channel_id)
+    finally:
+        saved_drafts.discard(channel_id)
+        del restoring[channel_id]
+
+
+async def restore_draft(channel_id: int):
+    """Load a channel's saved draft into active_drafts the first time it's used."""
+    if channel_id in active_drafts or channel_id not in saved_drafts:
+        return
+    # Commands arriving while the draft loads all wait on the same load
+    if channel_id not in restoring:
+        restoring[channel_id] = asyncio.create_task(_restore_draft(channel_id))
+    await asyncio.shield(restoring[channel_id])
+
+
+@bot.before_invoke
+async def prepare_command(ctx):
+    """Lock the channel's draft, restore it if needed and open an outbox."""
+    ctx.started = time.perf_counter()
+    await draft_locks.acquire(ctx.channel.id)
+    try:
+        await restore_draft(ctx.channel.id)
+    except BaseException:
+        draft_locks.release(ctx.channel.id)
+        raise
+    if getattr(ctx, "outbox", None) is None:  # Interactions bring their own
+        ctx.outbox = Outbox(ctx)
+
+
+@bot.after_invoke
+async def finish_command(ctx):
+    """Send everything the command queued and unlock the channel's draft."""
+    if ctx.channel.id in active_drafts:
+        last_used[ctx.channel.id] = time.monotonic()
+        last_used.move_to_end(ctx.channel.id)
+    else:
+        last_used.pop(ctx.channel.id, None)
+    try:
+        await ctx.outbox.flush()
+    finally:
+        draft_locks.release(ctx.channel.id)
+    name = ctx.command.qualified_name
+    draft = active_drafts.get(ctx.channel.id)
+    command_seconds.observe(time.perf_counter() - ctx.started, name)
+    command_calls.inc(name, str(draft.phase) if draft else "none")
+    messages_sent.inc(name, amount=ctx.outbox.sent)
+    if getattr(ctx, "command_failed", False):
+        command_errors.inc(name)
+    log.info(
+        "!%s queued %d line(s) in %d message(s), saved %d API call(s)",
+        ctx.command.name,
+        ctx.outbox.queued,
+        ctx.outbox.sent,
+        ctx.outbox.saved,
+    )
+    log.debug("User cache: %s", users.stats())
+
+
+async def unload_draft(channel_id: int, reason: str, used: float = None):
+    """Write a draft out in full and drop it from memory until it's used again.
+
+    If used is given, a draft that has run a command since then is kept.
+    """
+    await draft_locks.acquire(channel_id)
+    try:
+        draft = active_drafts.get(channel_id)
+        if draft is None or (used is not None and last_used.get(channel_id) != used):
+            return
+        journal.compact(draft)  # Reloading then needs no replay
+        await journal.flush()
+        if journal.pending(channel_id):
+            return  # Not written; keep it and try again on the next sweep
+        del active_drafts[channel_id]
+        last_used.pop(channel_id, None)
+        saved_drafts.add(channel_id)
+        journal.forget(channel_id)
+        renders.evict(channel_id)
+        boards.pop(channel_id, None)
+        drafts_unloaded.inc(reason)
+    finally:
+        draft_locks.release(channel_id)
+
+
+async def delete_draft(channel_id: int, reason: str, used: float = None):
+    """Forget a draft that will never finish, in memory and in storage."""
+    await draft_locks.acquire(channel_id)
+    try:
+        if last_used.get(channel_id) != used:
+            return  # It ran a command (or was loaded) since it was picked
+        active_drafts.pop(channel_id, None)
+        last_used.pop(channel_id, None)
+        saved_drafts.discard(channel_id)
+        renders.evict(channel_id)
+        boards.pop(channel_id, None)
+        timers.cancel(channel_id)
+        await journal.delete(channel_id)
+        drafts_deleted.inc(reason)
+        log.info("Deleted %s draft for channel %s", reason, channel_id)
+    finally:
+        draft_locks.release(channel_id)
+
+
+async def sweep_drafts():
+    """Unload idle drafts, keep at most MAX_ACTIVE and delete unstarted ones."""
+    now = time.monotonic()
+    for channel_id, used in list(last_used.items()):
+        idle = now - used
+        if idle < min(IDLE_SECONDS, UNSTARTED_SECONDS):
+            break  # Everything after this was used more recently
+        draft = active_drafts.get(channel_id)
+        if draft is None:
+            last_used.pop(channel_id, None)
+        elif draft.phase == 0:
+            # Cheap to keep until it's clear nobody is going to start it
+            if idle >= UNSTARTED_SECONDS:
+                await delete_draft(channel_id, "unstarted", used)
+        elif idle >= IDLE_SECONDS:
+            await unload_draft(channel_id, "idle", used)
+    # Least recently used first
+    for channel_id in list(last_used)[: max(0, len(active_drafts) - MAX_ACTIVE)]:
+        await unload_draft(channel_id, "capacity")
+
+
+async def delete_abandoned_drafts():
+    """Delete saved drafts that haven't changed in ABANDONED_SECONDS."""
+    stale = await asyncio.to_thread(
+        storage.stale_ids, time.time() - ABANDONED_SECONDS, OWNED_GUILDS
+    )
+    for channel_id in stale:
+        if channel_id not in active_drafts:
+            await delete_draft(channel_id, "abandoned")
+
+
+async def sweep_forever():
+    sweeps = 0
+    while True:
+        await asyncio.sleep(SWEEP_SECONDS)
+        try:
+            await sweep_drafts()
+            if sweeps % 60 == 0:  # Scanning storage is slower; do it hourly
+                await delete_abandoned_drafts()
+        except Exception:
+            log.exception("Draft sweep failed")
+        sweeps += 1
+
+
+def start_turn_timer(draft: Draft):
+    """Give whoever acts next draft.turn_seconds, with a reminder halfway."""
+    if not draft.turn_seconds:
+        if draft.deadline is not None:
+            draft.record("deadline_set", reminder=None, deadline=None)
+        timers.cancel(draft.channel_id)
+        return
+    now = time.time()
+    draft.record(
+        "deadline_set",
+        reminder=now + draft.turn_seconds / 2,
+        deadline=now + draft.turn_seconds,
+    )
+    timers.arm(draft.channel_id, draft.reminder)
+
+
+def _duration(seconds: float) -> str:
+    if seconds >= 90:
+        return f"{round(seconds / 60)} minutes"
+    return f"{round(seconds)} second{'' if round(seconds) == 1 else 's'}"
+
+
+class TimerContext:
+    """The parts of a commands.Context the draft commands use, for a turn timer."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.outbox = Outbox(channel)
+
+
+async def on_turn_timer(channel_id: int):
+    """Remind whoever's turn it is, or act for them once their time is up."""
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        return  # Deleted, or in a guild another worker's shards handle
+    ctx = TimerContext(channel)
+    await draft_locks.acquire(channel_id)
+    try:
+        await restore_draft(channel_id)
+        draft = active_drafts.get(channel_id)
+        if draft is None or draft.deadline is None or timers.armed(channel_id):
+            return  # Over, or a command started a new turn while this waited
+        now = time.time()
+        if now < draft.reminder:
+            timers.arm(channel_id, draft.reminder)
+        elif now < draft.deadline:
+            await remind_turn(ctx, draft, draft.deadline - now)
+            timers.arm(channel_id, draft.deadline)
+        else:
+            turn_timeouts.inc(str(draft.phase))
+            await expire_turn(ctx, draft)
+        if channel_id in active_drafts:
+            last_used[channel_id] = time.monotonic()
+            last_used.move_to_end(channel_id)
+        await ctx.outbox.flush()
+    finally:
+        draft_locks.release(channel_id)
+
+
+def waiting_voters(draft: Draft) -> list:
+    """Players who haven't cast their ballot in a simultaneous vote."""
+    return [p for seat, p in enumerate(draft.players) if not draft.voted >> seat & 1]
+
+
+async def remind_turn(ctx, draft: Draft, left: float):
+    if draft.phase == 2 and draft.simultaneous:
+        players = await users.get_many(waiting_voters(draft))
+        mentions = ", ".join(player.mention for player in players)
+        ctx.outbox.add(f"{mentions}: voting closes in {_duration(left)}!")
+        return
+    if draft.phase == 2:
+        player = await users.get(draft.draft_order[draft.current_voter])
+        outcome = "your vote is skipped"
+    else:
+        player = await users.get(draft.snake.current)
+        outcome = "a random pick is made for you"
+    ctx.outbox.add(
+        f"{player.mention}, it's still your turn! In {_duration(left)}, {outcome}."
+    )
+
+
+async def expire_turn(ctx, draft: Draft):
+    """Skip a voter who ran out of time, or pick for a picker who did."""
+    if draft.phase == 2 and draft.simultaneous:
+        waiting = waiting_voters(draft)
+        for player_id in waiting:
+            draft.record("ballot_cast", player_id=player_id, factions=[])
+        players = await users.get_many(waiting)
+        mentions = ", ".join(player.mention for player in players)
+        ctx.outbox.add(f"Time's up! {mentions} didn't vote.")
+        await start_picking(ctx, draft)
+    elif draft.phase == 2:
+        player_id = draft.draft_order[draft.current_voter]
+        draft.record("vote_skipped", player_id=player_id)
+        player = await users.get(player_id)
+        ctx.outbox.add(f"{player.mention} ran out of time and didn't vote.")
+        if not draft.optional_factions or draft.all_voted:
+            await start_picking(ctx, draft)
+        else:
+            next_voter = await users.get(draft.draft_order[draft.current_voter])
+            ctx.outbox.add(f"It's {next_voter.mention}'s turn to vote!")
+            start_turn_timer(draft)
+    elif draft.phase == 3:
+        player_id = draft.snake.current
+        choices = draft.player_choices[player_id]
+        kind = next(
+            (k for k in KINDS if choices[k] is None and draft.snake.available[k]),
+            None,
+        )
+        if kind is None:
+            await advance_picks(ctx, draft)  # Nothing to pick; it skips the turn
+            return
+        value = random.choice(list(draft.snake.available[kind]))
+        draft.record("picked", player_id=player_id, kind=kind, value=value)
+        player = await users.get(player_id)
+        ctx.outbox.add(
+            f"{player.mention} ran out of time, so {OPTION_LABELS[kind](value)} was "
+            f"picked as their {kind}."
+        )
+        await advance_picks(ctx, draft)
+
+
+async def open_thread(ctx):
+    """A new thread for a draft started in ctx's channel, or None to use the channel.
+
+    Threads are channels of their own, so a draft in one is found by the
+    thread's ID like any other draft is by its channel's.
+    """
+    if not DRAFT_THREADS or not isinstance(ctx.channel, discord.TextChannel):
+        return None  # Turned off, or a DM or thread, which can't have threads
+    try:
+        return await ctx.channel.create_thread(
+            name=f"TI4 draft by {ctx.author.display_name}",
+            type=discord.ChannelType.public_thread,
+            auto_archive_duration=THREAD_ARCHIVE_MINUTES,
+        )
+    except discord.HTTPException:
+        log.warning(
+            "Couldn't start a draft thread in %s", ctx.channel.id, exc_info=True
+        )
+        return None
 
 
 @bot.command(name="startdraft")
 async def start_draft(ctx):
-    """Start a new TI4 faction draft."""
+    """Start a new TI4 faction draft, in a thread of its own if threads are on."""
+    # Checked before opening a thread, which is only new if it's opened
     if ctx.channel.id in active_drafts:
-        await ctx.send("A draft is already in progress in this channel!")
+        ctx.outbox.add("A draft is already in progress in this channel!")
         return
 
-    draft = Draft(channel_id=ctx.channel.id)
-    active_drafts[ctx.channel.id] = draft
-    await ctx.send("TI4 Faction Draft started! Use !join to join the draft.")
+    thread = await open_thread(ctx)
+    channel_id = thread.id if thread else ctx.channel.id
+    draft = Draft(channel_id=channel_id)
+    boards.pop(channel_id, None)  # The new draft gets its own board
+    draft.record(
+        "draft_created",
+        guild_id=ctx.guild.id if ctx.guild else None,
+        turn_seconds=TURN_SECONDS,
+    )
+    active_drafts[channel_id] = draft
+    if thread is None:
+        ctx.outbox.add("TI4 Faction Draft started! Use !join to join the draft.")
+        return
+    # finish_command only marks this channel as used, not the new thread
+    last_used[channel_id] = time.monotonic()
+    ctx.outbox.add(f"TI4 Faction Draft started in {thread.mention}! Join it there.")
+    welcome = Outbox(thread)
+    welcome.add("TI4 Faction Draft started! Use !join to join the draft.")
+    await welcome.flush()
+    messages_sent.inc(ctx.command.qualified_name, amount=welcome.sent)
 
 
 @bot.command(name="join")
 async def join_draft(ctx):
     """Join the current draft."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send(
+        ctx.outbox.add(
             "No draft is currently in progress. Use !startdraft to start one!"
         )
         return
 
     draft = active_drafts[ctx.channel.id]
     if ctx.author.id in draft.players:
-        await ctx.send("You've already joined this draft!")
+        ctx.outbox.add("You've already joined this draft!")
         return
 
     if draft.phase != 0:
-        await ctx.send("The draft has already started! You can't join now.")
+        ctx.outbox.add("The draft has already started! You can't join now.")
         return
 
-    draft.players.append(ctx.author.id)
-    draft.player_choices[ctx.author.id] = {
-        "faction": None,
-        "location": None,
-        "strategy": None,
-    }
-    await draft.save()  # Save after joining
-    await ctx.send(
+    draft.record("player_joined", player_id=ctx.author.id)
+    users.put(ctx.author)
+    ctx.outbox.add(
         f"{ctx.author.mention} has joined the draft! ({len(draft.players)} players). To"
         " start the draft, run the command !start"
     )
 
 
+@bot.command(name="ban")
+async def ban_faction(ctx, *, faction: str):
+    """Ban a faction by index or name so it won't be dealt."""
+    if ctx.channel.id not in active_drafts:
+        ctx.outbox.add("No draft is currently in progress!")
+        return
+
+    draft = active_drafts[ctx.channel.id]
+    if draft.phase != 0:
+        ctx.outbox.add("Factions can only be banned before the draft starts!")
+        return
+
+    if ctx.author.id not in draft.players:
+        ctx.outbox.add("You're not part of this draft!")
+        return
+
+    faction_index = resolve_faction(ctx, faction)
+    if faction_index is None:
+        return
+    if faction_index in EXCLUDED_FACTIONS:
+        ctx.outbox.add("This faction isn't in the pool on this server!")
+        return
+
+    if faction_index in draft.banned_factions:
+        ctx.outbox.add("This faction is already banned!")
+        return
+
+    draft.record("faction_banned", faction=faction_index)
+    ctx.outbox.add(
+        f"{ctx.author.mention} has banned {faction_index}: "
+        f"{FACTION_INDEX[faction_index]}."
+    )
+
+
 @bot.command(name="start")
-async def start_drafting(ctx):
-    """Start the actual drafting process."""
+async def start_drafting(ctx, seed: int = None):
+    """Start the actual drafting process, optionally replaying a deal seed."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send(
+        ctx.outbox.add(
             "No draft is currently in progress. Use !startdraft to start one!"
         )
         return
 
     draft: Draft = active_drafts[ctx.channel.id]
     if len(draft.players) < 2:
-        await ctx.send("Need at least 2 players to start drafting!")
+        ctx.outbox.add("Need at least 2 players to start drafting!")
         return
 
-    draft.phase = 1
-    await draft.initialize()
+    # Assign random factions to each player (by index)
+    if seed is None:
+        seed = random.randrange(2**31)
+    try:
+        hands = deal(
+            len(draft.players),
+            FACTION_INDEX,
+            hand_size=HAND_SIZE,
+            seed=seed,
+            exclude=EXCLUDED_FACTIONS | set(draft.banned_factions),
+        )
+    except ValueError:
+        ctx.outbox.add("Too many factions are banned to deal everyone a hand!")
+        return
 
-    # Assign 4 random factions to each player (by index)
-    all_indices = list(FACTION_INDEX.keys())
-    random.shuffle(all_indices)
-    assigned = set()
-    for player_id in draft.players:
-        # Pick 4 factions not already assigned
-        available = [idx for idx in all_indices if idx not in assigned]
-        if len(available) < 4:
-            # Not enough unique factions left, reshuffle unassigned
-            remaining_needed = 4 - len(available)
-            available += random.sample(list(assigned), remaining_needed)
-        player_factions = random.sample(available, 4)
-        draft.player_factions[player_id] = player_factions
-        assigned.update(player_factions)
-
-    await draft.save()  # Save after assigning factions
+    await draft.initialize(seed)  # The seed also picks the same map again
+    draft.record("factions_dealt", hands=hands, seed=seed)
 
     # Send each player their factions (by index)
-    for player_id in draft.players:
-        player = await bot.fetch_user(player_id)
+    for player_id, player in zip(draft.players, await users.get_many(draft.players)):
         indices = draft.player_factions[player_id]
         factions = [f"{idx}: {FACTION_INDEX[idx]}" for idx in indices]
-        await ctx.send(f"{player.mention}, your factions are:\n" + "\n".join(factions))
+        ctx.outbox.add(f"{player.mention}, your factions are:\n" + "\n".join(factions))
 
-    await ctx.send(
+    ctx.outbox.add(f"Deal seed: {seed}")
+    ctx.outbox.add(
         "Phase 1: Each player must select one faction to be selectable and one optional"
-        " faction. Use !select <faction_index> <optional_faction_index>. Use "
+        " faction. Use !select <faction> <optional_faction> (by index or name). Use "
         "!regenerate-map to regenerate the map."
     )
 
 
 @bot.command(name="select")
-async def select_factions(ctx, faction_index: int, optional_faction_index: int):
-    """Select a faction and an optional faction by index."""
+async def select_factions(ctx, faction: str, optional_faction: str):
+    """Select a faction and an optional faction by index or name."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send("No draft is currently in progress!")
+        ctx.outbox.tell("No draft is currently in progress!")
         return
 
     draft = active_drafts[ctx.channel.id]
     if draft.phase != 1:
-        await ctx.send("This command is only available in Phase 1!")
+        ctx.outbox.tell("This command is only available in Phase 1!")
         return
 
     if ctx.author.id not in draft.players:
-        await ctx.send("You're not part of this draft!")
+        ctx.outbox.tell("You're not part of this draft!")
         return
 
     if ctx.author.id in draft.selected_factions:
-        await ctx.send("You've already made your selection!")
+        ctx.outbox.tell("You've already made your selection!")
         return
 
     player_factions = draft.player_factions[ctx.author.id]
+    faction_index = resolve_faction(ctx, faction, within=player_factions)
+    if faction_index is None:
+        return
+    optional_faction_index = resolve_faction(
+        ctx, optional_faction, within=player_factions
+    )
+    if optional_faction_index is None:
+        return
     if (
         faction_index not in player_factions
         or optional_faction_index not in player_factions
     ):
-        await ctx.send("Both factions must be from your assigned factions (by index)!")
+        ctx.outbox.tell("Both factions must be from your assigned factions!")
         return
 
     if faction_index == optional_faction_index:
-        await ctx.send("You must select two different factions!")
+        ctx.outbox.tell("You must select two different factions!")
         return
 
-    draft.selected_factions[ctx.author.id] = [faction_index, optional_faction_index]
-    draft.final_factions.add(faction_index)
-    draft.optional_factions.add(optional_faction_index)
-
-    await draft.save()  # Save after selection
+    draft.record(
+        "selected",
+        player_id=ctx.author.id,
+        faction=faction_index,
+        optional=optional_faction_index,
+    )
 
-    await ctx.send(
+    ctx.outbox.add(
         f"{ctx.author.mention} has selected {faction_index}: "
         f"{FACTION_INDEX[faction_index]} as selectable and {optional_faction_index}: "
         f"{FACTION_INDEX[optional_faction_index]} as optional."
@@ -296,405 +1154,955 @@ async def select_factions(ctx, faction_index: int, optional_faction_index: int):
 
     # Check if all players have made their selections
     if len(draft.selected_factions) == len(draft.players):
-        await ctx.send(
+        ctx.outbox.add(
             "All players have made their selections! Moving to Phase 2: Voting on "
             "optional factions."
         )
         # Set up draft order for voting
-        draft.draft_order = draft.players.copy()
-        random.shuffle(draft.draft_order)
-        draft.current_voter = 0
-        draft.phase = 2
-        await draft.save()  # Save after moving to voting phase
-        await ctx.send(
-            "Use !vote <faction_index> to vote for an optional faction. Voting will "
-            "proceed in draft order. A faction needs 2 votes to be included."
+        draft_order = draft.players.copy()
+        random.shuffle(draft_order)
+        draft.record(
+            "voting_started",
+            draft_order=draft_order,
+            simultaneous=SIMULTANEOUS_VOTING,
         )
-        vote_status = []
-        for idx in sorted(draft.optional_factions):
-            count = len(draft.votes.get(idx, set()))
-            vote_status.append(
-                f"{idx}: {FACTION_INDEX[idx]} ({count} vote{'s' if count != 1 else ''})"
+        if draft.simultaneous:
+            ctx.outbox.add(
+                "Use !vote <faction>, <faction>, ... to vote for any number of "
+                "optional factions, or !vote none. Everyone votes at once and "
+                "a faction needs 2 votes to be included."
             )
-        await ctx.send(
-            "Optional factions available to vote for:\n" + "\n".join(vote_status)
+            ctx.outbox.add(listing(draft, "vote_status"))
+            start_turn_timer(draft)
+            return
+        ctx.outbox.add(
+            "Use !vote <faction> to vote for an optional faction. Voting will "
+            "proceed in draft order. A faction needs 2 votes to be included."
         )
-        await ctx.send("Voting order:")
-        for i, player_id in enumerate(draft.draft_order):
-            player = await bot.fetch_user(player_id)
-            await ctx.send(f"{i+1}. {player.name}")
-        first_voter = await bot.fetch_user(draft.draft_order[0])
-        await ctx.send(f"It's {first_voter.mention}'s turn to vote!")
+        ctx.outbox.add(listing(draft, "vote_status"))
+        ctx.outbox.add("Voting order:")
+        voters = await users.get_many(draft.draft_order)
+        for i, player in enumerate(voters):
+            ctx.outbox.add(f"{i+1}. {player.name}")
+        first_voter = voters[0]
+        ctx.outbox.add(f"It's {first_voter.mention}'s turn to vote!")
+        start_turn_timer(draft)
 
 
 @bot.command(name="vote")
-async def vote_faction(ctx, faction_index: int):
-    """Vote for an optional faction by index, in draft order."""
+async def vote_faction(ctx, *, faction: str):
+    """Vote for an optional faction by index or name, in draft order.
+
+    With simultaneous voting, everyone instead casts one ballot of any number of
+    comma-separated factions, or "none".
+    """
     if ctx.channel.id not in active_drafts:
-        await ctx.send("No draft is currently in progress!")
+        ctx.outbox.tell("No draft is currently in progress!")
         return
 
     draft = active_drafts[ctx.channel.id]
     if draft.phase != 2:
-        await ctx.send("This command is only available in Phase 2!")
+        ctx.outbox.tell("This command is only available in Phase 2!")
         return
 
     if ctx.author.id not in draft.players:
-        await ctx.send("You're not part of this draft!")
+        ctx.outbox.tell("You're not part of this draft!")
+        return
+
+    if draft.simultaneous:
+        await cast_ballot(ctx, draft, faction)
         return
 
     # Only allow the current voter in draft order to vote
     if ctx.author.id != draft.draft_order[draft.current_voter]:
-        current_voter = await bot.fetch_user(draft.draft_order[draft.current_voter])
-        await ctx.send(
+        current_voter = await users.get(draft.draft_order[draft.current_voter])
+        ctx.outbox.tell(
             f"It's not your turn to vote! It's {current_voter.mention}'s turn."
         )
         return
 
+    faction_index = resolve_faction(ctx, faction, within=draft.optional_factions)
+    if faction_index is None:
+        return
     if faction_index not in draft.optional_factions:
-        await ctx.send("This faction is not in the optional pool!")
+        ctx.outbox.tell("This faction is not in the optional pool!")
         return
 
     if faction_index in draft.final_factions:
-        await ctx.send("This faction has already been voted in!")
+        ctx.outbox.tell("This faction has already been voted in!")
         return
 
-    # Initialize votes for this faction if not exists
-    if faction_index not in draft.votes:
-        draft.votes[faction_index] = set()
-
-    # Add vote
-    draft.votes[faction_index].add(ctx.author.id)
+    # Add vote and move to next voter
+    draft.record("voted", player_id=ctx.author.id, faction=faction_index)
 
     # Check if faction has enough votes
-    if len(draft.votes[faction_index]) >= 2:
-        draft.final_factions.add(faction_index)
-        draft.optional_factions.remove(faction_index)
-        await ctx.send(
+    if faction_index in draft.final_factions:
+        ctx.outbox.add(
             f"{faction_index}: {FACTION_INDEX[faction_index]} has received enough votes"
             " and is now selectable!"
         )
 
-    await draft.save()  # Save after voting
-
-    # Move to next voter
-    draft.current_voter += 1
-    if draft.current_voter >= len(draft.draft_order):
-        draft.current_voter = 0
-
     # If all players have voted in this round (one vote per player per round)
-    all_voted = all(
-        any(voter_id in votes for votes in draft.votes.values())
-        for voter_id in draft.draft_order
-    )
-    if not draft.optional_factions or all_voted:
-        await ctx.send(
-            "Voting phase complete! Moving to Phase 3: Snake Draft for Factions, "
-            "Locations, and Strategy Order."
-        )
-        draft.phase = 3
-        await draft.save()  # Save after moving to snake draft
-        # Set up snake draft order (reuse draft.draft_order)
-        await ctx.send("Draft order:")
-        for i, player_id in enumerate(draft.draft_order):
-            player = await bot.fetch_user(player_id)
-            await ctx.send(f"{i+1}. {player.name}")
-        first_player = await bot.fetch_user(draft.draft_order[0])
-        await ctx.send(
-            "Use !pick <faction/location/strategy> <value> to make your selection."
-        )
-        await ctx.send(f"Map URL: {draft.map_url}")
-        available_factions = [
-            f"{idx}: {FACTION_INDEX[idx]}" for idx in sorted(draft.final_factions)
-        ]
-        await ctx.send(
-            "Available factions: "
-            + (", ".join(available_factions) if available_factions else "None")
-        )
-        await ctx.send(
-            "Available locations (1 is the top of the map, 2 is the next clockwise,"
-            " and so on): "
-            + (
-                ", ".join(map(str, draft.available_locations))
-                if draft.available_locations
-                else "None"
-            )
-        )
-        await ctx.send(
-            "Available strategy orders: "
-            + (
-                ", ".join(map(str, draft.available_strategies))
-                if draft.available_strategies
-                else "None"
-            )
-        )
-        await ctx.send(f"It's {first_player.mention}'s turn to pick!")
+    if not draft.optional_factions or draft.all_voted:
+        await start_picking(ctx, draft)
     else:
         # Print the current vote counts for each faction
         vote_counts = {
-            f"{faction_index} - {FACTION_INDEX[faction_index]}": len(votes)
-            for faction_index, votes in draft.votes.items()
+            f"{faction_index} - {FACTION_INDEX[faction_index]}": draft.vote_count(
+                faction_index
+            )
+            for faction_index in draft.votes
         }
-        await ctx.send(
+        ctx.outbox.add(
             f"The vote count is now:\n"
             + "\n".join(
                 f"{faction}: {count} votes" for faction, count in vote_counts.items()
             )
         )
         # Announce next voter
-        next_voter = await bot.fetch_user(draft.draft_order[draft.current_voter])
-        await ctx.send(f"It's {next_voter.mention}'s turn to vote!")
+        next_voter = await users.get(draft.draft_order[draft.current_voter])
+        ctx.outbox.add(f"It's {next_voter.mention}'s turn to vote!")
+        start_turn_timer(draft)
+
+
+async def cast_ballot(ctx, draft: Draft, ballot: str):
+    """Record a player's one ballot in a simultaneous vote."""
+    if draft.has_voted(ctx.author.id):
+        ctx.outbox.tell("You've already voted!")
+        return
+
+    factions = []
+    if ballot.strip().lower() != "none":
+        # Factions already voted in by earlier ballots can still be voted for
+        within = set(draft.optional_factions)
+        within.update(f for f in draft.votes if f in draft.final_factions)
+        for query in ballot.split(","):
+            faction_index = resolve_faction(ctx, query.strip(), within=within)
+            if faction_index is None:
+                return
+            if faction_index not in within:
+                ctx.outbox.tell(
+                    f"{faction_index}: {FACTION_INDEX[faction_index]} is not in the "
+                    "optional pool!"
+                )
+                return
+            if faction_index not in factions:
+                factions.append(faction_index)
+
+    was_optional = [f for f in factions if f in draft.optional_factions]
+    draft.record("ballot_cast", player_id=ctx.author.id, factions=factions)
+
+    ctx.outbox.add(f"{ctx.author.mention} has voted!")
+    for faction_index in was_optional:
+        if faction_index in draft.optional_factions:
+            continue
+        ctx.outbox.add(
+            f"{faction_index}: {FACTION_INDEX[faction_index]} has received enough votes"
+            " and is now selectable!"
+        )
+    if not draft.optional_factions or draft.all_voted:
+        await start_picking(ctx, draft)
+        return
+    waiting = len(draft.players) - draft.voted.bit_count()
+    ctx.outbox.add(f"Waiting for {waiting} more ballot{'s' if waiting > 1 else ''}.")
+
+
+async def start_picking(ctx, draft: Draft):
+    """End the vote and announce the snake draft."""
+    ctx.outbox.add(
+        "Voting phase complete! Moving to Phase 3: Snake Draft for Factions, "
+        "Locations, and Strategy Order."
+    )
+    draft.record("picking_started")
+    # Set up snake draft order (reuse draft.draft_order)
+    ctx.outbox.add("Draft order:")
+    pickers = await users.get_many(draft.draft_order)
+    for i, player in enumerate(pickers):
+        ctx.outbox.add(f"{i+1}. {player.name}")
+    first_player = pickers[0]
+    ctx.outbox.add(
+        "Use !pick <faction/location/strategy> <value> to make your selection."
+    )
+    ctx.outbox.add(listing(draft, "map"))
+    ctx.outbox.add(listing(draft, "available_factions"))
+    ctx.outbox.add(listing(draft, "available_locations"))
+    ctx.outbox.add(listing(draft, "available_strategies"))
+    ctx.outbox.add(f"It's {first_player.mention}'s turn to pick!")
+    start_turn_timer(draft)
 
 
 @bot.command(name="pick")
-async def pick_selection(ctx, selection_type: str, value: str):
+async def pick_selection(ctx, selection_type: str, *, value: str):
     """Pick a faction, location, or strategy order."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send("No draft is currently in progress!")
+        ctx.outbox.tell("No draft is currently in progress!")
         return
 
     draft = active_drafts[ctx.channel.id]
     if draft.phase != 3:
-        await ctx.send("This command is only available in Phase 3!")
+        ctx.outbox.tell("This command is only available in Phase 3!")
         return
 
     if ctx.author.id not in draft.players:
-        await ctx.send("You're not part of this draft!")
+        ctx.outbox.tell("You're not part of this draft!")
         return
 
-    if ctx.author.id != draft.draft_order[draft.current_picker]:
-        await ctx.send("It's not your turn to pick!")
+    if ctx.author.id != draft.snake.current:
+        ctx.outbox.tell("It's not your turn to pick!")
         return
 
     selection_type = selection_type.lower()
     if selection_type not in ["faction", "location", "strategy"]:
-        await ctx.send(
+        ctx.outbox.tell(
             "Invalid selection type! Choose from: faction, location, strategy"
         )
         return
 
     # Check if player has already made this type of selection
     if draft.player_choices[ctx.author.id][selection_type] is not None:
-        await ctx.send(f"You've already selected your {selection_type}!")
+        ctx.outbox.tell(f"You've already selected your {selection_type}!")
         return
 
     # Validate and process the selection
     if selection_type == "faction":
-        try:
-            faction_index = int(value)
-        except ValueError:
-            await ctx.send("Faction must be a number (index)!")
+        faction_index = resolve_faction(
+            ctx, value, within=draft.snake.available["faction"]
+        )
+        if faction_index is None:
             return
-        if faction_index not in draft.final_factions:
-            await ctx.send(
-                "Invalid faction! Choose from the available factions (by index)."
-            )
+        if not draft.snake.can_pick("faction", faction_index):
+            ctx.outbox.tell("Invalid faction! Choose from the available factions.")
             return
-        draft.player_choices[ctx.author.id]["faction"] = faction_index
+        choice = faction_index
     elif selection_type == "location":
         try:
             location = int(value)
-            if location not in draft.available_locations:
-                await ctx.send("Invalid location! Choose from available locations.")
+            if not draft.snake.can_pick("location", location):
+                ctx.outbox.tell("Invalid location! Choose from available locations.")
                 return
-            draft.player_choices[ctx.author.id]["location"] = location
-            draft.available_locations.remove(location)
+            choice = location
         except ValueError:
-            await ctx.send("Location must be a number!")
+            ctx.outbox.tell("Location must be a number!")
             return
     elif selection_type == "strategy":
         try:
             strategy = int(value)
-            if strategy not in draft.available_strategies:
-                await ctx.send(
+            if not draft.snake.can_pick("strategy", strategy):
+                ctx.outbox.tell(
                     "Invalid strategy number! Choose from available strategies."
                 )
                 return
-            draft.player_choices[ctx.author.id]["strategy"] = strategy
-            draft.available_strategies.remove(strategy)
+            choice = strategy
         except ValueError:
-            await ctx.send("Strategy must be a number!")
+            ctx.outbox.tell("Strategy must be a number!")
             return
 
-    await draft.save()  # Save after each pick
+    # Record the pick and move to next picker
+    draft.record("picked", player_id=ctx.author.id, kind=selection_type, value=choice)
 
     if selection_type == "faction":
-        await ctx.send(
+        ctx.outbox.add(
             f"{ctx.author.mention} has selected {faction_index}: "
             f"{FACTION_INDEX[faction_index]} as their faction."
         )
     else:
-        await ctx.send(
+        ctx.outbox.add(
             f"{ctx.author.mention} has selected {value} as their {selection_type}."
         )
-
-    # Move to next picker
-    draft.current_picker += draft.draft_direction
-    if draft.current_picker >= len(draft.draft_order) or draft.current_picker < 0:
-        # End of round: reverse direction and move to next round
-        draft.draft_direction *= -1
-        if draft.draft_direction == 1:
-            draft.draft_round += 1
-            draft.current_picker = 0
-        else:
-            draft.current_picker = len(draft.draft_order) - 1
+    await advance_picks(ctx, draft)
+
+
+async def advance_picks(ctx, draft: Draft):
+    """Make the queued picks of everyone next in line, then announce what's next."""
+    while not draft.snake.done:
+        player_id = draft.snake.current
+        if not draft.snake.has_options(draft.player_choices[player_id]):
+            # Waiting for a pick that can't be made would stall the draft
+            draft.record("pick_skipped", player_id=player_id)
+            player = await users.get(player_id)
+            ctx.outbox.add(
+                f"{player.mention} has nothing left to pick, so their turn was skipped."
+            )
+            continue
+        queued = draft.snake.resolve(
+            draft.player_choices[player_id], draft.queues.get(player_id, {})
+        )
+        if queued is None:
+            break
+        kind, value = queued
+        draft.record("picked", player_id=player_id, kind=kind, value=value)
+        player = await users.get(player_id)
+        ctx.outbox.add(
+            f"{player.mention} has selected {OPTION_LABELS[kind](value)} as their "
+            f"{kind} from their queue."
+        )
 
     # Check if draft is complete
-    all_choices_made = all(
-        all(choice is not None for choice in choices.values())
-        for choices in draft.player_choices.values()
-    )
-
-    if all_choices_made:
-        await ctx.send("Draft complete! Here are the final selections:")
-        for player_id, choices in draft.player_choices.items():
-            player = await bot.fetch_user(player_id)
-            await ctx.send(f"{player.name}:")
+    if draft.snake.done:
+        ctx.outbox.add("Draft complete! Here are the final selections:")
+        players = await users.get_many(draft.player_choices)
+        for player, choices in zip(players, draft.player_choices.values()):
+            ctx.outbox.add(f"{player.name}:")
             if choices["faction"] is not None:
-                await ctx.send(
+                ctx.outbox.add(
                     f"Faction: {choices['faction']}: "
                     f"{FACTION_INDEX[choices['faction']]}"
                 )
             else:
-                await ctx.send(f"Faction: None")
-            await ctx.send(f"Location: {choices['location']}")
-            await ctx.send(f"Strategy Order: {choices['strategy']}")
-        await ctx.send(f"Map URL: {draft.map_url}")
+                ctx.outbox.add(f"Faction: None")
+            ctx.outbox.add(f"Location: {choices['location']}")
+            ctx.outbox.add(f"Strategy Order: {choices['strategy']}")
+        ctx.outbox.add(listing(draft, "map"))
+        draft.record("completed")
+        await draft.save()  # Compact the finished draft into one snapshot
+        await journal.flush()
         del active_drafts[ctx.channel.id]
+        renders.evict(ctx.channel.id)
+        boards.pop(ctx.channel.id, None)
+        timers.cancel(ctx.channel.id)
+        await history.add(draft_record(draft.to_dict(), time.time()))
     else:
-        next_player_id = draft.draft_order[draft.current_picker]
-        next_player = await bot.fetch_user(next_player_id)
+        next_player_id = draft.snake.current
+        next_player = await users.get(next_player_id)
         # Show only categories the next player hasn't picked yet
         choices = draft.player_choices[next_player_id]
         messages = []
         if choices["faction"] is None:
-            picked_factions = [
-                c["faction"]
-                for c in draft.player_choices.values()
-                if c["faction"] is not None
-            ]
-            available_factions = [
-                f"{idx}: {FACTION_INDEX[idx]}"
-                for idx in sorted(draft.final_factions)
-                if idx not in picked_factions
-            ]
-            messages.append(
-                "Available factions: "
-                + (", ".join(available_factions) if available_factions else "None")
-            )
+            messages.append(listing(draft, "available_factions"))
         if choices["location"] is None:
-            messages.append(
-                "Available locations (1 is the top of the map, 2 is the next clockwise,"
-                " and so on): "
-                + (
-                    ", ".join(map(str, draft.available_locations))
-                    if draft.available_locations
-                    else "None"
-                )
-            )
+            messages.append(listing(draft, "available_locations"))
         if choices["strategy"] is None:
-            messages.append(
-                "Available strategy orders: "
-                + (
-                    ", ".join(map(str, draft.available_strategies))
-                    if draft.available_strategies
-                    else "None"
-                )
-            )
+            messages.append(listing(draft, "available_strategies"))
         if messages:
-            await ctx.send("\n".join(messages))
-        await ctx.send(f"It's {next_player.mention}'s turn to pick!")
-        await ctx.send(
+            ctx.outbox.add("\n".join(messages))
+        ctx.outbox.add(f"It's {next_player.mention}'s turn to pick!")
+        ctx.outbox.add(
             "Use !pick <faction/location/strategy> <value> to make your selection."
         )
+        start_turn_timer(draft)
+
+
+@bot.command(name="queue")
+async def queue_picks(ctx, selection_type: str = None, *, values: str = None):
+    """Queue picks to be made for you on your turn, best first, or "none" to clear."""
+    if ctx.channel.id not in active_drafts:
+        ctx.outbox.tell("No draft is currently in progress!")
+        return
+
+    draft = active_drafts[ctx.channel.id]
+    if draft.phase != 3:
+        ctx.outbox.tell("This command is only available in Phase 3!")
+        return
+
+    if ctx.author.id not in draft.players:
+        ctx.outbox.tell("You're not part of this draft!")
+        return
+
+    queue = draft.queues.get(ctx.author.id, {})
+    if selection_type is None:
+        ctx.outbox.tell(
+            "\n".join(
+                f"Your {kind} queue: "
+                + ", ".join(OPTION_LABELS[kind](value) for value in queue[kind])
+                for kind in KINDS
+                if kind in queue
+            )
+            or "Your queue is empty! Use !queue <faction/location/strategy> "
+            "<value>, <value>, ... to add to it."
+        )
+        return
+
+    selection_type = selection_type.lower()
+    if selection_type not in KINDS:
+        ctx.outbox.tell(
+            "Invalid selection type! Choose from: faction, location, strategy"
+        )
+        return
+
+    if draft.player_choices[ctx.author.id][selection_type] is not None:
+        ctx.outbox.tell(f"You've already selected your {selection_type}!")
+        return
+
+    choices = []
+    if values is not None and values.strip().lower() != "none":
+        available = draft.snake.available[selection_type]
+        for value in values.split(","):
+            value = value.strip()
+            if selection_type == "faction":
+                choice = resolve_faction(ctx, value, within=available)
+                if choice is None:
+                    return
+            else:
+                try:
+                    choice = int(value)
+                except ValueError:
+                    ctx.outbox.tell(f"{selection_type.capitalize()} must be a number!")
+                    return
+            if choice not in available:
+                ctx.outbox.tell(
+                    f"{OPTION_LABELS[selection_type](choice)} isn't available to pick!"
+                )
+                return
+            if choice not in choices:
+                choices.append(choice)
+
+    draft.record("queued", player_id=ctx.author.id, kind=selection_type, values=choices)
+    if choices:
+        ctx.outbox.tell(
+            f"Your {selection_type} queue: "
+            + ", ".join(OPTION_LABELS[selection_type](value) for value in choices)
+        )
+    else:
+        ctx.outbox.tell(f"Your {selection_type} queue is cleared!")
+
+    # Queueing on your own turn is as good as picking
+    if ctx.author.id == draft.snake.current and draft.snake.resolve(
+        draft.player_choices[ctx.author.id], draft.queues.get(ctx.author.id, {})
+    ):
+        await advance_picks(ctx, draft)
 
 
 @bot.command(name="load")
 async def load_draft(ctx):
     """Load a draft state from a file."""
     if ctx.channel.id in active_drafts:
-        await ctx.send("A draft is already in progress in this channel!")
+        ctx.outbox.add("A draft is already in progress in this channel!")
         return
 
-    draft = Draft.load(ctx.channel.id)
+    draft = await Draft.load(ctx.channel.id)
     if not draft:
-        await ctx.send("No saved draft found for this channel!")
+        ctx.outbox.add("No saved draft found for this channel!")
+        return
+    if draft.phase == 4:
+        ctx.outbox.add("The saved draft for this channel is already complete!")
         return
 
     active_drafts[ctx.channel.id] = draft
-    await ctx.send("Draft state loaded successfully!")
-    await ctx.send(f"Map URL: {draft.map_url}")
-    await ctx.send(f"Current phase: {draft.phase}")
+    ctx.outbox.add("Draft state loaded successfully!")
+    ctx.outbox.add(listing(draft, "map"))
+    ctx.outbox.add(f"Current phase: {draft.phase}")
 
 
 @bot.command(name="list")
 async def list_factions(ctx):
     """List available factions, locations, and strategies."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send("No draft is currently in progress!")
+        ctx.outbox.add("No draft is currently in progress!")
         return
 
     draft = active_drafts[ctx.channel.id]
     if draft.phase == 1:
         if ctx.author.id in draft.player_factions:
             indices = draft.player_factions[ctx.author.id]
-            await ctx.send(
+            ctx.outbox.add(
                 f"Your factions: "
                 + ", ".join(f"{idx}: {FACTION_INDEX[idx]}" for idx in indices)
             )
         else:
-            await ctx.send("You haven't been assigned factions yet!")
+            ctx.outbox.add("You haven't been assigned factions yet!")
     elif draft.phase == 2:
-        await ctx.send(
-            f"Selectable factions: "
-            + ", ".join(
-                f"{idx}: {FACTION_INDEX[idx]}" for idx in sorted(draft.final_factions)
-            )
-        )
+        ctx.outbox.add(listing(draft, "selectable_factions"))
         if draft.optional_factions:
-            await ctx.send(
-                f"Optional factions (needs votes): "
-                + ", ".join(
-                    f"{idx}: {FACTION_INDEX[idx]}"
-                    for idx in sorted(draft.optional_factions)
-                )
-            )
+            ctx.outbox.add(listing(draft, "optional_factions"))
     elif draft.phase == 3:
-        await ctx.send(
-            f"Available factions: "
-            + ", ".join(
-                f"{idx}: {FACTION_INDEX[idx]}" for idx in sorted(draft.final_factions)
-            )
-        )
-        await ctx.send(
-            "Available locations (1 is the top of the map, 2 is the next clockwise, "
-            f"and so on): {', '.join(map(str, draft.available_locations))}"
-        )
-        await ctx.send(
-            f"Available strategy orders: "
-            f"{', '.join(map(str, draft.available_strategies))}"
-        )
-        await ctx.send(f"Map URL: {draft.map_url}")
+        ctx.outbox.add(listing(draft, "available_factions"))
+        ctx.outbox.add(listing(draft, "available_locations"))
+        ctx.outbox.add(listing(draft, "available_strategies"))
+        ctx.outbox.add(listing(draft, "map"))
     else:
-        await ctx.send("The draft is not in progress!")
+        ctx.outbox.add("The draft is not in progress!")
 
 
 @bot.command(name="regenerate-map")
 async def regenerate_map(ctx):
     """Regenerate the map URL."""
     if ctx.channel.id not in active_drafts:
-        await ctx.send("No draft is currently in progress!")
+        ctx.outbox.add("No draft is currently in progress!")
         return
     if ctx.author.id not in active_drafts[ctx.channel.id].players:
-        await ctx.send("You're not part of this draft!")
+        ctx.outbox.add("You're not part of this draft!")
         return
     if active_drafts[ctx.channel.id].phase != 1:
-        await ctx.send("You can only regenerate the map URL in Phase 1!")
+        ctx.outbox.add("You can only regenerate the map URL in Phase 1!")
         return
 
     draft = active_drafts[ctx.channel.id]
     await draft.initialize()
-    await ctx.send(f"Map URL regenerated: {draft.map_url}")
+    ctx.outbox.add("Map regenerated!")
+    ctx.outbox.add(listing(draft, "map"))
+
+
+@bot.command(name="timer")
+async def set_turn_timer(ctx, minutes: str = None):
+    """Show or set the minutes each vote or pick may take, or "off" for no limit."""
+    if ctx.channel.id not in active_drafts:
+        ctx.outbox.add("No draft is currently in progress!")
+        return
+
+    draft = active_drafts[ctx.channel.id]
+    if minutes is None:
+        if not draft.turn_seconds:
+            ctx.outbox.tell(
+                "Turns have no time limit! Use !timer <minutes> to set one."
+            )
+        elif draft.deadline is not None:
+            left = max(0, draft.deadline - time.time())
+            ctx.outbox.tell(
+                f"Each turn has {_duration(draft.turn_seconds)}; this one has "
+                f"{_duration(left)} left."
+            )
+        else:
+            ctx.outbox.tell(f"Each turn has {_duration(draft.turn_seconds)}.")
+        return
+
+    if ctx.author.id not in draft.players:
+        ctx.outbox.tell("You're not part of this draft!")
+        return
+
+    if minutes.lower() == "off":
+        seconds = 0
+    else:
+        try:
+            seconds = round(float(minutes) * 60)
+        except ValueError:
+            seconds = -1
+        if seconds <= 0:
+            ctx.outbox.tell("Give the time limit in minutes, or off!")
+            return
+
+    draft.record("timer_set", seconds=seconds)
+    if seconds:
+        ctx.outbox.add(f"Each turn now has {_duration(seconds)}.")
+    else:
+        ctx.outbox.add("Turns no longer have a time limit.")
+    if draft.phase in (2, 3):
+        start_turn_timer(draft)  # The current turn starts over with the new limit
+
+
+# Slash commands and the draft board
+boards = {}  # channel_id -> the draft's board message
+
+OPTION_LABELS = {
+    "faction": lambda value: f"{value}: {FACTION_INDEX[value]}",
+    "location": lambda value: f"Location {value}",
+    "strategy": lambda value: f"Strategy order {value}",
+}
+
+
+def select_options(kind: str, values) -> list:
+    # Discord allows at most 25 options in a select menu
+    return [
+        discord.SelectOption(label=OPTION_LABELS[kind](value), value=str(value))
+        for value in list(values)[:25]
+    ]
+
+
+def board_view(channel_id: int):
+    """The board's components for a channel's draft, or None once it's over."""
+    draft = active_drafts.get(channel_id)
+    return None if draft is None else BoardView(draft)
+
+
+async def run_interaction(interaction: discord.Interaction, command, *args, **kw):
+    """Run a draft command for an interaction, showing its output on the board."""
+    outbox = InteractionOutbox(
+        interaction, boards, lambda: board_view(interaction.channel_id)
+    )
+    # Discord wants an answer within 3 seconds, before the draft's lock is free
+    await outbox.acknowledge()
+    ctx = InteractionContext(interaction, command, outbox)
+    await prepare_command(ctx)
+    try:
+        await command.callback(ctx, *args, **kw)
+    except Exception:
+        ctx.command_failed = True
+        raise
+    finally:
+        await finish_command(ctx)
+
+
+async def open_menu(interaction: discord.Interaction, menu):
+    """Show the player their private menus, if menu(draft, player) gives any."""
+    await restore_draft(interaction.channel_id)
+    draft = active_drafts.get(interaction.channel_id)
+    view = None if draft is None else menu(draft, interaction.user.id)
+    if view is None:
+        await interaction.response.send_message(
+            "There's nothing for you to choose right now!", ephemeral=True
+        )
+        return
+    await interaction.response.send_message(view.prompt, view=view, ephemeral=True)
+
+
+class MenuButton(discord.ui.Button):
+    """A board button that opens a player's private menus for the phase."""
+
+    def __init__(self, label: str, custom_id: str, menu):
+        super().__init__(
+            label=label, style=discord.ButtonStyle.primary, custom_id=custom_id
+        )
+        self.menu = menu  # (draft, player_id) -> the player's menus, or None
+
+    async def callback(self, interaction: discord.Interaction):
+        await open_menu(interaction, self.menu)
+
+
+def hand_menu(draft: Draft, player_id: int):
+    if (
+        draft.phase != 1
+        or player_id not in draft.player_factions
+        or player_id in draft.selected_factions
+    ):
+        return None
+    return HandView(draft.player_factions[player_id])
+
+
+def vote_menu(draft: Draft, player_id: int):
+    if (
+        draft.phase != 2
+        or not draft.optional_factions
+        or player_id not in draft.players
+    ):
+        return None
+    if draft.simultaneous:
+        # Factions voted in by earlier ballots can still be voted for
+        factions = sorted({*draft.optional_factions, *draft.votes})
+        return MenuView(
+            "Vote for any optional factions:",
+            VoteSelect(select_options("faction", factions), ballot=True),
+        )
+    if player_id != draft.draft_order[draft.current_voter]:
+        return None
+    return MenuView(
+        "Vote for an optional faction:",
+        VoteSelect(select_options("faction", draft.optional_factions)),
+    )
+
+
+def pick_menu(draft: Draft, player_id: int):
+    if draft.phase != 3 or draft.snake.done or player_id != draft.snake.current:
+        return None
+    # Only what the picker still has to pick
+    choices = draft.player_choices[player_id]
+    return MenuView(
+        "Make your pick:",
+        *(
+            PickSelect(kind, select_options(kind, draft.snake.available[kind]))
+            for kind in KINDS
+            if choices[kind] is None and draft.snake.available[kind]
+        ),
+    )
+
+
+class MenuView(discord.ui.View):
+    """A player's private menus, shown only to them."""
+
+    def __init__(self, prompt: str, *items):
+        super().__init__(timeout=600)
+        self.prompt = prompt
+        for item in items:
+            self.add_item(item)
+
+
+class HandSelect(discord.ui.Select):
+    def __init__(self, role: str, placeholder: str, hand):
+        super().__init__(
+            placeholder=placeholder, options=select_options("faction", hand)
+        )
+        self.role = role
+
+    async def callback(self, interaction: discord.Interaction):
+        chosen = self.view.chosen
+        chosen[self.role] = self.values[0]
+        if len(chosen) < 2:
+            await interaction.response.defer()
+            return
+        await run_interaction(
+            interaction, select_factions, chosen["faction"], chosen["optional"]
+        )
+
+
+class HandView(MenuView):
+    """A player's private Phase 1 menus; the selection is made once both are set."""
+
+    def __init__(self, hand):
+        super().__init__(
+            "Choose a selectable faction and an optional faction:",
+            HandSelect("faction", "Selectable faction", hand),
+            HandSelect("optional", "Optional faction", hand),
+        )
+        self.chosen = {}  # "faction"/"optional" -> faction index as a string
+
+
+class VoteSelect(discord.ui.Select):
+    def __init__(self, options: list, ballot: bool = False):
+        if ballot:
+            # A simultaneous vote: any number of factions, none to abstain
+            super().__init__(
+                placeholder="Vote for any optional factions",
+                options=options,
+                min_values=0,
+                max_values=len(options),
+            )
+        else:
+            super().__init__(
+                placeholder="Vote for an optional faction", options=options
+            )
+
+    async def callback(self, interaction: discord.Interaction):
+        ballot = ",".join(self.values) or "none"
+        await run_interaction(interaction, vote_faction, faction=ballot)
+
+
+class PickSelect(discord.ui.Select):
+    def __init__(self, kind: str, options: list):
+        super().__init__(placeholder=f"Pick your {kind}", options=options)
+        self.kind = kind
+
+    async def callback(self, interaction: discord.Interaction):
+        await run_interaction(
+            interaction, pick_selection, self.kind, value=self.values[0]
+        )
+
+
+class BoardView(discord.ui.View):
+    """The button on a draft's board that opens each player's menus for the phase.
+
+    The menus themselves are ephemeral, so only the player they're for sees
+    (and can use) them.
+    """
+
+    def __init__(self, draft: Draft = None):
+        super().__init__(timeout=None)
+        if draft is None or draft.phase == 1:
+            self.add_item(MenuButton("Choose my factions", "draft:hand", hand_menu))
+        if draft is None or draft.phase == 2 and draft.optional_factions:
+            self.add_item(MenuButton("Vote", "draft:vote", vote_menu))
+        if draft is None or draft.phase == 3 and not draft.snake.done:
+            self.add_item(MenuButton("Make my pick", "draft:pick", pick_menu))
+        # With no draft, every button, so bot.add_view routes clicks on old boards
+
+
+async def value_choices(interaction: discord.Interaction, current: str) -> list:
+    """Autocomplete the values the player can choose in the draft right now."""
+    await restore_draft(interaction.channel_id)
+    draft = active_drafts.get(interaction.channel_id)
+    if draft is None:
+        return []
+    if interaction.command.name == "select":
+        kind, values = "faction", draft.player_factions.get(interaction.user.id, ())
+    elif interaction.command.name == "vote":
+        kind, values = "faction", draft.optional_factions
+    elif draft.snake is not None:
+        kind = interaction.namespace.kind or "faction"
+        values = draft.snake.available[kind]
+    else:
+        return []
+    current = current.lower()
+    labels = ((value, OPTION_LABELS[kind](value)) for value in values)
+    return [
+        app_commands.Choice(name=label, value=str(value))
+        for value, label in labels
+        if current in label.lower()
+    ][:25]
+
+
+@bot.tree.command(name="select", description="Select a faction and an optional one")
+@app_commands.autocomplete(faction=value_choices, optional_faction=value_choices)
+async def select_slash(
+    interaction: discord.Interaction, faction: str, optional_faction: str
+):
+    await run_interaction(interaction, select_factions, faction, optional_faction)
+
+
+@bot.tree.command(name="vote", description="Vote for an optional faction")
+@app_commands.autocomplete(faction=value_choices)
+async def vote_slash(interaction: discord.Interaction, faction: str):
+    await run_interaction(interaction, vote_faction, faction=faction)
+
+
+@bot.tree.command(name="pick", description="Pick a faction, location or strategy")
+@app_commands.choices(kind=[app_commands.Choice(name=k, value=k) for k in KINDS])
+@app_commands.autocomplete(value=value_choices)
+async def pick_slash(interaction: discord.Interaction, kind: str, value: str):
+    await run_interaction(interaction, pick_selection, kind, value=value)
+
+
+@bot.tree.command(name="queue", description="Queue picks to be made on your turn")
+@app_commands.choices(kind=[app_commands.Choice(name=k, value=k) for k in KINDS])
+@app_commands.describe(values='Comma-separated, best first, or "none" to clear')
+async def queue_slash(interaction: discord.Interaction, kind: str, values: str):
+    await run_interaction(interaction, queue_picks, kind, values=values)
+
+
+@bot.tree.command(name="board", description="Post the draft board in this channel")
+async def board_slash(interaction: discord.Interaction):
+    boards.pop(interaction.channel_id, None)  # Replace any older board
+    await run_interaction(interaction, list_factions)
+
+
+def _ms(seconds: float) -> str:
+    return "?" if seconds != seconds else f"≤{seconds * 1000:g} ms"
+
+
+@bot.group(name="stats", invoke_without_command=True)
+@commands.has_guild_permissions(manage_guild=True)
+async def show_stats(ctx):
+    """Show what the bot has been doing since it started (server managers only)."""
+    uptime = int(time.monotonic() - started_at)
+    by_phase = drafts_by_phase()
+    ctx.outbox.add(
+        f"Up {uptime // 3600}h {uptime // 60 % 60}m. Active drafts: "
+        + ", ".join(f"phase {phase}: {count}" for (phase,), count in by_phase.items())
+        + f". Saved drafts not loaded yet: {len(saved_drafts)}."
+    )
+    lines = []
+    for (name,) in sorted(command_seconds.values):
+        lines.append(
+            f"!{name}: {command_seconds.count(name)} call(s), "
+            f"p50 {_ms(command_seconds.quantile(0.5, name))}, "
+            f"p99 {_ms(command_seconds.quantile(0.99, name))}, "
+            f"{command_errors.get(name):g} error(s), "
+            f"{messages_sent.get(name):g} message(s)"
+        )
+    ctx.outbox.add("Commands:\n" + ("\n".join(lines) or "None yet"))
+    ctx.outbox.add(
+        f"Player lookups: {users.hits} cached, {users.gateway_hits} from the gateway, "
+        f"{users.rest_lookups} fetch_user call(s)."
+    )
+    ctx.outbox.add(
+        f"Storage: {storage_write_seconds.count()} write(s), "
+        f"{journal.bytes_written / 1024:.1f} KiB, "
+        f"p99 write {_ms(storage_write_seconds.quantile(0.99))}."
+    )
+    ctx.outbox.add(
+        f"Drafts unloaded: {sum(drafts_unloaded.values.values()):g}, "
+        f"reloaded: {drafts_reloaded.get():g}, "
+        f"deleted: {sum(drafts_deleted.values.values()):g}."
+    )
+
+
+def _share(rate) -> str:
+    return "n/a" if rate is None else f"{rate:.0%}"
+
+
+@show_stats.command(name="factions")
+# A group's checks don't cover its subcommands
+@commands.has_guild_permissions(manage_guild=True)
+async def show_faction_stats(ctx):
+    """Show how each faction has fared in this server's finished drafts."""
+    totals = await history.totals(ctx.guild.id if ctx.guild else None)
+    if not totals.drafts:
+        ctx.outbox.add("No drafts have finished in this server yet!")
+        return
+    ctx.outbox.add(
+        f"Factions over {totals.drafts} finished draft(s), most picked first. Pick "
+        "rate is out of the drafts a faction was in, vote-in rate out of the times "
+        "it was optional:"
+    )
+    dealt = totals.factions["dealt"]
+    lines = []
+    for faction in sorted(dealt, key=lambda f: (-totals.factions["picked"][f], f)):
+        line = (
+            f"{faction}: {FACTION_INDEX.get(faction, '?')}: dealt {dealt[faction]}, "
+            f"picked {totals.factions['picked'][faction]} "
+            f"({_share(totals.rate('picked', 'pooled', faction))}), voted in "
+            f"{_share(totals.rate('voted_in', 'optional', faction))} of "
+            f"{totals.factions['optional'][faction]}"
+        )
+        if faction in totals.locations and faction in totals.strategies:
+            location = totals.locations[faction].most_common(1)[0][0]
+            strategy = totals.strategies[faction].most_common(1)[0][0]
+            line += f", most often location {location} and strategy order {strategy}"
+        lines.append(line)
+    ctx.outbox.add("\n".join(lines))
+
+
+@bot.command(name="history")
+async def show_history(ctx, count: int = 5):
+    """Show the last drafts finished in this server, newest first."""
+    totals = await history.totals(ctx.guild.id if ctx.guild else None)
+    if not totals.drafts:
+        ctx.outbox.add("No drafts have finished in this server yet!")
+        return
+    records = totals.recent[::-1][: max(1, count)]
+    ctx.outbox.add(
+        f"Last {len(records)} of {totals.drafts} finished draft(s) in this server:"
+    )
+    player_ids = list(dict.fromkeys(p for r in records for p, *_ in r["picks"]))
+    names = {p.id: p.name for p in await users.get_many(player_ids)}
+    for record in records:
+        finished = record["finished_at"]
+        lines = [
+            f"<#{record['channel_id']}>"
+            + (f", <t:{int(finished)}:R>" if finished else "")
+            + f" (deal seed {record['deal_seed']}):"
+        ]
+        for player_id, faction, location, strategy in record["picks"]:
+            lines.append(
+                f"{names.get(player_id, player_id)}: "
+                + (
+                    f"{faction}: {FACTION_INDEX.get(faction, '?')}"
+                    if faction is not None
+                    else "-"
+                )
+                + f", location {location}, strategy order {strategy}"
+            )
+        ctx.outbox.add("\n".join(lines))
+
+
+# Fairness simulations of this server's draft rules
+SIMULATE_MAX_DRAFTS = 1_000_000
+simulator = DraftSimulator(
+    [index for index in FACTION_INDEX if index not in EXCLUDED_FACTIONS],
+    hand_size=HAND_SIZE,
+    ratings=(
+        load_ratings(os.environ["DRAFT_FACTION_RATINGS"], catalog)
+        if os.getenv("DRAFT_FACTION_RATINGS")
+        else None
+    ),
+    simultaneous=SIMULTANEOUS_VOTING,
+)
+
+
+@bot.command(name="simulate")
+@commands.has_guild_permissions(manage_guild=True)
+async def simulate_drafts(ctx, drafts: int = 100_000, players: int = None):
+    """Simulate many drafts under this server's rules and report how fair they are."""
+    if players is None:
+        draft = active_drafts.get(ctx.channel.id)
+        players = len(draft.players) if draft and len(draft.players) >= 2 else 6
+    if not 2 <= players <= 8:
+        ctx.outbox.tell("Simulations need 2 to 8 players!")
+        return
+    drafts = max(1, min(drafts, SIMULATE_MAX_DRAFTS))
+
+    result = await asyncio.to_thread(simulator.run, drafts, players)
+    ctx.outbox.add(
+        f"Simulated {drafts} drafts of {players} players in {result.seconds:.1f} s."
+    )
+    by_final = sorted(
+        range(len(result.factions)), key=lambda column: -result.final[column]
+    )
+
+    def shares(columns):
+        return ", ".join(
+            f"{FACTION_INDEX[result.factions[column]]} {result.final[column]:.1%}"
+            for column in columns
+        )
+
+    ctx.outbox.add(f"Most often in the draft: {shares(by_final[:3])}")
+    ctx.outbox.add(f"Least often in the draft: {shares(by_final[:-4:-1])}")
+    ctx.outbox.add(f"Optional factions voted in: {result.optional_voted_in:.1%}")
+    ctx.outbox.add(
+        "Faction pick by position (got their favourite, average factions they "
+        "liked better):\n"
+        + "\n".join(
+            f"{position + 1}: {result.first_choice[position]:.1%}, "
+            + (f"{rank:.2f}" if rank == rank else "n/a")  # NaN: never got a faction
+            for position, rank in enumerate(result.mean_rank)
+        )
+    )
 
 
 def main():
@@ -0,0 +1,254 @@
+"""Archive of finished drafts, with running totals per guild.
+
+Every finished draft is appended as one line to its guild's history file,
+which is never rewritten. Beside it each guild keeps a small totals file:
+how often each faction was dealt, selected, offered as optional, voted in,
+put in the draft and picked, the locations and strategy orders it was
+picked with, and the guild's last few drafts. The totals are updated as each
+draft is archived, so a guild's stats cost one small read however many
+drafts it has played. They remember how much of the history file they
+include and catch up on anything after that (e.g. after a crash) on load.
+
+A guild's events all go to one shard, so when the bot runs as several
+worker processes each guild's files are only written by one of them.
+
+Drafts finished before the archive existed can be imported from storage
+by running this module once:
+
+Usage: python src/history.py [--storage json|sqlite] [--path PATH]
+       [--history DIR]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from persistence import open_storage, write_atomic
+
+log = logging.getLogger("drafter.history")
+
+RECENT = 10  # Finished drafts kept with each guild's totals for !history
+# What's counted per faction; see draft_record
+METRICS = ("dealt", "selected", "optional", "voted_in", "pooled", "picked")
+
+
+def draft_record(snapshot: dict, finished_at: float = None) -> dict:
+    """What's archived of a finished draft, from its Draft.to_dict snapshot."""
+    selected = {faction for faction, _ in snapshot["selected_factions"].values()}
+    # An optional faction someone else selected was in the draft without votes
+    optional = {opt for _, opt in snapshot["selected_factions"].values()} - selected
+    votes = snapshot["votes"]
+    choices = snapshot["player_choices"]
+    return {
+        "channel_id": snapshot["channel_id"],
+        "guild_id": snapshot.get("guild_id"),
+        "finished_at": finished_at,
+        "deal_seed": snapshot.get("deal_seed"),
+        "map_string": snapshot.get("map_string", ""),
+        "dealt": sorted(
+            f for hand in snapshot["player_factions"].values() for f in hand
+        ),
+        "selected": sorted(selected),
+        "optional": sorted(optional),
+        "voted_in": sorted(f for f in optional if len(set(votes.get(f, ()))) >= 2),
+        "pooled": sorted(snapshot["final_factions"]),
+        # [player_id, faction, location, strategy] in draft order
+        "picks": [
+            [p, choices[p]["faction"], choices[p]["location"], choices[p]["strategy"]]
+            for p in snapshot["draft_order"]
+        ],
+    }
+
+
+def _pairs(counter: Counter) -> list:
+    return sorted(counter.items())
+
+
+@dataclass
+class GuildHistory:
+    """Running totals of one guild's finished drafts."""
+
+    drafts: int = 0
+    covered: int = 0  # Bytes of the guild's history file included here
+    factions: dict = field(
+        default_factory=lambda: {metric: Counter() for metric in METRICS}
+    )  # metric -> Counter of faction -> drafts
+    locations: dict = field(default_factory=dict)  # faction -> Counter of location
+    strategies: dict = field(default_factory=dict)  # faction -> Counter of strategy
+    recent: list = field(default_factory=list)  # Last RECENT records, oldest first
+
+    def add(self, record: dict):
+        """Count one more finished draft."""
+        self.drafts += 1
+        for metric in METRICS[:-1]:
+            self.factions[metric].update(record[metric])
+        for _, faction, location, strategy in record["picks"]:
+            if faction is None:
+                continue
+            self.factions["picked"][faction] += 1
+            if location is not None:
+                self.locations.setdefault(faction, Counter())[location] += 1
+            if strategy is not None:
+                self.strategies.setdefault(faction, Counter())[strategy] += 1
+        self.recent = self.recent[-(RECENT - 1) :] + [record]
+
+    def rate(self, metric: str, of: str, faction: int):
+        """How often a faction counted in `of` was also counted in `metric`."""
+        total = self.factions[of][faction]
+        return self.factions[metric][faction] / total if total else None
+
+    def to_dict(self) -> dict:
+        # JSON keys can only be strings, so int-keyed counts are stored as pairs
+        return {
+            "drafts": self.drafts,
+            "covered": self.covered,
+            "factions": {m: _pairs(counts) for m, counts in self.factions.items()},
+            "locations": [[f, _pairs(c)] for f, c in sorted(self.locations.items())],
+            "strategies": [[f, _pairs(c)] for f, c in sorted(self.strategies.items())],
+            "recent": self.recent,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            drafts=data["drafts"],
+            covered=data["covered"],
+            factions={
+                metric: Counter(dict(data["factions"].get(metric, [])))
+                for metric in METRICS
+            },
+            locations={f: Counter(dict(c)) for f, c in data["locations"]},
+            strategies={f: Counter(dict(c)) for f, c in data["strategies"]},
+            recent=data["recent"],
+        )
+
+
+class HistoryArchive:
+    """Finished drafts and their totals, as two files per guild in one directory."""
+
+    def __init__(self, directory: str = "history", cache_size: int = 256):
+        self.directory = directory
+        self.cache_size = cache_size  # Guilds whose totals are kept in memory
+        self._totals = OrderedDict()  # guild -> GuildHistory, least recent first
+        self._lock = asyncio.Lock()
+        self.archived = 0  # Drafts archived since start
+
+    def _path(self, guild_id, suffix: str) -> str:
+        return os.path.join(self.directory, f"{guild_id or 0}.{suffix}")
+
+    def _load(self, guild_id) -> GuildHistory:
+        """Read a guild's totals and count anything archived after they were written.
+
+        Runs in a worker thread.
+        """
+        try:
+            with open(self._path(guild_id, "totals.json"), "r") as f:
+                totals = GuildHistory.from_dict(json.load(f))
+        except FileNotFoundError:
+            totals = GuildHistory()
+        try:
+            with open(self._path(guild_id, "jsonl"), "rb") as f:
+                f.seek(totals.covered)
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-append can only tear the last line
+                        log.warning("Ignoring torn history entry for %s", guild_id)
+                        break
+                    totals.add(record)
+                    totals.covered += len(line)
+        except FileNotFoundError:
+            pass
+        return totals
+
+    def _append(self, guild_id, record: dict, covered: int) -> int:
+        """Append a record to a guild's history; returns the file's new size.
+
+        Runs in a worker thread.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(guild_id, "jsonl"), "ab") as f:
+            if f.tell() > covered:
+                f.truncate(covered)  # Drop a line torn by a crash
+            f.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    async def _get(self, guild_id) -> GuildHistory:
+        totals = self._totals.get(guild_id)
+        if totals is None:
+            totals = await asyncio.to_thread(self._load, guild_id)
+            self._totals[guild_id] = totals
+            while len(self._totals) > self.cache_size:
+                self._totals.popitem(last=False)
+        self._totals.move_to_end(guild_id)
+        return totals
+
+    async def totals(self, guild_id) -> GuildHistory:
+        """A guild's totals, read from disk only the first time they're needed."""
+        async with self._lock:
+            return await self._get(guild_id)
+
+    async def add(self, record: dict):
+        """Archive a finished draft and add it to its guild's totals."""
+        guild_id = record["guild_id"]
+        async with self._lock:
+            try:
+                totals = await self._get(guild_id)
+                end = await asyncio.to_thread(
+                    self._append, guild_id, record, totals.covered
+                )
+                totals.add(record)
+                totals.covered = end
+                text = json.dumps(totals.to_dict(), separators=(",", ":"))
+                await asyncio.to_thread(
+                    write_atomic, self._path(guild_id, "totals.json"), text
+                )
+            except OSError:
+                # The history file is the record; totals catch up when next loaded
+                log.exception(
+                    "Failed to archive draft for channel %s", record["channel_id"]
+                )
+                self._totals.pop(guild_id, None)
+                return
+            self.archived += 1
+
+
+async def import_finished(storage, archive: HistoryArchive) -> int:
+    """Archive every finished draft in storage, returning how many there were.
+
+    Only drafts whose final state is in a snapshot are found, which is every
+    draft the bot finished.
+    """
+    count = 0
+    for channel_id in storage.channel_ids():
+        snapshot, _ = storage.read(channel_id)
+        if snapshot is not None and snapshot["phase"] == 4:
+            await archive.add(draft_record(snapshot))
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive drafts finished so far.")
+    parser.add_argument("--storage", default="json", choices=("json", "sqlite"))
+    parser.add_argument("--path", help="draft directory or database")
+    parser.add_argument("--history", default="history", help="archive directory")
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, args.path)
+    try:
+        count = asyncio.run(import_finished(storage, HistoryArchive(args.history)))
+    finally:
+        storage.close()
+    print(f"Archived {count} finished draft(s) in {args.history}")
+
+
+if __name__ == "__main__":
+    main()
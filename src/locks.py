@@ -0,0 +1,32 @@
+"""Per-draft locks so each draft handles one command at a time."""
+
+import asyncio
+
+
+class KeyedLocks:
+    """One asyncio.Lock per key, dropped again once nobody holds or awaits it."""
+
+    def __init__(self):
+        self._locks = {}  # key -> [lock, holders + waiters]
+
+    async def acquire(self, key):
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._unref(key)
+            raise
+
+    def release(self, key):
+        self._locks[key][0].release()
+        self._unref(key)
+
+    def _unref(self, key):
+        entry = self._locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
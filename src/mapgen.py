@@ -0,0 +1,246 @@
+"""Balanced map generation from a local tile catalog.
+
+A map is the 36 hexes around Mecatol Rex, three rings deep, with the players'
+home systems spread around the outer ring and system tiles everywhere else.
+Each system tile is shared between the homes closest to it, counting less
+the further away it is, which gives every seat a weighted share of the map's
+resources, influence, wormholes and anomalies.
+
+Thousands of random layouts are scored at once as NumPy arrays. The best
+few are then improved by swapping tiles around and in from the unused ones
+until no single swap helps, and the layout whose seats are most alike wins.
+A seed picks the same map every time.
+
+A layout's score is the gap between its richest and poorest seat in each
+feature, as a share of the most one tile can have of it, weighted so that
+resources and influence come first and wormholes and anomalies only break
+ties between otherwise even maps.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+
+import numpy as np
+
+RINGS = 3
+# Flat-topped axial hex directions, walking clockwise around a ring from the top
+RING_WALK = ((1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1))
+FEATURES = ("resources", "influence", "wormholes", "anomalies")
+# How much an uneven spread of each feature counts against a layout
+FEATURE_WEIGHTS = np.array([1.0, 1.0, 0.2, 0.2])
+# A tile's value to a home system by distance; adjacent tiles matter most
+DISTANCE_WEIGHTS = {1: 1.0, 2: 0.75, 3: 0.5}
+BLUE_SHARE = 0.6  # Share of system tiles with planets, as on the standard map
+REFINE = 8  # Best random layouts improved by swapping tiles
+MAX_SWAPS = 200  # Most swaps made to improve one layout
+
+
+def positions() -> list:
+    """Axial coordinates of every hex around Mecatol, in map string order."""
+    hexes = []
+    for ring in range(1, RINGS + 1):
+        q, r = 0, -ring  # The top of the ring
+        for dq, dr in RING_WALK:
+            for _ in range(ring):
+                hexes.append((q, r))
+                q, r = q + dq, r + dr
+    return hexes
+
+
+def distance(a: tuple, b: tuple) -> int:
+    dq, dr = a[0] - b[0], a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+@dataclass(frozen=True)
+class Tile:
+    number: int
+    resources: int
+    influence: int
+    wormholes: int
+    anomaly: bool
+    blue: bool  # Has planets and isn't an anomaly
+
+
+class TileCatalog:
+    """The system tiles a map can be built from, as arrays for scoring."""
+
+    def __init__(self, tiles: list):
+        self.tiles = tiles
+        self.rows = {tile.number: row for row, tile in enumerate(tiles)}
+        self.stats = np.array(
+            [
+                [tile.resources, tile.influence, tile.wormholes, tile.anomaly]
+                for tile in tiles
+            ],
+            dtype=np.float64,
+        )
+        self.blue = np.array([i for i, tile in enumerate(tiles) if tile.blue])
+        self.red = np.array([i for i, tile in enumerate(tiles) if not tile.blue])
+        self.is_blue = np.array([tile.blue for tile in tiles])
+        # The most of each feature one tile has, the unit spreads are scored in
+        self.scale = np.maximum(self.stats.max(axis=0), 1)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r") as f:
+            data = json.load(f)
+        tiles = []
+        for entry in data["tiles"]:
+            planets = entry.get("planets", [])
+            anomaly = "anomaly" in entry
+            tiles.append(
+                Tile(
+                    number=entry["number"],
+                    resources=sum(planet["resources"] for planet in planets),
+                    influence=sum(planet["influence"] for planet in planets),
+                    wormholes=len(entry.get("wormholes", [])),
+                    anomaly=anomaly,
+                    blue=bool(planets) and not anomaly,
+                )
+            )
+        return cls(tiles)
+
+
+@dataclass
+class GeneratedMap:
+    seed: int
+    tiles: list  # Tile number per position in map string order, 0 for homes
+    seats: np.ndarray  # Weighted FEATURES per seat, clockwise from the top
+    score: float  # Lower is more balanced
+
+    @property
+    def map_string(self) -> str:
+        """The layout as a space-separated map string, Mecatol and homes left out."""
+        return " ".join(map(str, self.tiles))
+
+
+class MapGenerator:
+    """Picks the most balanced of many random layouts for a player count."""
+
+    def __init__(self, catalog: TileCatalog, candidates: int = 4096):
+        self.catalog = catalog
+        self.candidates = candidates
+        # player_count -> (home positions, system positions, weights)
+        self._layouts = {}
+
+    def layout(self, player_count: int):
+        """Home and system positions, and each system's weight to each seat."""
+        if player_count in self._layouts:
+            return self._layouts[player_count]
+        hexes = positions()
+        outer = len(hexes) - 6 * RINGS  # Index of the outer ring's top hex
+        # Seat 1 is at the top, the rest evenly spaced clockwise
+        homes = [
+            outer + int(seat * 6 * RINGS / player_count + 0.5)
+            for seat in range(player_count)
+        ]
+        systems = [i for i in range(len(hexes)) if i not in homes]
+        weights = np.zeros((len(systems), player_count))
+        for row, position in enumerate(systems):
+            distances = [distance(hexes[position], hexes[home]) for home in homes]
+            nearest = min(distances)
+            if nearest not in DISTANCE_WEIGHTS:
+                continue
+            seats = [seat for seat, d in enumerate(distances) if d == nearest]
+            for seat in seats:
+                weights[row, seat] = DISTANCE_WEIGHTS[nearest] / len(seats)
+        # Homes can't be evenly spaced for every player count, which leaves some
+        # seats with more hexes nearby; scale every seat's slice to the same size
+        weights *= weights.sum(axis=0).mean() / weights.sum(axis=0)
+        self._layouts[player_count] = homes, systems, weights
+        return self._layouts[player_count]
+
+    def score(self, seats: np.ndarray) -> np.ndarray:
+        """Scores of (..., seat, feature) seat values; lower is more balanced."""
+        spread = (seats.max(axis=-2) - seats.min(axis=-2)) / self.catalog.scale
+        return spread @ FEATURE_WEIGHTS
+
+    def refine(self, tiles: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Improve a layout by the best single swap at a time until none helps.
+
+        A swap exchanges two placed tiles, or replaces a placed tile with an
+        unused one of the same colour.
+        """
+        stats = self.catalog.stats
+        tiles = tiles.copy()
+        count = len(tiles)
+        first, second = np.triu_indices(count, 1)
+        for _ in range(MAX_SWAPS):
+            seats = weights.T @ stats[tiles]
+            unused = np.setdiff1d(np.arange(len(stats)), tiles)
+            # Seat changes from exchanging the tiles at two positions...
+            exchanges = (
+                seats
+                + (weights[first] - weights[second])[:, :, None]
+                * (stats[tiles[second]] - stats[tiles[first]])[:, None, :]
+            )
+            # ...and from putting an unused tile at a position
+            position, spare = np.divmod(np.arange(count * len(unused)), len(unused))
+            same_colour = (
+                self.catalog.is_blue[tiles[position]]
+                == self.catalog.is_blue[unused[spare]]
+            )
+            position, spare = position[same_colour], spare[same_colour]
+            replacements = (
+                seats
+                + weights[position][:, :, None]
+                * (stats[unused[spare]] - stats[tiles[position]])[:, None, :]
+            )
+            scores = self.score(np.concatenate([exchanges, replacements]))
+            best = int(scores.argmin())
+            if scores[best] >= self.score(seats) - 1e-9:
+                break
+            if best < len(first):
+                i, j = first[best], second[best]
+                tiles[i], tiles[j] = tiles[j], tiles[i]
+            else:
+                best -= len(first)
+                tiles[position[best]] = unused[spare[best]]
+        return tiles
+
+    def generate(self, player_count: int, seed: int = None) -> GeneratedMap:
+        """The most balanced of self.candidates random layouts."""
+        if seed is None:
+            seed = random.randrange(2**32)
+        homes, systems, weights = self.layout(player_count)
+        blue_count = round(len(systems) * BLUE_SHARE)
+        red_count = len(systems) - blue_count
+        catalog = self.catalog
+        if blue_count > len(catalog.blue) or red_count > len(catalog.red):
+            raise ValueError(f"Not enough tiles for a {player_count} player map")
+
+        rng = np.random.default_rng(seed)
+        n = self.candidates
+        # Random tiles of each colour per candidate, then shuffled into place
+        blue = catalog.blue[rng.random((n, len(catalog.blue))).argsort(axis=1)]
+        red = catalog.red[rng.random((n, len(catalog.red))).argsort(axis=1)]
+        tiles = np.concatenate([blue[:, :blue_count], red[:, :red_count]], axis=1)
+        order = rng.random(tiles.shape).argsort(axis=1)
+        tiles = np.take_along_axis(tiles, order, axis=1)  # (candidate, system)
+
+        # (candidate, seat, feature): every seat's weighted share of the map
+        seats = weights.T @ catalog.stats[tiles]
+        scores = self.score(seats)
+        refined = [
+            self.refine(tiles[candidate], weights)
+            for candidate in np.argsort(scores, kind="stable")[:REFINE]
+        ]
+        refined_seats = np.stack([weights.T @ catalog.stats[t] for t in refined])
+        refined_scores = self.score(refined_seats)
+        best = int(refined_scores.argmin())
+
+        layout = [0] * (len(systems) + len(homes))
+        for position, tile in zip(systems, refined[best]):
+            layout[position] = catalog.tiles[tile].number
+        return GeneratedMap(
+            seed, layout, refined_seats[best], float(refined_scores[best])
+        )
+
+    def describe(self, map_string: str, player_count: int) -> np.ndarray:
+        """Weighted FEATURES per seat for a map string from generate()."""
+        _, systems, weights = self.layout(player_count)
+        tiles = map_string.split()
+        rows = [self.catalog.rows[int(tiles[position])] for position in systems]
+        return weights.T @ self.catalog.stats[rows]
@@ -0,0 +1,153 @@
+"""In-process metrics with a Prometheus text endpoint.
+
+Recording is a dict update (plus a bisect for histograms), cheap enough to
+leave on for every command. Values that already live elsewhere, like the
+number of active drafts, are read by collector functions only when the
+metrics are scraped.
+"""
+
+import bisect
+import math
+
+from aiohttp import web
+
+# Seconds; command handling is mostly sub-millisecond, storage writes are slower
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}  # label values -> count
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels) -> float:
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name + _format_labels(self.labels, labels), value
+
+
+class Histogram:
+    """Observations counted into fixed buckets, per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.values = {}  # label values -> [count per bucket..., +Inf, sum]
+
+    def observe(self, value: float, *labels):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [0] * (len(self.buckets) + 2)
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def count(self, *labels) -> int:
+        entry = self.values.get(labels)
+        return sum(entry[:-1]) if entry else 0
+
+    def quantile(self, q: float, *labels) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf if past all)."""
+        entry = self.values.get(labels)
+        if not entry:
+            return math.nan
+        target = q * sum(entry[:-1])
+        seen = 0
+        for bound, count in zip(self.buckets, entry):
+            seen += count
+            if seen >= target:
+                return bound
+        return math.inf
+
+    def samples(self):
+        for labels, entry in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), entry):
+                cumulative += count
+                le = _format_labels(self.labels, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le}", cumulative
+            suffix = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{suffix}", entry[-1]
+            yield f"{self.name}_count{suffix}", cumulative
+
+
+class Collector:
+    """A metric computed on demand by fn, returning {label values: value}."""
+
+    def __init__(self, name: str, help: str, kind: str, labels: tuple, fn):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labels = labels
+        self.fn = fn
+
+    def samples(self):
+        for labels, value in self.fn().items():
+            yield self.name + _format_labels(self.labels, labels), value
+
+
+class Registry:
+    """Every metric the bot exports."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), **kw) -> Histogram:
+        return self._add(Histogram(name, help, labels, **kw))
+
+    def collect(self, name: str, help: str, fn, kind: str = "gauge", labels=()):
+        """Export a value read by fn() at scrape time; fn returns {labels: value}."""
+        return self._add(Collector(name, help, kind, labels, fn))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {value}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+async def serve(registry: Registry, host: str, port: int) -> web.AppRunner:
+    """Serve registry.render() at http://host:port/metrics until the runner stops."""
+
+    async def handle(request):
+        return web.Response(text=registry.render(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
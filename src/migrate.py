@@ -0,0 +1,43 @@
+"""Import saved draft_*.json / draft_*.log files into the SQLite backend.
+
+Usage: python src/migrate.py [--source DIR] [--db drafts.db]
+"""
+
+import argparse
+
+from persistence import JsonFileStorage, SqliteStorage
+
+
+def migrate(source: JsonFileStorage, target: SqliteStorage) -> int:
+    """Copy every draft from source to target, returning how many were copied."""
+    count = 0
+    for channel_id in source.channel_ids():
+        snapshot, events = source.read(channel_id)
+        if snapshot is not None:
+            # Snapshots from before the journal have no seq; stamp the one they
+            # restore with, so events recorded after the import follow on
+            seq = snapshot.setdefault("seq", 0)
+            target.write({}, {channel_id: snapshot})
+            events = [event for event in events if event["seq"] > seq]
+        if events:
+            target.write({channel_id: events}, {})
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=".", help="directory with draft files")
+    parser.add_argument("--db", default="drafts.db", help="SQLite database to fill")
+    args = parser.parse_args()
+
+    target = SqliteStorage(args.db)
+    try:
+        count = migrate(JsonFileStorage(args.source), target)
+    finally:
+        target.close()
+    print(f"Imported {count} draft(s) into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
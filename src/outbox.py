@@ -0,0 +1,88 @@
+"""Per-command outbound message batching.
+
+Every line a command wants to say is queued on the command's Outbox and sent
+in as few Discord messages as possible once the command finishes, instead of
+one API call per line.
+"""
+
+# Discord rejects message content longer than this
+MESSAGE_LIMIT = 2000
+
+
+def _split_long(text: str, limit: int) -> list:
+    """Split text that doesn't fit in one message, preferring line breaks."""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack(lines: list, limit: int = MESSAGE_LIMIT) -> list:
+    """Pack queued lines into the fewest messages of at most `limit` chars."""
+    messages = []
+    current = ""
+    for text in lines:
+        if not text:
+            continue
+        if len(text) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            *full, current = _split_long(text, limit)
+            messages.extend(full)
+        elif current and len(current) + 1 + len(text) > limit:
+            messages.append(current)
+            current = text
+        else:
+            current = f"{current}\n{text}" if current else text
+    if current:
+        messages.append(current)
+    return messages
+
+
+class Outbox:
+    """Collects everything a command sends to its channel and flushes it once."""
+
+    def __init__(self, destination):
+        self.destination = destination  # Anything with an async send(), e.g. ctx
+        self.lines = []
+        self.queued = 0  # Lines queued over the outbox's lifetime
+        self.sent = 0  # Messages actually sent over the outbox's lifetime
+
+    def add(self, text: str):
+        """Queue a line to be sent when the outbox is flushed."""
+        self.lines.append(text)
+        self.queued += 1
+
+    def tell(self, text: str):
+        """Queue a line only the command's author needs, e.g. why it was refused.
+
+        A channel has no private replies, so this is the same as add here.
+        """
+        self.add(text)
+
+    @property
+    def saved(self) -> int:
+        """Number of API calls avoided compared to one send per line."""
+        return self.queued - self.sent
+
+    async def flush(self):
+        """Send everything queued so far in as few messages as possible."""
+        messages = pack(self.lines)
+        self.lines = []
+        for message in messages:
+            await self.destination.send(message)
+            self.sent += 1
@@ -0,0 +1,563 @@
+"""Write-behind journal persistence for draft state.
+
+Every change to a draft is a small event appended to the draft's log.
+Events are buffered for a short moment and written from a worker thread, so
+a burst of commands turns into one append and the event loop never blocks
+on the disk. Every so often the log is compacted into a full snapshot;
+loading replays the log on top of that snapshot.
+
+Where events and snapshots live is up to the storage backend: JSON files in
+the working directory, or a single SQLite database.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from codec import decode_snapshot, encode_snapshot
+
+log = logging.getLogger("drafter.persistence")
+
+
+def draft_path(channel_id: int) -> str:
+    return f"draft_{channel_id}.json"
+
+
+def journal_path(channel_id: int) -> str:
+    return f"draft_{channel_id}.log"
+
+
+TIMERS_FILE = "timers.json"  # Turn deadlines of every draft, see JsonFileStorage
+
+
+def is_finished(snapshot, events: list) -> bool:
+    return any(event["type"] == "completed" for event in events) or (
+        snapshot is not None and snapshot["phase"] == 4
+    )
+
+
+def starts_draft(events: list) -> bool:
+    """Whether a batch of events begins a new draft, replacing any saved before.
+
+    Decided by type, not seq: a draft saved before events had a seq restores
+    with seq 0, so its first new event has seq 1 but continues it.
+    """
+    return events[0]["type"] == "draft_created"
+
+
+def turn_timer(snapshot, events: list):
+    """A draft's latest (reminder, deadline), either of which may be None."""
+    for event in reversed(events):
+        if event["type"] == "deadline_set":
+            return event.get("reminder"), event["deadline"]
+    if snapshot is None:
+        return None, None
+    return snapshot.get("reminder"), snapshot.get("deadline")
+
+
+def complete_length(f) -> int:
+    """Length of an open log up to the end of its last complete line."""
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        step = min(4096, position)
+        position -= step
+        f.seek(position)
+        newline = f.read(step).rfind(b"\n")
+        if newline >= 0:
+            return position + newline + 1
+    return 0
+
+
+def write_atomic(path: str, text: str):
+    """Write a file so readers only ever see the old or the new contents."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonFileStorage:
+    """One draft_<channel>.json snapshot plus draft_<channel>.log per draft.
+
+    Turn deadlines are also kept in one timers.json index, so restarting
+    doesn't mean reading every draft to find the timers to re-arm.
+    """
+
+    def __init__(self, directory: str = "."):
+        self.directory = directory
+        self._timers = None  # channel_id -> (reminder, deadline), once read
+        self._timers_lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def read(self, channel_id: int):
+        """Read a draft's last snapshot (or None) and the events logged after it."""
+        snapshot = None
+        try:
+            with open(self._path(draft_path(channel_id)), "r") as f:
+                snapshot = decode_snapshot(f.read())
+        except FileNotFoundError:
+            pass
+
+        events = []
+        try:
+            with open(self._path(journal_path(channel_id)), "r") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A crash mid-append can only tear the last line; the
+                        # next append cuts it off
+                        log.warning("Ignoring torn journal entry for %s", channel_id)
+                        break
+        except FileNotFoundError:
+            pass
+        return snapshot, events
+
+    def channel_ids(self) -> list:
+        """Every channel with a saved draft, finished or not."""
+        ids = set()
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"draft_(\d+)\.(json|log)", name)
+            if match:
+                ids.add(int(match.group(1)))
+        return sorted(ids)
+
+    def _no_guilds(self, owns):
+        if owns is not None:
+            raise ValueError("JSON draft storage can't filter by guild; use SQLite")
+
+    def unfinished_ids(self, owns=None) -> list:
+        """Channels whose saved draft may still be running, without reading them.
+
+        Telling finished drafts apart would mean parsing every file, so this
+        lists them all and leaves the check to whoever loads the draft. The
+        guild is only inside each draft too, so owns isn't supported.
+        """
+        self._no_guilds(owns)
+        return self.channel_ids()
+
+    def load_unfinished(self) -> dict:
+        """Read every saved draft that hasn't completed."""
+        drafts = {}
+        for channel_id in self.channel_ids():
+            snapshot, events = self.read(channel_id)
+            if not is_finished(snapshot, events):
+                drafts[channel_id] = (snapshot, events)
+        return drafts
+
+    def _timer_index(self) -> dict:
+        """The deadline index, read on first use; call with _timers_lock held."""
+        if self._timers is None:
+            try:
+                with open(self._path(TIMERS_FILE), "r") as f:
+                    self._timers = {
+                        channel_id: (reminder, deadline)
+                        for channel_id, reminder, deadline in json.load(f)
+                    }
+            except FileNotFoundError:
+                # Saved before the index existed: find the deadlines once
+                self._timers = {}
+                for channel_id, (snapshot, events) in self.load_unfinished().items():
+                    reminder, deadline = turn_timer(snapshot, events)
+                    if deadline is not None:
+                        self._timers[channel_id] = (reminder, deadline)
+                self._save_timers()
+        return self._timers
+
+    def _save_timers(self):
+        rows = [[cid, *timer] for cid, timer in sorted(self._timers.items())]
+        write_atomic(self._path(TIMERS_FILE), json.dumps(rows))
+
+    def _update_timers(self, changes: dict):
+        """Set (or with None, clear) drafts' deadlines in the index."""
+        with self._timers_lock:
+            index = self._timer_index()
+            before = dict(index)
+            for channel_id, timer in changes.items():
+                if timer is None or timer[1] is None:
+                    index.pop(channel_id, None)
+                else:
+                    index[channel_id] = timer
+            if index != before:
+                self._save_timers()
+
+    def timers(self, owns=None) -> dict:
+        """(reminder, deadline) of every unfinished draft with a turn deadline."""
+        self._no_guilds(owns)
+        with self._timers_lock:
+            return dict(self._timer_index())
+
+    def stale_ids(self, before: float, owns=None) -> list:
+        """Unfinished drafts whose files were last written before `before`."""
+        self._no_guilds(owns)
+        stale = []
+        for channel_id in self.channel_ids():
+            paths = (draft_path(channel_id), journal_path(channel_id))
+            written = [
+                os.path.getmtime(self._path(path))
+                for path in paths
+                if os.path.exists(self._path(path))
+            ]
+            if written and max(written) < before:
+                if not is_finished(*self.read(channel_id)):
+                    stale.append(channel_id)
+        return stale
+
+    def delete(self, channel_id: int):
+        """Remove everything saved for a draft."""
+        for path in (draft_path(channel_id), journal_path(channel_id)):
+            try:
+                os.remove(self._path(path))
+            except FileNotFoundError:
+                pass
+        self._update_timers({channel_id: None})
+
+    def write(self, pending: dict, snapshots: dict) -> int:
+        """Append logged events and write snapshots; returns the bytes written.
+
+        Runs in a worker thread.
+        """
+        written = 0
+        timers = {}  # Deadline index changes
+        for channel_id, events in pending.items():
+            if channel_id in snapshots:
+                continue  # The snapshot already includes these events
+            if is_finished(None, events):
+                timers[channel_id] = None
+            elif any(event["type"] == "deadline_set" for event in events):
+                timers[channel_id] = turn_timer(None, events)
+            fresh = starts_draft(events)
+            if fresh and os.path.exists(self._path(draft_path(channel_id))):
+                os.remove(self._path(draft_path(channel_id)))
+            data = "".join(
+                json.dumps(event, separators=(",", ":")) + "\n" for event in events
+            ).encode()
+            written += len(data)
+            path = self._path(journal_path(channel_id))
+            with open(path, "r+b" if os.path.exists(path) and not fresh else "wb") as f:
+                # Appending after a torn line would tear the first new event too
+                start = complete_length(f)
+                f.seek(start)
+                f.truncate()
+                try:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    # Leave nothing half-written for the retry to append after
+                    f.truncate(start)
+                    raise
+        for channel_id, data in snapshots.items():
+            text = encode_snapshot(data)
+            written += len(text)
+            write_atomic(self._path(draft_path(channel_id)), text)
+            # Everything in the log is now covered by the snapshot
+            open(self._path(journal_path(channel_id)), "w").close()
+            timers[channel_id] = turn_timer(data, [])
+        if timers:
+            self._update_timers(timers)
+        return written
+
+    def close(self):
+        pass
+
+
+class SqliteStorage:
+    """All drafts in one SQLite database in WAL mode, indexed by channel and guild."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS drafts (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER,
+            finished INTEGER NOT NULL DEFAULT 0,
+            snapshot TEXT,
+            updated_at REAL NOT NULL,
+            reminder REAL,
+            deadline REAL
+        );
+        CREATE INDEX IF NOT EXISTS drafts_by_guild ON drafts (guild_id);
+        CREATE INDEX IF NOT EXISTS drafts_by_finished ON drafts (finished);
+        CREATE TABLE IF NOT EXISTS events (
+            channel_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            PRIMARY KEY (channel_id, seq)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str = "drafts.db"):
+        self.path = path
+        # Writes come from worker threads; the lock keeps them to one at a time.
+        # Other bot processes may share the file, so wait out their writes too.
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(drafts)")}
+        for column in ("reminder", "deadline"):  # Databases from before turn timers
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE drafts ADD COLUMN {column} REAL")
+        # Only drafts waiting on a turn are in this index, so re-arming their
+        # timers on startup never reads the other drafts' rows
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS drafts_by_deadline ON drafts"
+            " (deadline, reminder) WHERE finished = 0 AND deadline IS NOT NULL"
+        )
+        self._lock = threading.Lock()
+
+    def read(self, channel_id: int):
+        """Read a draft's last snapshot (or None) and the events logged after it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot FROM drafts WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT event FROM events WHERE channel_id = ? ORDER BY seq",
+                (channel_id,),
+            ).fetchall()
+        snapshot = decode_snapshot(row[0]) if row and row[0] else None
+        return snapshot, [json.loads(event) for (event,) in rows]
+
+    def channel_ids(self, guild_id: int = None) -> list:
+        """Every channel with a saved draft, optionally only in one guild."""
+        with self._lock:
+            if guild_id is None:
+                rows = self._conn.execute(
+                    "SELECT channel_id FROM drafts ORDER BY channel_id"
+                )
+            else:
+                rows = self._conn.execute(
+                    "SELECT channel_id FROM drafts WHERE guild_id = ?"
+                    " ORDER BY channel_id",
+                    (guild_id,),
+                )
+            return [channel_id for (channel_id,) in rows]
+
+    def unfinished_ids(self, owns=None) -> list:
+        """Channels whose saved draft hasn't completed, without reading them.
+
+        If owns is given, only drafts whose guild passes owns(guild_id).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel_id, guild_id FROM drafts WHERE finished = 0"
+            ).fetchall()
+        return [cid for cid, guild_id in rows if owns is None or owns(guild_id)]
+
+    def timers(self, owns=None) -> dict:
+        """(reminder, deadline) of every unfinished draft with a turn deadline."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel_id, guild_id, reminder, deadline FROM drafts"
+                " INDEXED BY drafts_by_deadline"
+                " WHERE finished = 0 AND deadline IS NOT NULL"
+            ).fetchall()
+        return {
+            cid: (reminder, deadline)
+            for cid, guild_id, reminder, deadline in rows
+            if owns is None or owns(guild_id)
+        }
+
+    def stale_ids(self, before: float, owns=None) -> list:
+        """Unfinished drafts last written before `before`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel_id, guild_id FROM drafts"
+                " WHERE finished = 0 AND updated_at < ?",
+                (before,),
+            ).fetchall()
+        return [cid for cid, guild_id in rows if owns is None or owns(guild_id)]
+
+    def delete(self, channel_id: int):
+        """Remove everything saved for a draft."""
+        with self._lock, self._conn:
+            for table in ("events", "drafts"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE channel_id = ?", (channel_id,)
+                )
+
+    def write(self, pending: dict, snapshots: dict) -> int:
+        """Write a whole flush in one transaction; returns the bytes written.
+
+        Runs in a worker thread.
+        """
+        now = time.time()
+        written = 0
+        with self._lock, self._conn:
+            for channel_id, events in pending.items():
+                if channel_id in snapshots:
+                    continue  # The snapshot already includes these events
+                if starts_draft(events):
+                    for table in ("events", "drafts"):
+                        self._conn.execute(
+                            f"DELETE FROM {table} WHERE channel_id = ?", (channel_id,)
+                        )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO drafts (channel_id, guild_id, updated_at)"
+                    " VALUES (?, ?, ?)",
+                    (channel_id, events[0].get("guild_id"), now),
+                )
+                finished = any(event["type"] == "completed" for event in events)
+                self._conn.execute(
+                    "UPDATE drafts SET updated_at = ?, finished = MAX(finished, ?)"
+                    " WHERE channel_id = ?",
+                    (now, finished, channel_id),
+                )
+                if any(event["type"] == "deadline_set" for event in events):
+                    self._conn.execute(
+                        "UPDATE drafts SET reminder = ?, deadline = ?"
+                        " WHERE channel_id = ?",
+                        (*turn_timer(None, events), channel_id),
+                    )
+                rows = [
+                    (channel_id, event["seq"], json.dumps(event, separators=(",", ":")))
+                    for event in events
+                ]
+                written += sum(len(row[2]) for row in rows)
+                # Rows already written by a failed-then-retried flush are skipped
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO events (channel_id, seq, event)"
+                    " VALUES (?, ?, ?)",
+                    rows,
+                )
+            for channel_id, data in snapshots.items():
+                snapshot = encode_snapshot(data)
+                written += len(snapshot)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO drafts (channel_id, guild_id, finished,"
+                    " snapshot, updated_at, reminder, deadline)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        channel_id,
+                        data.get("guild_id"),
+                        data["phase"] == 4,
+                        snapshot,
+                        now,
+                        *turn_timer(data, []),
+                    ),
+                )
+                self._conn.execute(
+                    "DELETE FROM events WHERE channel_id = ? AND seq <= ?",
+                    (channel_id, data.get("seq", 0)),
+                )
+        return written
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_storage(kind: str, path: str):
+    """Create the storage backend named by kind ("json" or "sqlite")."""
+    if kind == "sqlite":
+        return SqliteStorage(path or "drafts.db")
+    if kind == "json":
+        return JsonFileStorage(path or ".")
+    raise ValueError(f"Unknown draft storage backend: {kind}")
+
+
+class Journal:
+    """Buffers draft events and appends them to each draft's log off the loop."""
+
+    def __init__(
+        self, storage, delay: float = 0.5, compact_every: int = 100, on_write=None
+    ):
+        self.storage = storage
+        self.delay = delay  # Seconds to wait for more events before writing
+        self.compact_every = compact_every  # Logged events before a new snapshot
+        self._pending = {}  # channel_id -> [events]
+        self._to_compact = {}  # channel_id -> Draft
+        self._since_snapshot = {}  # channel_id -> events logged since snapshot
+        self._timer = None
+        self._lock = asyncio.Lock()
+        self.on_write = on_write  # Called with (seconds, bytes) after each write
+        self.appends = 0
+        self.snapshots = 0
+        self.bytes_written = 0
+
+    def append(self, draft, event: dict):
+        """Queue an event that has just been applied to the draft."""
+        self._pending.setdefault(draft.channel_id, []).append(event)
+        logged = self._since_snapshot.get(draft.channel_id, 0) + 1
+        self._since_snapshot[draft.channel_id] = logged
+        if logged >= self.compact_every:
+            self._to_compact[draft.channel_id] = draft
+        self._schedule()
+
+    def compact(self, draft):
+        """Queue a full snapshot of the draft, replacing its log."""
+        self._to_compact[draft.channel_id] = draft
+        self._schedule()
+
+    def replayed(self, channel_id: int, events: int):
+        """Note how many logged events a freshly loaded draft replayed."""
+        self._since_snapshot[channel_id] = events
+
+    def pending(self, channel_id: int) -> bool:
+        """Whether a draft has changes that aren't in storage yet."""
+        return channel_id in self._pending or channel_id in self._to_compact
+
+    def forget(self, channel_id: int):
+        """Stop tracking a draft that is fully written and no longer in memory."""
+        self._since_snapshot.pop(channel_id, None)
+
+    async def delete(self, channel_id: int):
+        """Drop a draft's unwritten changes and everything stored for it."""
+        async with self._lock:
+            self._pending.pop(channel_id, None)
+            self._to_compact.pop(channel_id, None)
+            self._since_snapshot.pop(channel_id, None)
+            await asyncio.to_thread(self.storage.delete, channel_id)
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write every buffered event now, e.g. on completion or shutdown."""
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            to_compact, self._to_compact = self._to_compact, {}
+            if not pending and not to_compact:
+                return
+            # Snapshot on the loop so the thread never sees a draft mid-change
+            snapshots = {cid: draft.to_dict() for cid, draft in to_compact.items()}
+            for cid in snapshots:
+                self._since_snapshot[cid] = 0
+            start = time.perf_counter()
+            try:
+                written = await asyncio.to_thread(
+                    self.storage.write, pending, snapshots
+                )
+            except BaseException as error:
+                # Whatever went wrong, keep the batch for the next flush; replay
+                # skips events the snapshot or log already hold
+                for cid, events in pending.items():
+                    self._pending[cid] = events + self._pending.get(cid, [])
+                for cid in snapshots:
+                    self._to_compact.setdefault(cid, to_compact[cid])
+                if not isinstance(error, (OSError, sqlite3.Error)):
+                    raise  # Cancelled, or a bug that retrying won't fix
+                log.exception("Failed to save drafts, will retry")
+                self._schedule()
+                return
+            self.appends += len(pending)
+            self.snapshots += len(snapshots)
+            self.bytes_written += written
+            if self.on_write is not None:
+                self.on_write(time.perf_counter() - start, written)
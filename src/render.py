@@ -0,0 +1,37 @@
+"""Memoized text for draft listings.
+
+Every change to a draft bumps its seq, so (channel, seq, view) identifies one
+rendering of a listing. Repeated !list calls and turn announcements between
+two changes reuse the same text instead of sorting and joining it again.
+"""
+
+
+class RenderCache:
+    """Rendered listing text per draft, for the draft's current state only."""
+
+    def __init__(self):
+        self._entries = {}  # channel_id -> (seq, {view: text})
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, draft, view, build) -> str:
+        """Return build(draft) for this view, rendering it at most once per change."""
+        entry = self._entries.get(draft.channel_id)
+        if entry is None or entry[0] != draft.seq:
+            # The draft changed since anything was cached; drop the stale views
+            entry = (draft.seq, {})
+            self._entries[draft.channel_id] = entry
+        views = entry[1]
+        if view in views:
+            self.hits += 1
+            return views[view]
+        self.misses += 1
+        text = views[view] = build(draft)
+        return text
+
+    def evict(self, channel_id: int):
+        """Forget a draft's listings once it completes or is unloaded."""
+        self._entries.pop(channel_id, None)
+
+    def __len__(self):
+        return len(self._entries)
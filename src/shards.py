@@ -0,0 +1,110 @@
+"""Run the bot as several worker processes, each owning some of the shards.
+
+Discord sends each guild's events to shard (guild_id >> 22) % shard_count, so
+giving every worker its own shard IDs splits the guilds between processes.
+Drafts live in one SQLite database that every worker shares, so a worker that
+is restarted with the same shards picks its drafts back up from there.
+
+Usage: python src/shards.py --workers 4 [--shards 8] [--db drafts.db]
+
+Send SIGHUP to restart the workers one at a time, e.g. after a deploy.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+DRAFTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "drafter.py")
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """The shard Discord routes a guild's events to."""
+    return (guild_id >> 22) % shard_count
+
+
+def assign(shard_count: int, workers: int) -> list:
+    """Deal shard IDs round-robin so every worker gets a similar share."""
+    return [list(range(worker, shard_count, workers)) for worker in range(workers)]
+
+
+class Supervisor:
+    """Starts the workers, restarts any that die and stops them all on exit."""
+
+    def __init__(self, shard_count: int, workers: int, env: dict):
+        self.shard_count = shard_count
+        self.assignments = assign(shard_count, workers)
+        self.env = env
+        self.processes = [None] * workers
+        self.stopping = False
+        self.rolling = False
+
+    def start(self, worker: int):
+        env = dict(self.env)
+        env["DRAFT_SHARD_COUNT"] = str(self.shard_count)
+        env["DRAFT_SHARD_IDS"] = ",".join(map(str, self.assignments[worker]))
+        if env.get("DRAFT_METRICS_PORT"):
+            env["DRAFT_METRICS_PORT"] = str(int(env["DRAFT_METRICS_PORT"]) + worker)
+        self.processes[worker] = subprocess.Popen([sys.executable, DRAFTER], env=env)
+        print(f"Worker {worker} started with shards {env['DRAFT_SHARD_IDS']}")
+
+    def stop(self, worker: int, timeout: float = 30):
+        """Ask a worker to shut down cleanly, so it flushes its drafts first."""
+        process = self.processes[worker]
+        if process is None or process.poll() is not None:
+            return
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def run(self):
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_rolling_restart)
+        for worker in range(len(self.processes)):
+            self.start(worker)
+        while not self.stopping:
+            if self.rolling:
+                self.rolling = False
+                # One at a time, so only one worker's guilds are ever offline
+                for worker in range(len(self.processes)):
+                    self.stop(worker)
+                    self.start(worker)
+            for worker, process in enumerate(self.processes):
+                if process.poll() is not None and not self.stopping:
+                    print(f"Worker {worker} exited with {process.returncode}")
+                    time.sleep(1)  # Don't spin if it keeps crashing on startup
+                    self.start(worker)
+            time.sleep(1)
+        for worker in range(len(self.processes)):
+            self.stop(worker)
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_rolling_restart(self, signum, frame):
+        self.rolling = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shards", type=int, help="Defaults to one per worker")
+    parser.add_argument("--db", default=os.getenv("DRAFT_STORAGE_PATH", "drafts.db"))
+    args = parser.parse_args()
+    shard_count = args.shards or args.workers
+    if shard_count < args.workers:
+        parser.error("Every worker needs at least one shard")
+
+    # Every worker must see every draft, so they all share one database
+    env = dict(os.environ, DRAFT_STORAGE="sqlite", DRAFT_STORAGE_PATH=args.db)
+    Supervisor(shard_count, args.workers, env).run()
+
+
+if __name__ == "__main__":
+    main()
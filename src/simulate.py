@@ -0,0 +1,377 @@
+"""Monte Carlo simulation of whole drafts, to measure how fair the format is.
+
+Drafts are simulated in batches of NumPy arrays, one row per draft, with
+every faction set (hands, selectable, optional, voted in, still available)
+held as a boolean mask over the catalog. Each step of the rules is a handful
+of array operations over the whole batch, so there is a Python loop per
+player and per pick but never per draft, and millions of drafts take seconds.
+
+The rules are the bot's: hands are dealt like dealer.deal, every player puts
+their favourite faction in the draft and their second favourite up for a
+vote, optional factions need 2 votes, and the snake draft runs through
+draft order forward, backward and forward again.
+
+Players are modelled as preferring factions by rating plus random taste (a
+Gumbel draw, so a rating 1 higher makes a faction e times as likely to be
+preferred over an otherwise equal one). Everyone takes their faction in the
+snake draft's first round, so later rounds (locations backward, then
+strategy orders forward) go strictly by position and aren't simulated.
+
+Usage: python src/simulate.py [--drafts N] [--players P] [--hand-size H]
+       [--simultaneous [--ballot-size K]] [--ratings FILE] [--exclude F,...]
+       [--seed S] [--json]
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from catalog import FactionCatalog
+
+BATCH = 65536  # Drafts simulated at once; bounds memory at roughly 100 MB
+
+
+def deal_batch(rng, drafts: int, players: int, hand_size: int, pool: int):
+    """Hands as (draft, player, card) indices into the pool, dealt like dealer.deal.
+
+    While the deck lasts, hands are slices of one shuffle. Past that, each
+    draw is a step over the whole batch: a fresh shuffle when a deck runs
+    out, and a faction already in the hand is held back for the next hand.
+    """
+    if players * hand_size <= pool:
+        deck = rng.random((drafts, pool)).argsort(axis=1)
+        return deck[:, : players * hand_size].reshape(drafts, players, hand_size)
+
+    rows = np.arange(drafts)
+    hands = np.empty((drafts, players, hand_size), dtype=np.int64)
+    # Room for the held back factions pushed on top of a fresh deck
+    deck = np.empty((drafts, pool + hand_size), dtype=np.int64)
+    top = np.zeros(drafts, dtype=np.int64)  # Cards left in each deck
+    for player in range(players):
+        held = np.empty((drafts, hand_size), dtype=np.int64)
+        held_count = np.zeros(drafts, dtype=np.int64)
+        in_hand = np.zeros((drafts, pool), dtype=bool)
+        count = np.zeros(drafts, dtype=np.int64)
+        while True:
+            drawing = count < hand_size
+            if not drawing.any():
+                break
+            empty = drawing & (top == 0)
+            if empty.any():
+                deck[empty, :pool] = rng.random((empty.sum(), pool)).argsort(axis=1)
+                top[empty] = pool
+            r = rows[drawing]
+            card = deck[r, top[r] - 1]
+            top[r] -= 1
+            dup = in_hand[r, card]
+            keep, back = r[~dup], r[dup]
+            hands[keep, player, count[keep]] = card[~dup]
+            in_hand[keep, card[~dup]] = True
+            count[keep] += 1
+            held[back, held_count[back]] = card[dup]
+            held_count[back] += 1
+        # Held back factions go back on the deck, the last one on top
+        for i in range(held_count.max(initial=0)):
+            r = rows[held_count > i]
+            deck[r, top[r]] = held[r, i]
+            top[r] += 1
+    return hands
+
+
+@dataclass
+class SimulationResult:
+    drafts: int
+    players: int
+    seconds: float
+    factions: list  # Catalog indices, in the order of the per-faction arrays
+    dealt: np.ndarray  # Share of drafts each faction was dealt in
+    selectable: np.ndarray  # ... put in the draft by a player
+    optional: np.ndarray  # ... put up for a vote
+    voted_in: np.ndarray  # Share of the drafts it was optional in that voted it in
+    # (NaN for a faction that was never optional)
+    final: np.ndarray  # ... in final_factions when picking started
+    picked: np.ndarray  # ... picked by someone
+    first_choice: np.ndarray  # Per pick position: got their favourite final faction
+    mean_rank: np.ndarray  # Per pick position: 0 is their favourite final faction
+    # (NaN for a position that never got one)
+    no_faction: np.ndarray  # Per pick position: no final faction was left
+    optional_voted_in: float  # Share of all factions put up for a vote voted in
+
+    def to_dict(self) -> dict:
+        per_faction = ("dealt", "selectable", "optional", "voted_in", "final", "picked")
+        return {
+            "drafts": self.drafts,
+            "players": self.players,
+            "seconds": round(self.seconds, 3),
+            "optional_voted_in": round(self.optional_voted_in, 5),
+            "factions": {
+                str(faction): {
+                    name: _round(getattr(self, name)[column], 5) for name in per_faction
+                }
+                for column, faction in enumerate(self.factions)
+            },
+            "positions": [
+                {
+                    "position": position + 1,
+                    "first_choice": round(float(self.first_choice[position]), 5),
+                    "mean_rank": _round(self.mean_rank[position], 4),
+                    "no_faction": round(float(self.no_faction[position]), 5),
+                    "location_pick": self.players - position,
+                    "strategy_order": position + 1,
+                }
+                for position in range(self.players)
+            ],
+        }
+
+
+class DraftSimulator:
+    """Plays many drafts at once through the bot's rules, with modelled players."""
+
+    def __init__(
+        self,
+        factions: list,
+        hand_size: int = 4,
+        ratings: dict = None,
+        simultaneous: bool = False,
+        ballot_size: int = 1,
+        batch: int = BATCH,
+    ):
+        self.factions = list(factions)  # Catalog indices that can be dealt
+        if hand_size < 2 or hand_size > len(self.factions):
+            raise ValueError(
+                f"Can't deal {hand_size} factions per player from a pool of "
+                f"{len(self.factions)}"
+            )
+        self.hand_size = hand_size
+        ratings = ratings or {}
+        self.ratings = np.array(
+            [ratings.get(faction, 0.0) for faction in self.factions], np.float32
+        )
+        self.simultaneous = simultaneous
+        self.ballot_size = ballot_size  # Factions on each simultaneous ballot
+        self.batch = batch
+
+    def run(self, drafts: int, players: int, seed: int = None) -> SimulationResult:
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        pool = len(self.factions)
+        per_faction = np.zeros((6, pool))
+        per_position = np.zeros((3, players))
+        done = 0
+        while done < drafts:
+            n = min(self.batch, drafts - done)
+            self._batch(rng, n, players, per_faction, per_position)
+            done += n
+        dealt, selectable, optional, promoted, final, picked = per_faction
+        first_choice, rank_sum, got = per_position
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return SimulationResult(
+                drafts=drafts,
+                players=players,
+                seconds=time.perf_counter() - start,
+                factions=self.factions,
+                dealt=dealt / drafts,
+                selectable=selectable / drafts,
+                optional=optional / drafts,
+                voted_in=promoted / optional,
+                final=final / drafts,
+                picked=picked / drafts,
+                first_choice=first_choice / drafts,
+                mean_rank=rank_sum / got,
+                no_faction=1 - got / drafts,
+                optional_voted_in=(
+                    promoted.sum() / optional.sum() if optional.any() else 0.0
+                ),
+            )
+
+    def _batch(self, rng, n: int, players: int, per_faction, per_position):
+        pool = len(self.factions)
+        rows = np.arange(n)
+        rows_p = rows[:, None]
+        hands = deal_batch(rng, n, players, self.hand_size, pool)
+        # How much each player wants each faction. Without ratings only the
+        # order matters, and any independent draws give the same orders.
+        utility = 1 - rng.random((n, players, pool), dtype=np.float32)  # (0, 1]
+        if self.ratings.any():
+            utility = self.ratings - np.log(-np.log(utility))  # Gumbel taste
+
+        # Phase 1: favourite in the draft, second favourite up for a vote
+        hand_utility = np.take_along_axis(utility, hands, axis=2)
+        best = np.argsort(-hand_utility, axis=2)[:, :, :2]
+        chosen = np.take_along_axis(hands, best, axis=2)
+        dealt = np.zeros((n, pool), dtype=bool)
+        dealt[rows[:, None, None], hands] = True
+        final = np.zeros((n, pool), dtype=bool)
+        final[rows_p, chosen[:, :, 0]] = True
+        optional = np.zeros((n, pool), dtype=bool)
+        optional[rows_p, chosen[:, :, 1]] = True
+        selectable = final.copy()
+        offered = optional.copy()
+
+        # Phase 2: optional factions with 2 votes join the draft
+        order = rng.random((n, players)).argsort(axis=1)
+        # Each position's player's wants, contiguous for the loops below
+        by_position = np.take_along_axis(utility, order[:, :, None], axis=1)
+        by_position = np.ascontiguousarray(by_position.transpose(1, 0, 2))
+        votes = np.zeros((n, pool), dtype=np.int8)
+        if self.simultaneous:
+            # Everyone's ballot is their top factions of the same pool, so the
+            # order ballots arrive in doesn't change the outcome
+            ranked = np.argsort(-np.where(offered[:, None, :], utility, -np.inf), 2)
+            on_ballot = ranked[:, :, : self.ballot_size]
+            valid = np.take_along_axis(
+                np.broadcast_to(offered[:, None, :], utility.shape), on_ballot, 2
+            )
+            np.add.at(votes, (rows[:, None, None], on_ballot), valid.astype(np.int8))
+            promoted = offered & ~final & (votes >= 2)
+            final |= promoted
+        else:
+            promoted = np.zeros((n, pool), dtype=bool)
+            # Flat views, so each voter's choice is one index per draft
+            flat_votes, flat_promoted = votes.ravel(), promoted.ravel()
+            candidates = optional & ~final
+            flat_candidates = candidates.ravel()
+            for position in range(players):
+                wanted = np.where(candidates, by_position[position], -np.inf)
+                cell = rows * pool + wanted.argmax(axis=1)
+                # No candidates left means argmax picked one that isn't a candidate
+                voted = flat_candidates[cell]
+                flat_votes[cell] += voted
+                enough = voted & (flat_votes[cell] >= 2)
+                flat_promoted[cell] |= enough
+                flat_candidates[cell] &= ~enough
+            final |= promoted
+
+        # Phase 3: the first snake round, everyone taking a faction
+        available = final.copy()
+        picked = np.zeros((n, pool), dtype=bool)
+        for position in range(players):
+            wants = by_position[position]
+            wanted = np.where(available, wants, -np.inf)
+            choice = wanted.argmax(axis=1)
+            got = available[rows, choice]
+            liked = wanted[rows, choice]
+            # How many final factions this player would rather have had
+            rank = (final & (wants > liked[:, None])).sum(axis=1)
+            available[rows[got], choice[got]] = False
+            picked[rows[got], choice[got]] = True
+            per_position[0, position] += (got & (rank == 0)).sum()
+            per_position[1, position] += rank[got].sum()
+            per_position[2, position] += got.sum()
+
+        for i, mask in enumerate((dealt, selectable, offered, promoted, final, picked)):
+            per_faction[i] += mask.sum(axis=0)
+
+
+def load_ratings(path: str, catalog: FactionCatalog) -> dict:
+    """Faction ratings from a JSON object of faction (index or name) to rating."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return {catalog.resolve(str(faction)): float(r) for faction, r in data.items()}
+
+
+def _round(value, digits: int):
+    """A rate for JSON, which has no NaN: None where there was nothing to count."""
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _cell(value, spec: str) -> str:
+    return "-" if np.isnan(value) else format(value, spec)
+
+
+def format_report(result: SimulationResult, names: dict) -> str:
+    lines = [
+        f"{result.drafts} drafts of {result.players} players in "
+        f"{result.seconds:.2f} s",
+        "",
+        f"{'Faction':<34} {'dealt':>6} {'draft':>6} {'vote':>6} {'in':>6} "
+        f"{'final':>6} {'picked':>6}",
+    ]
+    for column in np.argsort(-result.final, kind="stable"):
+        lines.append(
+            f"{result.factions[column]:>2}: {names[result.factions[column]]:<30}"
+            + "".join(
+                f" {_cell(value[column], '.1%'):>6}"
+                for value in (
+                    result.dealt,
+                    result.selectable,
+                    result.optional,
+                    result.voted_in,
+                    result.final,
+                    result.picked,
+                )
+            )
+        )
+    lines += [
+        "",
+        "draft: put in the draft, vote: put up for a vote, in: voted in when up"
+        " for a vote",
+        "",
+        f"{'Position':<9} {'first choice':>12} {'mean rank':>9} {'none left':>9} "
+        f"{'location pick':>13} {'strategy':>8}",
+    ]
+    for position in range(result.players):
+        lines.append(
+            f"{position + 1:<9} {result.first_choice[position]:>12.1%} "
+            f"{_cell(result.mean_rank[position], '.2f'):>9} {result.no_faction[position]:>9.1%} "
+            f"{result.players - position:>13} {position + 1:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument(
+        "--hand-size", type=int, default=int(os.getenv("DRAFT_HAND_SIZE", "4"))
+    )
+    parser.add_argument(
+        "--simultaneous", action="store_true", help="Simultaneous voting rules"
+    )
+    parser.add_argument(
+        "--ballot-size",
+        type=int,
+        default=1,
+        help="Optional factions each player votes for with --simultaneous",
+    )
+    parser.add_argument(
+        "--ratings",
+        default=os.getenv("DRAFT_FACTION_RATINGS"),
+        help="JSON object of faction (index or name) to rating, 0 if left out",
+    )
+    parser.add_argument("--exclude", default="", help="Factions never dealt")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    catalog = FactionCatalog.load(
+        os.getenv(
+            "DRAFT_FACTIONS_FILE",
+            os.path.join(os.path.dirname(__file__), "data", "factions.json"),
+        )
+    )
+    excluded = {catalog.resolve(name) for name in args.exclude.split(",") if name}
+    factions = [index for index in catalog.factions if index not in excluded]
+    ratings = load_ratings(args.ratings, catalog) if args.ratings else {}
+    simulator = DraftSimulator(
+        factions,
+        hand_size=args.hand_size,
+        ratings=ratings,
+        simultaneous=args.simultaneous,
+        ballot_size=args.ballot_size,
+    )
+    result = simulator.run(args.drafts, args.players, args.seed)
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        names = {index: faction.name for index, faction in catalog.factions.items()}
+        print(format_report(result, names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Phase 3 snake draft engine.
+
+The whole pick schedule is laid out when Phase 3 starts, and every pick
+updates the pools and counters in place, so "who's next", "what can they
+pick" and "is the draft done" are all constant-time lookups.
+"""
+
+from compact import BitSet
+
+# Every player picks one of each, one per turn
+KINDS = ("faction", "location", "strategy")
+
+
+class SnakeDraft:
+    """Pick schedule and remaining pools for a snake draft."""
+
+    __slots__ = ("order", "schedule", "turn", "remaining", "available")
+
+    def __init__(self, order: list, factions, locations, strategies):
+        self.order = list(order)
+        # Forward, backward, forward: one round per kind
+        self.schedule = []
+        for round_index in range(len(KINDS)):
+            self.schedule += self.order if round_index % 2 == 0 else self.order[::-1]
+        self.turn = 0  # Index into schedule of the current pick
+        self.remaining = dict.fromkeys(self.order, len(KINDS))  # player -> picks left
+        self.available = {
+            "faction": BitSet(factions),
+            "location": BitSet(locations),
+            "strategy": BitSet(strategies),
+        }
+
+    @classmethod
+    def resume(
+        cls, order: list, factions, locations, strategies, player_choices, skipped=()
+    ):
+        """Rebuild the engine for a draft whose picks so far are in player_choices.
+
+        skipped lists the players whose turns were passed, see skip.
+        """
+        engine = cls(order, factions, locations, strategies)
+        for player_id, choices in player_choices.items():
+            for kind in KINDS:
+                if choices[kind] is not None:
+                    engine.available[kind].discard(choices[kind])
+                    engine.remaining[player_id] -= 1
+                    engine.turn += 1
+        for player_id in skipped:
+            engine.skip(player_id)
+        return engine
+
+    @property
+    def done(self) -> bool:
+        return self.turn >= len(self.schedule)
+
+    @property
+    def current(self):
+        """The player whose turn it is, or None once the draft is done."""
+        return None if self.done else self.schedule[self.turn]
+
+    @property
+    def round(self) -> int:
+        """1-based round of the current pick."""
+        return self.turn // len(self.order) + 1
+
+    @property
+    def direction(self) -> int:
+        """1 while picking in draft order, -1 while picking in reverse."""
+        return 1 if (self.turn // len(self.order)) % 2 == 0 else -1
+
+    @property
+    def position(self) -> int:
+        """Index in the draft order of the current picker."""
+        offset = self.turn % len(self.order)
+        return offset if self.direction == 1 else len(self.order) - 1 - offset
+
+    def can_pick(self, kind: str, value: int) -> bool:
+        return value in self.available[kind]
+
+    def pick(self, player_id: int, kind: str, value: int):
+        """Take value out of its pool and move on to the next turn."""
+        self.available[kind].remove(value)
+        self.remaining[player_id] -= 1
+        self.turn += 1
+
+    def skip(self, player_id: int):
+        """Pass a turn without a pick, for a player with nothing left to pick."""
+        self.remaining[player_id] -= 1
+        self.turn += 1
+
+    def has_options(self, choices) -> bool:
+        """Whether anything is left of a kind the player still has to pick."""
+        return any(choices[k] is None and self.available[k] for k in KINDS)
+
+    def resolve(self, choices, queue: dict):
+        """The best (kind, value) in a player's queue they can still pick, or None.
+
+        choices are the player's picks so far and queue maps kinds to values,
+        best first. Kinds are tried in KINDS order.
+        """
+        for kind in KINDS:
+            if choices[kind] is not None:
+                continue
+            for value in queue.get(kind, ()):
+                if value in self.available[kind]:
+                    return kind, value
+        return None
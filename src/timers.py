@@ -0,0 +1,80 @@
+"""One scheduler for every draft's turn timers.
+
+Each draft has at most one pending wake-up time. They all sit in one heap,
+and a single task sleeps until the earliest of them, so thousands of waiting
+drafts cost one sleeping task and a heap entry each. Re-arming or cancelling
+a draft's timer leaves its old heap entry behind; stale entries are skipped
+when they come up and cleared out once they outnumber the live ones.
+
+Each timer that comes due fires in a task of its own, so one draft that
+is busy (e.g. holding its lock through a slow command) doesn't hold up
+the reminders and deadlines of the others.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+
+log = logging.getLogger("drafter.timers")
+
+
+class Scheduler:
+    """Calls an async fire(key) once the wall-clock time armed for key passes."""
+
+    def __init__(self, fire):
+        self.fire = fire
+        self._heap = []  # (when, key), including stale entries
+        self._when = {}  # key -> the time it's currently armed for
+        self._wake = asyncio.Event()  # Set when an earlier time is armed
+        self._firing = set()  # Fires still running, kept so they aren't collected
+
+    def arm(self, key, when: float):
+        """Fire key at `when` (a time.time() value), replacing any earlier arming."""
+        self._when[key] = when
+        if len(self._heap) > 2 * len(self._when) + 64:
+            self._heap = [(w, k) for k, w in self._when.items()]
+            heapq.heapify(self._heap)
+        else:
+            heapq.heappush(self._heap, (when, key))
+        if self._heap[0] == (when, key):
+            self._wake.set()
+
+    def cancel(self, key):
+        self._when.pop(key, None)
+
+    def armed(self, key):
+        """The time key is armed for, or None."""
+        return self._when.get(key)
+
+    def __len__(self) -> int:
+        return len(self._when)
+
+    def due(self, now: float) -> list:
+        """Take every key whose time has come off the schedule."""
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            when, key = heapq.heappop(self._heap)
+            if self._when.get(key) == when:
+                del self._when[key]
+                keys.append(key)
+        return keys
+
+    async def _fire(self, key):
+        try:
+            await self.fire(key)
+        except Exception:
+            log.exception("Timer for %s failed", key)
+
+    async def run(self):
+        while True:
+            for key in self.due(time.time()):
+                task = asyncio.create_task(self._fire(key))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+            self._wake.clear()
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
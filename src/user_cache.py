@@ -0,0 +1,77 @@
+"""Cache of resolved Discord users so turn announcements don't hit REST."""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class UserCache:
+    """TTL + LRU cache in front of bot.get_user (gateway) and bot.fetch_user (REST)."""
+
+    def __init__(self, bot, ttl: float = 3600, maxsize: int = 10_000):
+        self.bot = bot
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._users = OrderedDict()  # user_id -> (expires_at, user)
+        self._pending = {}  # user_id -> in-flight fetch_user task
+        self.hits = 0  # Served from this cache
+        self.misses = 0  # Not in this cache (or expired)
+        self.gateway_hits = 0  # Misses served from the gateway cache
+        self.rest_lookups = 0  # Misses that needed a fetch_user call
+
+    def put(self, user):
+        """Remember a user object we already have, e.g. ctx.author."""
+        self._users[user.id] = (time.monotonic() + self.ttl, user)
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.maxsize:
+            self._users.popitem(last=False)
+
+    def _cached(self, user_id: int):
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._users[user_id]
+            return None
+        self._users.move_to_end(user_id)
+        return user
+
+    async def _fetch(self, user_id: int):
+        self.rest_lookups += 1
+        try:
+            user = await self.bot.fetch_user(user_id)
+        finally:
+            del self._pending[user_id]
+        self.put(user)
+        return user
+
+    async def get(self, user_id: int):
+        """Resolve a user, trying this cache, then the gateway, then REST."""
+        user = self._cached(user_id)
+        if user is not None:
+            self.hits += 1
+            return user
+        self.misses += 1
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            self.gateway_hits += 1
+            self.put(user)
+            return user
+        # Share one REST call between concurrent lookups of the same user
+        if user_id not in self._pending:
+            self._pending[user_id] = asyncio.ensure_future(self._fetch(user_id))
+        return await asyncio.shield(self._pending[user_id])
+
+    async def get_many(self, user_ids) -> list:
+        """Resolve several users at once, fetching any misses concurrently."""
+        return await asyncio.gather(*(self.get(user_id) for user_id in user_ids))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "gateway_hits": self.gateway_hits,
+            "rest_lookups": self.rest_lookups,
+        }
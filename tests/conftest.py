@@ -0,0 +1,17 @@
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+
+# drafter opens its storage and history archive on import; keep them out of the repo
+_scratch = tempfile.mkdtemp(prefix="drafter-tests-")
+os.environ.setdefault("DRAFT_STORAGE", "json")
+os.environ.setdefault("DRAFT_STORAGE_PATH", _scratch)
+os.environ.setdefault("DRAFT_HISTORY_DIR", os.path.join(_scratch, "history"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_scratch, ignore_errors=True)
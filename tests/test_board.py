@@ -0,0 +1,186 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import drafter
+from loadtest import FakeChannel, LoadTest
+
+
+class FakeMessage:
+    count = 0
+
+    def __init__(self, content, view=None, ephemeral=False):
+        FakeMessage.count += 1
+        self.id = FakeMessage.count
+        self.content = content
+        self.view = view
+        self.flags = SimpleNamespace(ephemeral=ephemeral)
+
+    async def edit(self, content=None, view=None):
+        self.content, self.view = content, view
+
+
+class BoardChannel(FakeChannel):
+    async def send(self, content=None, view=None, **kwargs):
+        self.sent.append(content)
+        return FakeMessage(content, view)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.deferred = False
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def defer(self, **kwargs):
+        self.deferred = self.done = True
+
+    async def send_message(self, content=None, view=None, ephemeral=False):
+        self.done = True
+        self.interaction.reply = FakeMessage(content, view, ephemeral)
+
+
+class FakeInteraction:
+    def __init__(self, channel, user_id, message=None, command=None):
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = channel.guild
+        self.user = SimpleNamespace(id=user_id, mention=f"<@{user_id}>")
+        self.client = drafter.bot
+        self.message = message
+        self.type = (
+            discord.InteractionType.component
+            if command is None
+            else discord.InteractionType.application_command
+        )
+        self.command = command
+        self.response = FakeResponse(self)
+        self.reply = None
+        self.private = []
+        self.followup = SimpleNamespace(send=self._followup)
+
+    async def _followup(self, content, ephemeral=False):
+        assert ephemeral
+        self.private.append(content)
+
+    async def edit_original_response(self, content=None, view=None):
+        if self.message is not None:
+            await self.message.edit(content=content, view=view)
+        else:
+            self.private.append(content)
+
+
+async def choose(channel, user_id, item, *values):
+    interaction = FakeInteraction(channel, user_id, item.view.message)
+    item._values = list(values)
+    await item.callback(interaction)
+    return interaction
+
+
+async def open_menu(channel, board, user_id, custom_id):
+    button = next(c for c in board.view.children if c.custom_id == custom_id)
+    interaction = FakeInteraction(channel, user_id, board)
+    await button.callback(interaction)
+    menu = interaction.reply
+    if menu.view is not None:
+        menu.view.message = menu
+    return menu
+
+
+def test_board_menus_are_private_and_the_board_goes_when_done():
+    async def main():
+        test = LoadTest(drafter, 3, 0)
+        channel = BoardChannel(501, 5)
+        players = [1, 2, 3]
+        await test.run(channel, 1, drafter.start_draft)
+        for player_id in players:
+            await test.run(channel, player_id, drafter.join_draft)
+        await test.run(channel, 1, drafter.start_drafting, 7)
+        draft = drafter.active_drafts[501]
+
+        await drafter.board_slash.callback(
+            FakeInteraction(channel, 1, command=SimpleNamespace(name="board"))
+        )
+        board = drafter.boards[501]
+        for player_id in players:
+            menu = await open_menu(channel, board, player_id, "draft:hand")
+            assert menu.flags.ephemeral
+            hand = draft.player_factions[player_id]
+            first, second = menu.view.children
+            await choose(channel, player_id, first, str(hand[0]))
+            await choose(channel, player_id, second, str(hand[1]))
+            assert menu.view is None  # Closed once the selection was made
+
+        while draft.phase == 2:
+            voter = draft.draft_order[draft.current_voter]
+            other = next(p for p in players if p != voter)
+            refused = await open_menu(channel, board, other, "draft:vote")
+            assert refused.flags.ephemeral and refused.view is None
+            menu = await open_menu(channel, board, voter, "draft:vote")
+            (select,) = menu.view.children
+            await choose(channel, voter, select, select.options[0].value)
+
+        while 501 in drafter.active_drafts:
+            picker = draft.snake.current
+            menu = await open_menu(channel, board, picker, "draft:pick")
+            assert menu.flags.ephemeral
+            select = menu.view.children[0]
+            await choose(channel, picker, select, select.options[0].value)
+        return board
+
+    board = asyncio.run(main())
+    assert board.view is None and "Draft complete!" in board.content
+    assert 501 not in drafter.boards
+
+
+def test_interactions_are_deferred_before_waiting_for_the_draft():
+    async def main():
+        channel = BoardChannel(502, 5)
+        interaction = FakeInteraction(channel, 1, command=SimpleNamespace(name="board"))
+        await drafter.draft_locks.acquire(502)
+        task = asyncio.create_task(drafter.board_slash.callback(interaction))
+        await asyncio.sleep(0.01)
+        deferred = interaction.response.deferred and not task.done()
+        drafter.draft_locks.release(502)
+        await task
+        return deferred, interaction.private, channel.sent
+
+    deferred, private, sent = asyncio.run(main())
+    assert deferred
+    assert private == ["Done!"] and sent
+
+
+def test_a_draft_finished_by_commands_leaves_no_board(monkeypatch):
+    start_draft = drafter.start_draft.callback
+
+    async def start_with_board(ctx):
+        await start_draft(ctx)
+        drafter.boards[ctx.channel.id] = FakeMessage("board")
+
+    monkeypatch.setattr(drafter.start_draft, "callback", start_with_board)
+    asyncio.run(LoadTest(drafter, 2, 0).play(503, 5))
+    assert 503 not in drafter.active_drafts
+    assert 503 not in drafter.boards
+
+
+def test_autocomplete_restores_a_saved_draft():
+    async def main():
+        test = LoadTest(drafter, 2, 0)
+        channel = FakeChannel(504, 5)
+        await test.run(channel, 1, drafter.start_draft)
+        for player_id in (1, 2):
+            await test.run(channel, player_id, drafter.join_draft)
+        await test.run(channel, 1, drafter.start_drafting, 7)
+        await drafter.unload_draft(504, "idle")
+        assert 504 in drafter.saved_drafts
+
+        interaction = FakeInteraction(
+            channel, 1, command=SimpleNamespace(name="select")
+        )
+        return await drafter.value_choices(interaction, "")
+
+    assert asyncio.run(main())
@@ -0,0 +1,62 @@
+import pytest
+
+from catalog import (
+    AmbiguousFaction,
+    Faction,
+    FactionCatalog,
+    UnknownFaction,
+    normalize,
+)
+
+CATALOG = FactionCatalog(
+    [
+        Faction(1, "The Universities of Jol-Nar", "Jol-Nar", "base", ("jolnar",)),
+        Faction(2, "The Emirates of Hacan", "Hacan", "base"),
+        Faction(3, "The Naalu Collective", "Naalu", "base"),
+        Faction(4, "The Nekro Virus", "Nekro", "base"),
+        Faction(5, "The Nomad", "Nomad", "pok"),
+    ]
+)
+
+
+def test_names_are_normalized():
+    assert normalize("The Universities of Jol-Nar") == "universitiesjolnar"
+    assert normalize("  Jol'Nar ") == "jolnar"
+
+
+def test_indices_names_and_aliases_resolve_exactly():
+    assert CATALOG.resolve("2") == 2
+    assert CATALOG.resolve("Emirates of Hacan") == 2
+    assert CATALOG.resolve("jol nar") == 1
+    assert CATALOG.resolve("Nomad") == 5
+
+
+def test_a_unique_prefix_resolves():
+    assert CATALOG.resolve("hac") == 2
+    assert CATALOG.resolve("nek") == 4
+
+
+def test_a_shared_prefix_is_ambiguous():
+    with pytest.raises(AmbiguousFaction) as error:
+        CATALOG.resolve("na")
+    assert [faction.index for faction in error.value.candidates] == [1, 3]
+    with pytest.raises(AmbiguousFaction) as error:
+        CATALOG.resolve("n")
+    assert [faction.index for faction in error.value.candidates] == [1, 3, 4, 5]
+
+
+def test_within_narrows_an_ambiguous_name_to_what_is_on_offer():
+    assert CATALOG.resolve("n", within={2, 4}) == 4
+    # Nothing on offer matches, so the name still resolves for the caller
+    assert CATALOG.resolve("hacan", within={1}) == 2
+
+
+def test_typos_fall_back_to_trigrams():
+    assert CATALOG.resolve("hacna") == 2
+    assert CATALOG.resolve("nekor virus") == 4
+
+
+def test_unknown_queries_are_refused():
+    for query in ("9", "zzz", "the of", "xyzzy"):
+        with pytest.raises(UnknownFaction):
+            CATALOG.resolve(query)
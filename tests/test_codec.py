@@ -0,0 +1,59 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from codec import VERSION, SnapshotVersionError, decode_snapshot, encode_snapshot
+from draft_memory import sample_snapshot
+
+import drafter
+
+
+def test_snapshots_round_trip_with_int_keys():
+    snapshot = sample_snapshot(6)
+    text = encode_snapshot(snapshot)
+
+    assert json.loads(text)["version"] == VERSION
+    assert decode_snapshot(text) == snapshot
+
+
+def test_unversioned_snapshots_are_upgraded():
+    snapshot = sample_snapshot(4)
+    # As written before versioning: pretty-printed, with string keys
+    legacy = json.dumps(snapshot, indent=4)
+    assert '"version"' not in legacy
+
+    assert decode_snapshot(legacy) == snapshot
+
+
+def test_snapshots_from_a_newer_version_are_refused():
+    text = encode_snapshot(sample_snapshot(4)).replace(
+        f'"version":{VERSION}', f'"version":{VERSION + 1}'
+    )
+    with pytest.raises(SnapshotVersionError):
+        decode_snapshot(text)
+
+
+def test_a_legacy_draft_file_loads_and_is_rewritten_in_the_current_format():
+    snapshot = dict(sample_snapshot(4), channel_id=801)
+    del snapshot["seq"]  # Saved before the journal, like the baseline bot did
+    path = os.path.join(drafter.storage.directory, "draft_801.json")
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=4)
+
+    async def main():
+        draft = await drafter.Draft.load(801)
+        assert draft.to_dict() == dict(snapshot, seq=0)
+        draft.record("timer_set", seconds=60)
+        await drafter.journal.flush()  # Logged after the legacy snapshot
+        logged = await drafter.Draft.load(801)
+        await logged.save()
+        await drafter.journal.flush()
+        return logged, await drafter.Draft.load(801)
+
+    logged, compacted = asyncio.run(main())
+    expected = dict(snapshot, seq=1, turn_seconds=60)
+    assert logged.to_dict() == compacted.to_dict() == expected
+    with open(path) as f:
+        assert json.load(f)["version"] == VERSION
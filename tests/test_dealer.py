@@ -0,0 +1,36 @@
+import pytest
+
+from dealer import deal
+
+POOL = list(range(1, 13))
+
+
+def test_the_same_seed_deals_the_same_hands():
+    assert deal(3, POOL, seed=7) == deal(3, POOL, seed=7)
+    assert deal(3, POOL, seed=7) != deal(3, POOL, seed=8)
+
+
+def test_hands_share_nothing_while_the_pool_lasts():
+    hands = deal(3, POOL, seed=1)
+    dealt = [faction for hand in hands for faction in hand]
+    assert [len(hand) for hand in hands] == [4, 4, 4]
+    assert sorted(dealt) == POOL
+
+
+def test_excluded_factions_are_never_dealt():
+    for seed in range(20):
+        hands = deal(2, POOL, seed=seed, exclude={1, 2, 3})
+        assert not {1, 2, 3} & {faction for hand in hands for faction in hand}
+
+
+def test_a_small_pool_is_reshuffled_without_doubling_up_a_hand():
+    for seed in range(50):
+        hands = deal(5, [1, 2, 3, 4, 5], hand_size=3, seed=seed)
+        assert all(len(set(hand)) == 3 for hand in hands)
+        counts = [sum(hand.count(f) for hand in hands) for f in range(1, 6)]
+        assert sum(counts) == 15 and max(counts) - min(counts) <= 1
+
+
+def test_a_hand_larger_than_the_pool_is_refused():
+    with pytest.raises(ValueError):
+        deal(2, [1, 2, 3, 4], exclude={4})
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import discord
+import pytest
+from discord.ext import commands
+
+import drafter
+from loadtest import FakeChannel, LoadTest
+from compact import BitSet
+from persistence import SqliteStorage
+
+
+def test_startup_rearms_timers_without_loading_drafts(monkeypatch):
+    when = time.time() + 3600
+    for channel_id in (101, 102):
+        drafter.storage.write(
+            {
+                channel_id: [
+                    {"seq": 1, "type": "draft_created", "guild_id": 5},
+                    {
+                        "seq": 2,
+                        "type": "deadline_set",
+                        "reminder": when,
+                        "deadline": when,
+                    },
+                ]
+            },
+            {},
+        )
+
+    def fail(*args):
+        raise AssertionError("read a draft on startup")
+
+    monkeypatch.setattr(drafter.storage, "read", fail)
+    monkeypatch.setattr(drafter.storage, "load_unfinished", fail)
+    asyncio.run(drafter.on_ready())
+
+    assert {101, 102} <= drafter.saved_drafts
+    assert drafter.timers.armed(101) == drafter.timers.armed(102) == when
+    assert not {101, 102} & drafter.active_drafts.keys()
+
+
+def test_simulate_reports_small_runs_without_nan():
+    async def main():
+        test = LoadTest(drafter, 2, 0)
+        channel = FakeChannel(201, 5)
+        await test.run(channel, 1, drafter.simulate_drafts, 1, 2)
+        return channel.sent
+
+    sent = "\n".join(asyncio.run(main()))
+    assert "Optional factions voted in" in sent and "nan" not in sent
+
+
+def test_shard_worker_only_restores_and_deletes_its_own_guilds(monkeypatch, tmp_path):
+    # Sharded workers share one SQLite database
+    storage = SqliteStorage(str(tmp_path / "drafts.db"))
+    monkeypatch.setattr(drafter, "storage", storage)
+    monkeypatch.setattr(drafter.journal, "storage", storage)
+    # Of 2 shards, guild 1 << 22 is on shard 1 and guild 2 << 22 on shard 0
+    when = time.time() + 3600
+    for channel_id, guild_id in ((301, 1 << 22), (302, 2 << 22)):
+        storage.write(
+            {
+                channel_id: [
+                    {"seq": 1, "type": "draft_created", "guild_id": guild_id},
+                    {
+                        "seq": 2,
+                        "type": "deadline_set",
+                        "reminder": when,
+                        "deadline": when,
+                    },
+                ]
+            },
+            {},
+        )
+    monkeypatch.setattr(drafter, "SHARD_COUNT", 2)
+    monkeypatch.setattr(drafter, "SHARD_IDS", [1])
+    monkeypatch.setattr(drafter, "OWNED_GUILDS", drafter.owns_guild)
+    monkeypatch.setattr(drafter, "ABANDONED_SECONDS", -60)
+
+    asyncio.run(drafter.on_ready())
+    assert 301 in drafter.saved_drafts and 302 not in drafter.saved_drafts
+    assert drafter.timers.armed(301) == when
+    assert drafter.timers.armed(302) is None
+
+    asyncio.run(drafter.delete_abandoned_drafts())
+    assert storage.channel_ids() == [302]
+    storage.close()
+
+
+def test_startdraft_in_a_thread_counts_its_welcome(monkeypatch):
+    channel, thread = FakeChannel(401, 5), FakeChannel(402, 5)
+    thread.mention = "<#402>"
+    opened = []
+
+    async def open_thread(ctx):
+        opened.append(ctx.channel.id)
+        return thread
+
+    monkeypatch.setattr(drafter, "open_thread", open_thread)
+    before = drafter.messages_sent.get("startdraft")
+    asyncio.run(LoadTest(drafter, 2, 0).run(channel, 1, drafter.start_draft))
+
+    assert 402 in drafter.active_drafts and 401 not in drafter.active_drafts
+    assert thread.sent == ["TI4 Faction Draft started! Use !join to join the draft."]
+    assert drafter.messages_sent.get("startdraft") == before + 2
+    assert opened == [401]
+
+
+def test_startdraft_opens_no_thread_where_a_draft_is_running(monkeypatch):
+    async def open_thread(ctx):
+        raise AssertionError("opened a thread")
+
+    async def main():
+        test = LoadTest(drafter, 2, 0)
+        channel = FakeChannel(403, 5)
+        await test.run(channel, 1, drafter.start_draft)
+        monkeypatch.setattr(drafter, "open_thread", open_thread)
+        await test.run(channel, 1, drafter.start_draft)
+        return channel.sent
+
+    sent = asyncio.run(main())
+    assert sent[-1] == "A draft is already in progress in this channel!"
+
+
+def test_load_reads_the_draft_off_the_event_loop(monkeypatch):
+    drafter.storage.write(
+        {601: [{"seq": 1, "type": "draft_created", "guild_id": 5}]}, {}
+    )
+    read = drafter.storage.read
+    threads = []
+
+    def read_in_thread(channel_id):
+        threads.append(threading.current_thread())
+        return read(channel_id)
+
+    monkeypatch.setattr(drafter.storage, "read", read_in_thread)
+    channel = FakeChannel(601, 5)
+    asyncio.run(LoadTest(drafter, 2, 0).run(channel, 1, drafter.load_draft))
+
+    assert channel.sent[0].startswith("Draft state loaded successfully!")
+    assert threads and threading.main_thread() not in threads
+    assert 601 in drafter.active_drafts
+
+
+def baseline_snapshot(channel_id: int) -> str:
+    """A phase 1 draft as the bot saved it before journals: no seq or version."""
+    data = {
+        "channel_id": channel_id,
+        "players": [11, 22],
+        "phase": 1,
+        "player_factions": {"11": [1, 2, 3, 4], "22": [5, 6, 7, 8]},
+        "selected_factions": {},
+        "optional_factions": [],
+        "votes": {},
+        "final_factions": [],
+        "draft_order": [],
+        "current_picker": 0,
+        "draft_round": 1,
+        "player_choices": {},
+        "available_locations": [1, 2],
+        "available_strategies": [1, 2],
+        "map_url": "",
+    }
+    return json.dumps(data, indent=4)
+
+
+def test_a_baseline_draft_survives_its_first_new_event():
+    path = os.path.join(drafter.storage.directory, "draft_701.json")
+    with open(path, "w") as f:
+        f.write(baseline_snapshot(701))
+    drafter.saved_drafts.add(701)
+
+    async def main():
+        test = LoadTest(drafter, 2, 0)
+        await test.run(FakeChannel(701, 5), 11, drafter.select_factions, "1", "2")
+        await drafter.journal.flush()
+        del drafter.active_drafts[701]
+        return await drafter.Draft.load(701)
+
+    draft = asyncio.run(main())
+    assert draft.players == [11, 22] and draft.phase == 1
+    assert draft.player_factions[22] == (5, 6, 7, 8)
+    assert draft.selected_factions == {11: (1, 2)}
+
+
+def test_sharded_worker_refuses_json_storage(tmp_path):
+    env = dict(
+        os.environ,
+        DRAFT_SHARD_COUNT="2",
+        DRAFT_SHARD_IDS="1",
+        DRAFT_STORAGE="json",
+        DRAFT_STORAGE_PATH=str(tmp_path),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", "import drafter"],
+        cwd=os.path.dirname(drafter.__file__),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode != 0 and "DRAFT_STORAGE=sqlite" in result.stderr
+
+
+def test_faction_stats_need_manage_server_like_the_stats_group():
+    member = SimpleNamespace(guild_permissions=discord.Permissions.none())
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=5), author=member)
+
+    async def main():
+        for command in (drafter.show_stats, drafter.show_faction_stats):
+            with pytest.raises(commands.MissingPermissions):
+                for check in command.checks:
+                    await discord.utils.maybe_coroutine(check, ctx)
+
+    asyncio.run(main())
+
+
+def test_timeout_skips_a_picker_with_nothing_left_and_carries_on():
+    async def main():
+        test = LoadTest(drafter, 2, 0)
+        channel = FakeChannel(901, 5)
+        await test.run(channel, 1, drafter.start_draft)
+        for player_id in (1, 2):
+            await test.run(channel, player_id, drafter.join_draft)
+        await test.run(channel, 1, drafter.start_drafting, 7)
+        draft = drafter.active_drafts[901]
+        for player_id in (1, 2):
+            hand = draft.player_factions[player_id]
+            await test.run(
+                channel, player_id, drafter.select_factions, str(hand[0]), str(hand[1])
+            )
+        ctx = drafter.TimerContext(channel)
+        while draft.phase == 2:
+            await drafter.expire_turn(ctx, draft)  # Nobody votes
+        draft.record("timer_set", seconds=60)
+        first, second = draft.draft_order
+        # Too few locations and strategies to go round, and no factions
+        draft.snake.available = {
+            "faction": BitSet(),
+            "location": BitSet([1]),
+            "strategy": BitSet([1, 2]),
+        }
+        await drafter.expire_turn(ctx, draft)  # first takes location 1
+        await drafter.expire_turn(ctx, draft)  # second takes a strategy
+        await ctx.outbox.flush()
+        return draft, first, second, channel.sent
+
+    draft, first, second, sent = asyncio.run(main())
+    # second needs a faction or location on their next turn, and none are left
+    assert draft.skipped == (second,)
+    assert draft.snake.current == first
+    assert drafter.timers.armed(901) is not None
+    assert any("nothing left to pick" in message for message in sent)
+    restored = drafter.Draft.from_dict(draft.to_dict())
+    assert restored.snake.turn == draft.snake.turn
+    assert restored.snake.current == first
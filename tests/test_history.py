@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+from history import GuildHistory, HistoryArchive, draft_record
+
+SNAPSHOT = {
+    "channel_id": 10,
+    "guild_id": 5,
+    "deal_seed": 42,
+    "map_string": "1 2 3",
+    "player_factions": {1: [1, 2, 3], 2: [4, 5, 6], 3: [7, 8, 9]},
+    # player -> [selected, optional]
+    "selected_factions": {1: [1, 2], 2: [4, 6], 3: [7, 1]},
+    "votes": {2: [1, 2], 6: [3], 1: [3]},
+    "final_factions": [1, 2, 4, 7],
+    "draft_order": [3, 1, 2],
+    "player_choices": {
+        1: {"faction": 1, "location": 2, "strategy": 3},
+        2: {"faction": 4, "location": None, "strategy": 1},
+        3: {"faction": 7, "location": 1, "strategy": None},
+    },
+}
+
+
+def test_a_finished_draft_is_recorded_by_what_happened_to_each_faction():
+    record = draft_record(SNAPSHOT, finished_at=123.0)
+    assert record["guild_id"] == 5 and record["finished_at"] == 123.0
+    assert record["dealt"] == list(range(1, 10))
+    assert record["selected"] == [1, 4, 7]
+    assert record["optional"] == [2, 6]  # 1 was also selected outright
+    assert record["voted_in"] == [2]
+    assert record["pooled"] == [1, 2, 4, 7]
+    assert record["picks"] == [[3, 7, 1, None], [1, 1, 2, 3], [2, 4, None, 1]]
+
+
+def test_guild_totals_count_rates_and_round_trip():
+    totals = GuildHistory()
+    record = draft_record(SNAPSHOT)
+    totals.add(record)
+    totals.add(record)
+    assert totals.drafts == 2
+    assert totals.rate("voted_in", "optional", 2) == 1.0
+    assert totals.rate("voted_in", "optional", 6) == 0.0
+    assert totals.rate("picked", "pooled", 2) == 0.0
+    assert totals.rate("picked", "dealt", 99) is None
+    assert totals.locations[1] == {2: 2}
+    assert 4 not in totals.locations and totals.strategies[4] == {1: 2}
+
+    copy = GuildHistory.from_dict(totals.to_dict())
+    assert copy == totals
+
+
+def test_archived_totals_survive_a_restart_and_catch_up(tmp_path):
+    directory = str(tmp_path)
+    record = draft_record(SNAPSHOT)
+
+    async def main():
+        await HistoryArchive(directory).add(record)
+        await HistoryArchive(directory).add(record)
+        return await HistoryArchive(directory).totals(5)
+
+    totals = asyncio.run(main())
+    assert totals.drafts == 2 and len(totals.recent) == 2
+
+    # The totals went missing and the last append was torn by a crash
+    os.remove(tmp_path / "5.totals.json")
+    with open(tmp_path / "5.jsonl", "ab") as f:
+        f.write(b'{"channel_id": 11, "gui')
+
+    async def reload():
+        archive = HistoryArchive(directory)
+        totals = await archive.totals(5)
+        caught_up = totals.drafts
+        await archive.add(record)
+        return caught_up, await HistoryArchive(directory).totals(5)
+
+    caught_up, totals = asyncio.run(reload())
+    assert caught_up == 2
+    assert totals.drafts == 3 and totals.factions["picked"][7] == 3
+    with open(tmp_path / "5.jsonl", "rb") as f:
+        assert len(f.read().splitlines()) == 3  # The torn line was cut off
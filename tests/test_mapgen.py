@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+from mapgen import BLUE_SHARE, MapGenerator, TileCatalog
+
+TILES = os.path.join(os.path.dirname(__file__), "..", "src", "data", "tiles.json")
+maps = MapGenerator(TileCatalog.load(TILES))
+
+
+@pytest.mark.parametrize("players", range(2, 9))
+def test_every_seat_gets_a_similar_share(players):
+    for seed in range(5):
+        generated = maps.generate(players, seed)
+        resources, influence = np.ptp(generated.seats[:, :2], axis=0)
+        assert resources <= 1.0 and influence <= 1.25, (seed, generated.seats)
+        # What's shown for the map string is what was scored
+        assert np.allclose(
+            maps.describe(generated.map_string, players), generated.seats
+        )
+
+
+@pytest.mark.parametrize("players", range(2, 9))
+def test_seats_have_equal_slices_of_the_map(players):
+    _, _, weights = maps.layout(players)
+    assert np.allclose(weights.sum(axis=0), weights.sum(axis=0).mean())
+
+
+def test_a_seed_gives_the_same_map_with_no_tile_twice():
+    generated = maps.generate(6, 123)
+    assert generated.map_string == maps.generate(6, 123).map_string
+    placed = [tile for tile in generated.tiles if tile]
+    assert len(placed) == len(set(placed)) == 30
+    blue = sum(maps.catalog.tiles[maps.catalog.rows[t]].blue for t in placed)
+    assert blue == round(30 * BLUE_SHARE)
@@ -0,0 +1,54 @@
+import json
+
+from migrate import migrate
+from persistence import JsonFileStorage, SqliteStorage
+
+import drafter
+
+# A phase 1 draft as the bot saved it before journals: no seq or version
+BASELINE = {
+    "channel_id": 1,
+    "players": [11, 22],
+    "phase": 1,
+    "player_factions": {"11": [1, 2, 3, 4], "22": [5, 6, 7, 8]},
+    "selected_factions": {},
+    "optional_factions": [],
+    "votes": {},
+    "final_factions": [],
+    "draft_order": [],
+    "current_picker": 0,
+    "draft_round": 1,
+    "player_choices": {},
+    "available_locations": [1, 2],
+    "available_strategies": [1, 2],
+    "map_url": "",
+}
+
+
+def test_migrated_baseline_draft_keeps_its_state_after_new_events(tmp_path):
+    (tmp_path / "draft_1.json").write_text(json.dumps(BASELINE, indent=4))
+    target = SqliteStorage(str(tmp_path / "drafts.db"))
+    try:
+        assert migrate(JsonFileStorage(str(tmp_path)), target) == 1
+        snapshot, events = target.read(1)
+        assert snapshot["seq"] == 0 and events == []
+        target.write(
+            {
+                1: [
+                    {
+                        "seq": 1,
+                        "type": "selected",
+                        "player_id": 11,
+                        "faction": 1,
+                        "optional": 2,
+                    }
+                ]
+            },
+            {},
+        )
+        reloaded = drafter.Draft.restore(1, *target.read(1))
+    finally:
+        target.close()
+    assert reloaded.players == [11, 22] and reloaded.seq == 1
+    assert reloaded.player_factions[22] == (5, 6, 7, 8)
+    assert reloaded.selected_factions == {11: (1, 2)}
@@ -0,0 +1,39 @@
+import asyncio
+
+from outbox import Outbox, pack
+
+
+class Destination:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def test_pack_joins_lines_into_the_fewest_messages():
+    assert pack(["a", "", "b", "c"], limit=5) == ["a\nb\nc"]
+    assert pack(["aa", "bb", "cc"], limit=5) == ["aa\nbb", "cc"]
+
+
+def test_pack_splits_a_line_longer_than_a_message():
+    messages = pack(["x", "y" * 12, "z"], limit=5)
+    assert all(len(message) <= 5 for message in messages)
+    assert "".join(messages).replace("\n", "") == "x" + "y" * 12 + "z"
+    # A long text breaks at its own line breaks where it can
+    assert pack(["abc\ndef\ngh"], limit=7) == ["abc\ndef", "gh"]
+
+
+def test_outbox_sends_everything_queued_in_one_flush():
+    destination = Destination()
+    outbox = Outbox(destination)
+    outbox.add("Draft started!")
+    outbox.tell("You're not part of this draft!")
+    outbox.add("")
+
+    asyncio.run(outbox.flush())
+    assert destination.sent == ["Draft started!\nYou're not part of this draft!"]
+    assert (outbox.queued, outbox.sent, outbox.saved) == (3, 1, 2)
+
+    asyncio.run(outbox.flush())  # Nothing new queued
+    assert outbox.sent == 1
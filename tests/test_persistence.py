@@ -0,0 +1,241 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from persistence import JsonFileStorage, Journal, SqliteStorage
+
+
+def created(seq=1):
+    return {"seq": seq, "type": "draft_created", "guild_id": 5, "turn_seconds": 60}
+
+
+def deadline(seq, reminder, when):
+    return {"seq": seq, "type": "deadline_set", "reminder": reminder, "deadline": when}
+
+
+def no_reads(storage, monkeypatch):
+    def fail(*args):
+        raise AssertionError("read a draft")
+
+    monkeypatch.setattr(storage, "read", fail)
+    if isinstance(storage, JsonFileStorage):
+        monkeypatch.setattr(storage, "load_unfinished", fail)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def reopen(request, tmp_path):
+    """Opens the same storage again, as a restarted bot would."""
+    opened = []
+
+    def reopen():
+        if request.param == "json":
+            storage = JsonFileStorage(str(tmp_path))
+        else:
+            storage = SqliteStorage(str(tmp_path / "drafts.db"))
+        opened.append(storage)
+        return storage
+
+    yield reopen
+    for storage in opened:
+        storage.close()
+
+
+def test_timers_are_read_without_reading_drafts(reopen, monkeypatch):
+    storage = reopen()
+    storage.write({1: [created(), deadline(2, 10.0, 20.0)]}, {})
+    storage.write({2: [created()]}, {})
+    storage.write({3: [created(), deadline(2, 30.0, 40.0)]}, {})
+    storage.write({3: [{"seq": 3, "type": "completed"}]}, {})
+
+    restarted = reopen()
+    no_reads(restarted, monkeypatch)
+    assert restarted.timers() == {1: (10.0, 20.0)}
+
+
+def test_timer_index_follows_new_deadlines_and_deletes(reopen, monkeypatch):
+    storage = reopen()
+    storage.write({1: [created(), deadline(2, 10.0, 20.0)]}, {})
+    storage.write({2: [created(), deadline(2, 30.0, 40.0)]}, {})
+    storage.write({1: [deadline(3, 50.0, 60.0)]}, {})
+    storage.delete(2)
+
+    restarted = reopen()
+    no_reads(restarted, monkeypatch)
+    assert restarted.timers() == {1: (50.0, 60.0)}
+
+
+def test_json_timer_index_is_built_once_for_older_saves(tmp_path, monkeypatch):
+    storage = JsonFileStorage(str(tmp_path))
+    storage.write({1: [created(), deadline(2, 10.0, 20.0)]}, {})
+    (tmp_path / "timers.json").unlink()  # As saved before the index existed
+
+    assert JsonFileStorage(str(tmp_path)).timers() == {1: (10.0, 20.0)}
+    restarted = JsonFileStorage(str(tmp_path))
+    no_reads(restarted, monkeypatch)
+    assert restarted.timers() == {1: (10.0, 20.0)}
+
+
+def test_guild_filter_leaves_out_other_guilds_drafts(tmp_path):
+    def reopen():
+        return SqliteStorage(str(tmp_path / "drafts.db"))
+
+    storage = reopen()
+    storage.write({1: [created(), deadline(2, 10.0, 20.0)]}, {})
+    other = dict(created(), guild_id=6)
+    storage.write({2: [other, deadline(2, 30.0, 40.0)]}, {})
+
+    def owns(guild_id):
+        return guild_id == 5
+
+    restarted = reopen()
+    assert restarted.unfinished_ids(owns) == [1]
+    assert restarted.timers(owns) == {1: (10.0, 20.0)}
+    assert restarted.stale_ids(time.time() + 60, owns) == [1]
+    assert sorted(restarted.unfinished_ids()) == [1, 2]
+    storage.close()
+    restarted.close()
+
+
+def test_json_storage_refuses_to_filter_by_guild(tmp_path):
+    storage = JsonFileStorage(str(tmp_path))
+    storage.write({1: [created()]}, {})
+    with pytest.raises(ValueError):
+        storage.unfinished_ids(lambda guild_id: True)
+
+
+class FakeDraft:
+    """Just enough of a Draft for the journal: its events and a snapshot."""
+
+    def __init__(self, journal, channel_id=1):
+        self.journal = journal
+        self.channel_id = channel_id
+        self.seq = 0
+
+    def record(self, type, **data):
+        self.seq += 1
+        event = {"seq": self.seq, "type": type, **data}
+        if self.seq == 1:
+            event.update(guild_id=5)
+        self.journal.append(self, event)
+
+    def to_dict(self):
+        return {"channel_id": self.channel_id, "seq": self.seq, "phase": 1}
+
+
+class FailingStorage:
+    """Wraps a storage, failing its next writes with the given errors."""
+
+    def __init__(self, storage, *errors):
+        self.storage = storage
+        self.errors = list(errors)
+
+    def write(self, pending, snapshots):
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.storage.write(pending, snapshots)
+
+
+def journal_run(storage, play):
+    async def main():
+        journal = Journal(storage, delay=3600)
+        await play(journal, FakeDraft(journal))
+        if journal._timer is not None:
+            journal._timer.cancel()
+
+    asyncio.run(main())
+
+
+def test_journal_appends_buffered_events_on_flush(reopen):
+    storage = reopen()
+
+    async def play(journal, draft):
+        draft.record("draft_created")
+        draft.record("player_joined", player_id=7)
+        assert storage.read(1) == (None, [])
+        await journal.flush()
+
+    journal_run(storage, play)
+    snapshot, events = reopen().read(1)
+    assert snapshot is None
+    assert [event["type"] for event in events] == ["draft_created", "player_joined"]
+
+
+def test_journal_compacts_every_100_events(reopen):
+    storage = reopen()
+
+    async def play(journal, draft):
+        draft.record("draft_created")
+        for player_id in range(98):
+            draft.record("player_joined", player_id=player_id)
+        await journal.flush()
+        assert storage.read(1)[0] is None  # 99 events: still only a log
+        draft.record("player_joined", player_id=98)
+        await journal.flush()
+
+    journal_run(storage, play)
+    snapshot, events = reopen().read(1)
+    assert snapshot["seq"] == 100 and events == []
+
+
+@pytest.mark.parametrize("error", [OSError("disk full"), RuntimeError("bug")])
+def test_journal_keeps_a_failed_batch_for_the_next_flush(reopen, error):
+    storage = FailingStorage(reopen(), error)
+
+    async def play(journal, draft):
+        draft.record("draft_created")
+        try:
+            await journal.flush()
+        except RuntimeError:
+            pass
+        assert journal.pending(1)
+        draft.record("player_joined", player_id=7)
+        await journal.flush()
+        assert not journal.pending(1)
+
+    journal_run(storage, play)
+    _, events = reopen().read(1)
+    assert [event["seq"] for event in events] == [1, 2]
+
+
+def test_first_event_after_an_unsequenced_snapshot_continues_the_draft(reopen):
+    storage = reopen()
+    # Snapshots from before events had a seq restore with seq 0
+    snapshot = {"channel_id": 1, "players": [11, 22], "phase": 1}
+    storage.write({}, {1: snapshot})
+    selected = {"seq": 1, "type": "selected", "player_id": 11}
+    storage.write({1: [selected]}, {})
+
+    restarted = reopen()
+    assert restarted.read(1) == (snapshot, [selected])
+
+
+def test_json_log_append_cuts_off_a_torn_line(tmp_path):
+    storage = JsonFileStorage(str(tmp_path))
+    storage.write({1: [created()]}, {})
+    with open(tmp_path / "draft_1.log", "a") as f:
+        f.write('{"seq":2,"ty')  # A crash mid-append
+    storage.write({1: [deadline(2, 10.0, 20.0), deadline(3, 30.0, 40.0)]}, {})
+
+    _, events = storage.read(1)
+    assert [event["seq"] for event in events] == [1, 2, 3]
+
+
+def test_json_log_is_cut_back_when_an_append_fails(tmp_path, monkeypatch):
+    storage = JsonFileStorage(str(tmp_path))
+    storage.write({1: [created()]}, {})
+    size = (tmp_path / "draft_1.log").stat().st_size
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError):
+        storage.write({1: [deadline(2, 10.0, 20.0)]}, {})
+    monkeypatch.undo()
+    assert (tmp_path / "draft_1.log").stat().st_size == size
+
+    storage.write({1: [deadline(2, 10.0, 20.0), deadline(3, 30.0, 40.0)]}, {})
+    _, events = storage.read(1)
+    assert [event["seq"] for event in events] == [1, 2, 3]
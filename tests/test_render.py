@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from render import RenderCache
+
+
+def test_listings_are_rebuilt_only_when_the_draft_changes():
+    cache = RenderCache()
+    draft = SimpleNamespace(channel_id=1, seq=3)
+    builds = []
+
+    def build(view):
+        def render(draft):
+            builds.append((view, draft.seq))
+            return f"{view}@{draft.seq}"
+
+        return render
+
+    assert cache.get(draft, "all", build("all")) == "all@3"
+    assert cache.get(draft, "all", build("all")) == "all@3"
+    assert cache.get(draft, "mine", build("mine")) == "mine@3"
+    draft.seq = 4
+    assert cache.get(draft, "all", build("all")) == "all@4"
+    assert cache.get(draft, "mine", build("mine")) == "mine@4"
+    assert builds == [("all", 3), ("mine", 3), ("all", 4), ("mine", 4)]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_drafts_are_cached_apart_and_evicted():
+    cache = RenderCache()
+    first = SimpleNamespace(channel_id=1, seq=1)
+    second = SimpleNamespace(channel_id=2, seq=1)
+    cache.get(first, "all", lambda draft: "first")
+    assert cache.get(second, "all", lambda draft: "second") == "second"
+    assert len(cache) == 2
+    cache.evict(1)
+    cache.evict(3)  # Never cached
+    assert len(cache) == 1
+    assert cache.get(first, "all", lambda draft: "again") == "again"
@@ -0,0 +1,20 @@
+import json
+
+from simulate import DraftSimulator, format_report
+
+FACTIONS = list(range(1, 26))
+
+
+def test_small_runs_report_rates_not_nan():
+    result = DraftSimulator(FACTIONS).run(1, 2, seed=1)
+    assert 0 <= result.optional_voted_in <= 1
+    # Factions that were never optional have no vote-in rate to report
+    json.dumps(result.to_dict(), allow_nan=False)
+    assert "nan" not in format_report(result, {f: str(f) for f in FACTIONS})
+
+
+def test_optional_voted_in_counts_every_offer():
+    result = DraftSimulator(FACTIONS).run(2000, 6, seed=2)
+    offered = result.optional.sum()
+    by_faction = (result.voted_in * result.optional)[result.optional > 0].sum()
+    assert abs(result.optional_voted_in - by_faction / offered) < 1e-9
@@ -0,0 +1,73 @@
+from snake import KINDS, SnakeDraft
+
+
+def engine(order=(1, 2, 3)):
+    return SnakeDraft(list(order), [10, 11, 12, 13], [1, 2, 3], [1, 2, 3])
+
+
+def test_turns_snake_back_and_forth_one_kind_per_round():
+    draft = engine()
+    assert draft.schedule == [1, 2, 3, 3, 2, 1, 1, 2, 3]
+    assert (draft.current, draft.round, draft.direction) == (1, 1, 1)
+
+    for kind, value in (("faction", 10), ("faction", 11), ("faction", 12)):
+        draft.pick(draft.current, kind, value)
+    assert (draft.current, draft.round, draft.direction) == (3, 2, -1)
+    assert draft.position == 2
+    assert not draft.can_pick("faction", 11) and draft.can_pick("faction", 13)
+    assert draft.remaining == {1: 2, 2: 2, 3: 2}
+
+
+def test_draft_is_done_after_every_player_picks_every_kind():
+    draft = engine()
+    for turn in range(len(draft.schedule)):
+        player = draft.current
+        kind = KINDS[turn // 3]
+        draft.pick(player, kind, next(iter(draft.available[kind])))
+    assert draft.done and draft.current is None
+    assert set(draft.remaining.values()) == {0}
+
+
+def test_resume_skips_picks_already_made():
+    choices = {
+        1: {"faction": 10, "location": None, "strategy": None},
+        2: {"faction": 11, "location": None, "strategy": None},
+        3: {"faction": None, "location": None, "strategy": None},
+    }
+    draft = SnakeDraft.resume(
+        [1, 2, 3], [10, 11, 12, 13], [1, 2, 3], [1, 2, 3], choices
+    )
+
+    assert draft.current == 3 and draft.turn == 2
+    assert list(draft.available["faction"]) == [12, 13]
+    assert draft.remaining == {1: 2, 2: 2, 3: 3}
+
+
+def test_resolve_takes_the_best_queued_value_still_available():
+    draft = engine()
+    draft.pick(1, "faction", 10)
+    none = {"faction": None, "location": None, "strategy": None}
+
+    assert draft.resolve(none, {"faction": [10, 12, 11]}) == ("faction", 12)
+    picked = dict(none, faction=12)
+    assert draft.resolve(picked, {"faction": [11], "strategy": [2]}) == (
+        "strategy",
+        2,
+    )
+    assert draft.resolve(none, {"faction": [10]}) is None
+
+
+def test_skipped_turns_count_when_resuming():
+    draft = engine((1, 2))
+    draft.pick(1, "faction", 10)
+    draft.skip(2)
+    none = {"faction": None, "location": None, "strategy": None}
+    choices = {1: dict(none, faction=10), 2: dict(none)}
+    resumed = SnakeDraft.resume([1, 2], [10, 11, 12, 13], [1, 2], [1, 2], choices, [2])
+
+    assert resumed.turn == draft.turn == 2 and resumed.current == 2
+    assert resumed.remaining == draft.remaining == {1: 2, 2: 2}
+    assert resumed.has_options(none)
+    # Only a faction still to pick, and none left
+    no_factions = SnakeDraft([1], [], [1], [1])
+    assert not no_factions.has_options(dict(none, location=1, strategy=1))
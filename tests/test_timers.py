@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from locks import KeyedLocks
+from timers import Scheduler
+
+
+def test_due_skips_cancelled_and_rearmed_keys():
+    scheduler = Scheduler(fire=None)
+    scheduler.arm("a", 10.0)
+    scheduler.arm("b", 20.0)
+    scheduler.arm("a", 30.0)
+    scheduler.cancel("b")
+    assert scheduler.due(25.0) == []
+    assert scheduler.due(30.0) == ["a"]
+    assert len(scheduler) == 0
+
+
+def test_a_busy_draft_does_not_delay_other_timers():
+    async def main():
+        locks = KeyedLocks()
+        fired = {}
+
+        async def fire(channel_id):
+            await locks.acquire(channel_id)  # As on_turn_timer does
+            try:
+                fired[channel_id] = time.time()
+            finally:
+                locks.release(channel_id)
+
+        scheduler = Scheduler(fire)
+        runner = asyncio.create_task(scheduler.run())
+        await locks.acquire(1)  # A long command holds channel 1's lock
+        start = time.time()
+        scheduler.arm(1, start)
+        scheduler.arm(2, start + 0.05)
+        await asyncio.sleep(0.3)
+        assert 1 not in fired
+        assert fired[2] - start < 0.2
+        locks.release(1)
+        await asyncio.sleep(0.05)
+        assert 1 in fired
+        runner.cancel()
+
+    asyncio.run(main())
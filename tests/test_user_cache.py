@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+from user_cache import UserCache
+
+
+class FakeBot:
+    def __init__(self, gateway=()):
+        self.gateway = {user_id: SimpleNamespace(id=user_id) for user_id in gateway}
+        self.fetches = []
+
+    def get_user(self, user_id):
+        return self.gateway.get(user_id)
+
+    async def fetch_user(self, user_id):
+        self.fetches.append(user_id)
+        await asyncio.sleep(0)
+        return SimpleNamespace(id=user_id)
+
+
+def test_lookups_try_the_cache_then_the_gateway_then_rest():
+    bot = FakeBot(gateway=[1])
+    users = UserCache(bot)
+
+    async def main():
+        for user_id in (1, 2, 1, 2):
+            assert (await users.get(user_id)).id == user_id
+
+    asyncio.run(main())
+    assert bot.fetches == [2]
+    assert users.stats() == {
+        "size": 2,
+        "hits": 2,
+        "misses": 2,
+        "gateway_hits": 1,
+        "rest_lookups": 1,
+    }
+
+
+def test_concurrent_misses_share_one_fetch():
+    bot = FakeBot()
+    users = UserCache(bot)
+
+    async def main():
+        return await users.get_many([7, 7, 8, 7])
+
+    assert [user.id for user in asyncio.run(main())] == [7, 7, 8, 7]
+    assert sorted(bot.fetches) == [7, 8]
+
+
+def test_expired_and_least_recent_users_are_fetched_again():
+    bot = FakeBot()
+    expired = UserCache(bot, ttl=-1)
+    expired.put(SimpleNamespace(id=1))
+    small = UserCache(bot, maxsize=2)
+    for user_id in (2, 3):
+        small.put(SimpleNamespace(id=user_id))
+
+    async def main():
+        await expired.get(1)  # Already past its TTL
+        await small.get(2)  # Now more recent than 3
+        small.put(SimpleNamespace(id=4))
+        for user_id in (2, 4, 3):
+            await small.get(user_id)
+
+    asyncio.run(main())
+    assert bot.fetches == [1, 3]